@@ -0,0 +1,68 @@
+"""
+Rejilla de caja del PC como un único componente (components/box_grid/index.html).
+
+En lugar de 30 columnas con su HTML y su botón "Ver" (~90 elementos por rerun), la
+caja viaja como un solo payload JSON y la selección de casilla ocurre en el
+navegador; sólo vuelve a Python la casilla pulsada.
+
+    slot = box_grid(slots, key="box_grid_3", img_w=56, sheet=atlas_sheet(atlas))
+    if slot is not None: ...
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+_COMPONENT_DIR = Path(__file__).resolve().parent / "components" / "box_grid"
+_box_grid = components.declare_component("box_grid", path=str(_COMPONENT_DIR))
+
+
+def box_slot(*, title: str, img: Optional[str] = None, pos: Optional[Sequence[int]] = None,
+             types: Sequence[Dict[str, str]] = (), is_shiny: bool = False,
+             gender: Optional[str] = None) -> Dict[str, Any]:
+    """Casilla ocupada: `img` (URL o data URI) o `pos` (x, y) dentro de la hoja del atlas;
+    `types` como [{'label': 'Fuego', 'color': '#EE8130'}, ...]."""
+    return {
+        "title": str(title or ""),
+        "img": img,
+        "pos": list(pos) if pos is not None else None,
+        "types": list(types),
+        "shiny": bool(is_shiny),
+        "gender": (gender or "").upper() or None,
+    }
+
+
+def atlas_sheet(atlas) -> Optional[Dict[str, Any]]:
+    """Datos de la hoja de sprite_atlas para el componente (None si no hay atlas)."""
+    if atlas is None:
+        return None
+    from sprite_atlas import sheet_uri
+    return {"uri": sheet_uri(atlas), "cols": atlas.cols, "rows": atlas.rows, "cell": atlas.cell}
+
+
+def box_grid(slots: List[Optional[Dict[str, Any]]], *, key: str, cols: int = 6, img_w: int = 56,
+             sheet: Optional[Dict[str, Any]] = None, selected: Optional[int] = None,
+             empty_label: str = "Vacío – Slot {n}") -> Optional[int]:
+    """Pinta la caja y devuelve el índice de la casilla recién pulsada (o None).
+
+    Cada clic llega una sola vez: el componente conserva su último valor entre reruns,
+    así que se recuerda el `seq` ya atendido en session_state.
+    """
+    value = _box_grid(
+        slots=slots, cols=cols, img_w=img_w, sheet=sheet, selected=selected,
+        empty_label=empty_label, key=key, default=None,
+    )
+    if not isinstance(value, dict) or "slot" not in value:
+        return None
+    seen_key = f"_{key}_seq"
+    if st.session_state.get(seen_key) == value.get("seq"):
+        return None
+    st.session_state[seen_key] = value.get("seq")
+    try:
+        slot = int(value["slot"])
+    except Exception:
+        return None
+    return slot if 0 <= slot < len(slots) else None
@@ -3,6 +3,8 @@
 from __future__ import annotations
 import json
 import subprocess
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, List, Tuple, Optional
 import os
@@ -10,18 +12,43 @@ import os
 # Tiempo máximo por invocación al bridge (segundos)
 BRIDGE_TIMEOUT = int(os.environ.get("PKHEX_TIMEOUT", "15"))
 
-# Caché simple de lecturas por caja: clave = (sav_path, box_index, mode)
-_BOX_CACHE: Dict[Tuple[str, int, Optional[str]], Dict[str, Any]] = {}
+# Caché simple de lecturas por caja: clave = (sav_path, mtime_ns, box_index, mode). Lleva la ruta
+# y el mtime, así que no hay que vaciarla al cambiar de save; se acota por número de entradas.
+_BOX_CACHE: Dict[Tuple[str, int, int, Optional[str]], Dict[str, Any]] = {}
+_BOX_CACHE_MAX = 512
 
 def _clear_caches() -> None:
     _BOX_CACHE.clear()
 
-__all__ = ["PKHeXRuntime", "extract_team", "get_box_meta", "extract_box", "has_pc_data", "get_bridge_path"]
+def forget_saves(paths) -> int:
+    """Elimina de las cachés de lectura las entradas de los .sav indicados (p.ej. tras borrarlos)."""
+    gone = {str(Path(p)) for p in paths}
+    keys = [k for k in list(_BOX_CACHE) if k[0] in gone]
+    for k in keys:
+        _BOX_CACHE.pop(k, None)
+    with _HANDLES_LOCK:
+        for hk in [hk for hk in _HANDLES if hk[0] in gone]:
+            _HANDLES.pop(hk, None)
+    return len(keys)
+
+__all__ = ["PKHeXRuntime", "SaveHandle", "extract_team", "get_box_meta", "extract_box", "has_pc_data", "get_bridge_path"]
 
 # ================= bridge runtime / estado =================
 
 _BRIDGE_PATH: Optional[Path] = None
 _LAST_SAV_PATH: Optional[str] = None  # último .sav abierto (para invocar --box N después)
+# Protege las escrituras/lecturas de _LAST_SAV_PATH entre hilos (sesiones de Streamlit)
+_BRIDGE_LOCK = threading.RLock()
+
+
+def _remember_sav(path: str | Path) -> str:
+    """Guarda `path` como último .sav (compatibilidad con las lecturas sin ruta
+    explícita). Devuelve la ruta normalizada. No toca las cachés: van por ruta."""
+    global _LAST_SAV_PATH
+    new_path = str(Path(path))
+    with _BRIDGE_LOCK:
+        _LAST_SAV_PATH = new_path
+    return new_path
 
 class PKHeXRuntime:
     @staticmethod
@@ -50,14 +77,10 @@ class PKHeXRuntime:
         PKHeXRuntime.ensure_loaded()
 
         # recordar el sav actual para lecturas per-box (e invalidar caché si cambia)
-        global _LAST_SAV_PATH
-        new_path = str(Path(path))
-        if _LAST_SAV_PATH != new_path:
-            _LAST_SAV_PATH = new_path
-            _clear_caches()
+        new_path = _remember_sav(path)
 
         # --- pasar flags al bridge según sesión/env (sin --box aquí) ---
-        args = [str(_BRIDGE_PATH), _LAST_SAV_PATH]
+        args = [str(_BRIDGE_PATH), new_path]
 
         mode = os.environ.get("PKHEX_MODE")
         os.environ.get("PKHEX_BOX")  # ignorado aquí; per-box se usa en extract_box/get_box_meta
@@ -111,35 +134,43 @@ def _current_mode() -> Optional[str]:
         return None if m == "auto" else m
     return None
 
-def _ensure_last_sav_from_session() -> None:
-    """Si no tenemos _LAST_SAV_PATH, intenta coger active_sav_path de Streamlit."""
+def _ensure_last_sav_from_session() -> Optional[str]:
+    """Devuelve _LAST_SAV_PATH; si no lo tenemos, intenta coger active_sav_path de Streamlit."""
     global _LAST_SAV_PATH
-    if _LAST_SAV_PATH:
-        return
-    try:
-        import streamlit as st  # type: ignore
-        spath = st.session_state.get("active_sav_path")
-        if spath:
-            _LAST_SAV_PATH = str(spath)
-    except Exception:
-        pass
+    with _BRIDGE_LOCK:
+        if _LAST_SAV_PATH:
+            return _LAST_SAV_PATH
+        try:
+            import streamlit as st  # type: ignore
+            spath = st.session_state.get("active_sav_path")
+            if spath:
+                _LAST_SAV_PATH = str(spath)
+        except Exception:
+            pass
+        return _LAST_SAV_PATH
 
-def _run_bridge_for_box(box_index: int) -> Optional[Dict[str, Any]]:
-    """Ejecuta el bridge con --box N (y modo si procede) usando el último sav conocido."""
+def _run_bridge_for_box(box_index: int, sav_path: str | Path | None = None) -> Optional[Dict[str, Any]]:
+    """Ejecuta el bridge con --box N (y modo si procede) sobre `sav_path` o, si no se
+    indica, sobre el último sav conocido."""
     if _BRIDGE_PATH is None:
         raise RuntimeError("Bridge no cargado.")
-    _ensure_last_sav_from_session()
-    if not _LAST_SAV_PATH:
+    spath = str(Path(sav_path)) if sav_path else _ensure_last_sav_from_session()
+    if not spath:
         return None
 
-    args = [str(_BRIDGE_PATH), _LAST_SAV_PATH, "--box", str(int(box_index))]
+    args = [str(_BRIDGE_PATH), spath, "--box", str(int(box_index))]
     mode = _current_mode()
     if mode:
         args += ["--mode", mode]
-    # caché por (sav, box, mode)
-    cache_key = (_LAST_SAV_PATH, int(box_index), mode)
-    if cache_key in _BOX_CACHE:
-        return _BOX_CACHE[cache_key]
+    # caché por (sav, mtime, box, mode)
+    try:
+        mtime_ns = os.stat(spath).st_mtime_ns
+    except OSError:
+        return None
+    cache_key = (spath, mtime_ns, int(box_index), mode)
+    cached = _BOX_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
         sp = subprocess.run(args, capture_output=True, text=True, timeout=BRIDGE_TIMEOUT)
@@ -151,6 +182,11 @@ def _run_bridge_for_box(box_index: int) -> Optional[Dict[str, Any]]:
         data = json.loads(sp.stdout)
         if isinstance(data, dict):
             _BOX_CACHE[cache_key] = data
+            while len(_BOX_CACHE) > _BOX_CACHE_MAX:
+                try:
+                    _BOX_CACHE.pop(next(iter(_BOX_CACHE)))
+                except (StopIteration, KeyError, RuntimeError):
+                    break
             return data
         return None
     except Exception:
@@ -430,14 +466,8 @@ def _find_boxes_root(data: Dict[str, Any]) -> List[Any]:
 
 # ================= API para la UI =================
 
-def has_pc_data(_: Dict[str, Any], save_path: str | None = None) -> bool:
-    """Verifica el PC haciendo una llamada real a la caja 0."""
-    if save_path:
-        p = Path(save_path)
-        if not p.exists():
-            return False
-        PKHeXRuntime.open_sav(p)
-    data0 = _run_bridge_for_box(0)
+def _pc_from_box0(data0: Any) -> bool:
+    """True si la respuesta de --box 0 trae estructura de caja."""
     if not isinstance(data0, dict):
         return False
     boxes = data0.get("Boxes")
@@ -446,14 +476,50 @@ def has_pc_data(_: Dict[str, Any], save_path: str | None = None) -> bool:
     b0 = boxes[0]
     return isinstance(b0, dict) and "Mons" in b0  # existe estructura de caja
 
-def extract_team(sav_json: str | Dict[str, Any], save_path: str | None = None) -> List[Dict[str, Any]]:
+
+def _pc_from_payload(sav_json: Any) -> Optional[bool]:
+    """PC deducido del JSON ya parseado (None si no se puede saber sin sondear)."""
+    if not isinstance(sav_json, dict):
+        return None
+    raw = _first_present(sav_json, "BoxCount", "box_count", "BoxesCount", "boxesCount")
+    try:
+        if raw is not None and int(raw) == 0:
+            return False
+    except Exception:
+        pass
+    boxes = _find_boxes_root(sav_json)
+    if isinstance(boxes, list) and boxes:
+        b0 = boxes[0]
+        if isinstance(b0, dict) and _first_present(b0, "Mons") is not None:
+            return True
+    return None
+
+
+def has_pc_data(sav_json: Dict[str, Any], save_path: str | None = None) -> bool:
+    """Verifica el PC. Con `save_path` usa el SaveHandle (sin reabrir el .sav si ya está
+    abierto); si no, el JSON recibido o, en último caso, la caja 0 (cacheada)."""
     if save_path:
         p = Path(save_path)
-        if p.exists():
-            try:
-                PKHeXRuntime.open_sav(p)
-            except Exception:
-                pass
+        if not p.exists():
+            return False
+        return SaveHandle.open(p).has_pc
+    known = _pc_from_payload(sav_json)
+    if known is not None:
+        return known
+    return _pc_from_box0(_run_bridge_for_box(0))
+
+def _known_sav(save_path: str | None) -> Optional[str]:
+    """Ruta explícita para las lecturas por caja (None si no se indica o no existe).
+    Ya no hace falta reabrir el .sav: basta con pasar la ruta al bridge."""
+    if not save_path:
+        return None
+    p = Path(save_path)
+    if not p.exists():
+        return None
+    return _remember_sav(p)
+
+def extract_team(sav_json: str | Dict[str, Any], save_path: str | None = None) -> List[Dict[str, Any]]:
+    _known_sav(save_path)
     try:
         data = json.loads(sav_json) if isinstance(sav_json, str) else sav_json
         party = (_first_present(data, "Party") or {})
@@ -465,16 +531,13 @@ def extract_team(sav_json: str | Dict[str, Any], save_path: str | None = None) -
 
 def get_box_meta(sav_json: Dict[str, Any], save_path: str | None = None) -> Tuple[int, List[str]]:
     """Devuelve la cantidad de cajas y sus nombres intentando leerlos directamente del bridge."""
-    if save_path:
-        p = Path(save_path)
-        if p.exists():
-            PKHeXRuntime.open_sav(p)
+    spath = _known_sav(save_path)
     names: List[str] = []
     ok_any = False
     total = _box_count_hint(sav_json)
     for i in range(total):
         nm = None
-        data_i = _run_bridge_for_box(i)
+        data_i = _run_bridge_for_box(i, spath)
         if isinstance(data_i, dict):
             boxes = data_i.get("Boxes")
             if isinstance(boxes, list) and boxes:
@@ -504,16 +567,13 @@ def get_box_meta(sav_json: Dict[str, Any], save_path: str | None = None) -> Tupl
 def extract_box(sav_json: Dict[str, Any], box_index: int, save_path: str | None = None) -> List[Dict[str, Any]]:
     """Lee la caja directamente del ejecutable con --box N (como en las pruebas que funcionan).
        Si falla, intenta fallback a la lógica antigua contra el JSON recibido."""
-    if save_path:
-        p = Path(save_path)
-        if p.exists():
-            PKHeXRuntime.open_sav(p)
+    spath = _known_sav(save_path)
     total = _box_count_hint(sav_json)
     if not (0 <= box_index < total):
         return []
 
     # 1) Lectura per-box (preferida)
-    data_i = _run_bridge_for_box(box_index)
+    data_i = _run_bridge_for_box(box_index, spath)
     if isinstance(data_i, dict):
         boxes = data_i.get("Boxes")
         if isinstance(boxes, list) and boxes:
@@ -570,13 +630,7 @@ def extract_box(sav_json: Dict[str, Any], box_index: int, save_path: str | None
 
 def get_box_meta_quick(sav_json: Dict[str, Any], save_path: str | None = None, max_probe: int = 3) -> Tuple[int, List[str]]:
     """VersiИn rЗpida de get_box_meta: sЗlo sondea unas pocas cajas para nombrarlas."""
-    if save_path:
-        p = Path(save_path)
-        if p.exists():
-            try:
-                PKHeXRuntime.open_sav(p)
-            except Exception:
-                pass
+    spath = _known_sav(save_path)
 
     names: List[str] = []
     probe = 0
@@ -584,7 +638,7 @@ def get_box_meta_quick(sav_json: Dict[str, Any], save_path: str | None = None, m
     for i in range(total):
         nm = None
         if probe < max_probe:
-            data_i = _run_bridge_for_box(i)
+            data_i = _run_bridge_for_box(i, spath)
             if isinstance(data_i, dict):
                 boxes = data_i.get("Boxes")
                 if isinstance(boxes, list) and boxes:
@@ -600,3 +654,75 @@ def get_box_meta_quick(sav_json: Dict[str, Any], save_path: str | None = None, m
     return total, names
 
 
+# ================= save ya abierto (reutilizable entre reruns) =================
+
+# Handles abiertos: clave = (sav_path, mtime_ns, mode)
+_HANDLES: "OrderedDict[Tuple[str, int, Optional[str]], SaveHandle]" = OrderedDict()
+_HANDLES_MAX = 8
+_HANDLES_LOCK = threading.Lock()
+
+
+class SaveHandle:
+    """Save ya parseado por el bridge. `SaveHandle.open(path)` invoca el bridge una sola
+    vez por (ruta, mtime, modo); equipo, metadatos y cajas se leen bajo demanda y quedan
+    guardados en el handle, así un rerun parcial (st.fragment) no vuelve a abrir el .sav."""
+
+    def __init__(self, path: str, mtime_ns: int, mode: Optional[str], data: Dict[str, Any]) -> None:
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.mode = mode
+        self.data = data
+        self._team: Optional[List[Dict[str, Any]]] = None
+        self._box_meta: Optional[Tuple[int, List[str]]] = None
+        self._boxes: Dict[int, List[Dict[str, Any]]] = {}
+        self._has_pc: Optional[bool] = _pc_from_payload(data)
+        # Evita lanzar dos veces la misma lectura desde hilos distintos; las lecturas
+        # llevan la ruta explícita, así que handles distintos no se bloquean entre sí
+        self._lock = threading.RLock()
+
+    @classmethod
+    def open(cls, path: str | Path) -> "SaveHandle":
+        spath = str(Path(path))
+        mode = _current_mode()
+        key = (spath, os.stat(spath).st_mtime_ns, mode)
+        with _HANDLES_LOCK:
+            h = _HANDLES.get(key)
+            if h is not None:
+                _HANDLES.move_to_end(key)
+                return h
+        h = cls(spath, key[1], mode, PKHeXRuntime.open_sav(spath))
+        with _HANDLES_LOCK:
+            for old in [k for k in _HANDLES if k[0] == spath]:
+                _HANDLES.pop(old, None)
+            _HANDLES[key] = h
+            while len(_HANDLES) > _HANDLES_MAX:
+                _HANDLES.popitem(last=False)
+        return h
+
+    @property
+    def team(self) -> List[Dict[str, Any]]:
+        if self._team is None:
+            self._team = extract_team(self.data)
+        return self._team
+
+    def box_meta(self, max_probe: int = 3) -> Tuple[int, List[str]]:
+        with self._lock:
+            if self._box_meta is None:
+                self._box_meta = get_box_meta_quick(self.data, save_path=self.path, max_probe=max_probe)
+            return self._box_meta
+
+    @property
+    def has_pc(self) -> bool:
+        """Capacidad: el save tiene PC legible. Sale del JSON ya parseado o, si no lo
+        dice, de la caja 0 (normalmente ya leída por box_meta); se calcula una vez."""
+        with self._lock:
+            if self._has_pc is None:
+                self._has_pc = _pc_from_box0(_run_bridge_for_box(0, self.path))
+            return self._has_pc
+
+    def box(self, box_index: int) -> List[Dict[str, Any]]:
+        i = int(box_index)
+        with self._lock:
+            if i not in self._boxes:
+                self._boxes[i] = extract_box(self.data, i, save_path=self.path) or []
+            return self._boxes[i]
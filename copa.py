@@ -201,7 +201,8 @@ def _view_paste_card(player: str) -> None:
         moves = mon.get("moves") or []
         try:
             from showdown_sprites import showdown_sprite_url  # lazy import to avoid circulars
-            img = showdown_sprite_url(species_name=str(sp), prefer_animated=False)
+            from sprite_cache import sprite_image
+            img = sprite_image(showdown_sprite_url(species_name=str(sp), prefer_animated=False))
         except Exception:
             img = None
         with st.container():
@@ -215,6 +216,11 @@ def _view_paste_card(player: str) -> None:
                     st.caption(f"Habilidad: {ability}")
                 if moves:
                     st.markdown("\n".join([f"- {m}" for m in moves]))
+    try:
+        from ui_enhanced import type_profile_ui  # lazy import to avoid circulars
+        type_profile_ui(team)
+    except Exception:
+        pass
 
 
 def _render_matchups_tab(S) -> None:
@@ -0,0 +1,159 @@
+"""
+Calculadora de daño Gen 4 vectorizada (NumPy, sin Streamlit).
+
+`damage_matrix(atacantes, defensores)` calcula de una vez el daño de cada
+movimiento de cada atacante contra cada defensor: matriz (A, 4, D, 16) con las 16
+tiradas aleatorias (85..100). Fórmula de DPPt/HGSS con separación física/especial,
+STAB y efectividad de la tabla Gen 4 (typechart.CHART_GEN4) aplicando el redondeo
+por tipo del defensor; no contempla objetos, habilidades, clima, críticos ni
+movimientos de daño fijo/variable.
+
+Los resultados se memorizan por huella de ambos equipos (especie/forma, nivel,
+naturaleza, IVs/EVs y movimientos).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import statcalc
+from typechart import CHART_GEN4, TYPE_INDEX, TYPES
+
+MAX_MOVES = 4
+ROLLS = np.arange(85, 101, dtype=np.int64)  # 16 tiradas
+NO_TYPE = len(TYPES)
+
+# Efectividad en mitades (0, 1, 2, 4) con fila/columna extra "sin tipo" = x1
+_CHART2 = np.full((len(TYPES) + 1, len(TYPES) + 1), 2, dtype=np.int64)
+_CHART2[: len(TYPES), : len(TYPES)] = (CHART_GEN4 * 2).astype(np.int64)
+_CHART2.setflags(write=False)
+
+
+def damage_arrays(levels: np.ndarray, atk: np.ndarray, spa: np.ndarray,
+                  power: np.ndarray, special: np.ndarray, move_type: np.ndarray, stab: np.ndarray,
+                  def_: np.ndarray, spd: np.ndarray, def_types: np.ndarray) -> np.ndarray:
+    """Núcleo vectorizado. Formas: levels/atk/spa (A,), power/special/move_type/stab (A,M),
+    def_/spd (D,), def_types (D,2) con NO_TYPE como relleno. Devuelve (A,M,D,16) int64;
+    0 donde el movimiento no hace daño (potencia 0) o el defensor es inmune."""
+    lv = np.asarray(levels, dtype=np.int64)[:, None, None]
+    power = np.asarray(power, dtype=np.int64)
+    special = np.asarray(special, dtype=bool)
+    a_stat = np.where(special, np.asarray(spa, dtype=np.int64)[:, None], np.asarray(atk, dtype=np.int64)[:, None])
+    d_stat = np.where(special[:, :, None], np.asarray(spd, dtype=np.int64)[None, None, :],
+                      np.asarray(def_, dtype=np.int64)[None, None, :])
+    d_stat = np.maximum(d_stat, 1)
+    base = ((2 * lv // 5 + 2) * power[:, :, None] * a_stat[:, :, None] // d_stat) // 50 + 2
+    dmg = base[..., None] * ROLLS // 100
+    dmg = np.where(np.asarray(stab, dtype=bool)[:, :, None, None], dmg * 3 // 2, dmg)
+    mt = np.asarray(move_type, dtype=np.intp)[:, :, None]
+    dt = np.asarray(def_types, dtype=np.intp)
+    e1 = _CHART2[mt, dt[None, None, :, 0]]
+    e2 = _CHART2[mt, dt[None, None, :, 1]]
+    dmg = dmg * e1[..., None] // 2
+    dmg = dmg * e2[..., None] // 2
+    hits = (power[:, :, None] > 0) & (e1 > 0) & (e2 > 0)
+    return np.where(hits[..., None], np.maximum(dmg, 1), 0)
+
+
+def _mon_fp(p: dict) -> Optional[Tuple]:
+    species = p.get("species_name") or p.get("species")
+    if not species:
+        return None
+    fi = p.get("form_index")
+    ivs = p.get("ivs") or {}
+    evs = p.get("evs") or {}
+    return (
+        str(species), fi if isinstance(fi, int) else None, p.get("form_name"), p.get("gender"),
+        tuple(str(m) for m in (p.get("moves") or []) if m)[:MAX_MOVES],
+        statcalc._to_int(p.get("level") or 50, 50), str(p.get("nature") or ""),
+        tuple(statcalc._to_int(ivs.get(k)) for k in statcalc.STAT_KEYS),
+        tuple(statcalc._to_int(evs.get(k)) for k in statcalc.STAT_KEYS),
+    )
+
+
+def team_fingerprint(team: Sequence[dict]) -> Tuple:
+    return tuple(k for k in (_mon_fp(p) for p in team if isinstance(p, dict)) if k)
+
+
+def _mon_from_fp(fp: Tuple) -> Dict[str, Any]:
+    species, fi, fname, gender, moves, level, nature, ivs, evs = fp
+    return {
+        "species": species, "form_index": fi, "form_name": fname, "gender": gender,
+        "moves": list(moves), "level": level, "nature": nature,
+        "ivs": dict(zip(statcalc.STAT_KEYS, ivs)), "evs": dict(zip(statcalc.STAT_KEYS, evs)),
+    }
+
+
+def _types_of(p: dict) -> List[int]:
+    from dexdata import species_types
+    try:
+        types = species_types(species_name=p["species"], form_index=p["form_index"],
+                              form_name=p["form_name"], gender=p["gender"])
+    except Exception:
+        types = []
+    return [TYPE_INDEX[t] for t in types if t in TYPE_INDEX][:2]
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+@lru_cache(maxsize=128)
+def _matrix(fp_a: Tuple, fp_d: Tuple) -> Dict[str, Any]:
+    from dexdata import move_info
+    atk_mons = [_mon_from_fp(f) for f in fp_a]
+    def_mons = [_mon_from_fp(f) for f in fp_d]
+    a_stats, a_ok = statcalc.batch_stats(atk_mons)
+    d_stats, d_ok = statcalc.batch_stats(def_mons)
+    n_a, n_d = len(atk_mons), len(def_mons)
+
+    power = np.zeros((n_a, MAX_MOVES), dtype=np.int64)
+    special = np.zeros((n_a, MAX_MOVES), dtype=bool)
+    move_type = np.full((n_a, MAX_MOVES), NO_TYPE, dtype=np.intp)
+    stab = np.zeros((n_a, MAX_MOVES), dtype=bool)
+    move_names = [[None] * MAX_MOVES for _ in range(n_a)]
+    for i, p in enumerate(atk_mons):
+        own = set(_types_of(p))
+        for j, mv in enumerate(p["moves"][:MAX_MOVES]):
+            info = move_info(mv) or {}
+            move_names[i][j] = info.get("name") or mv
+            t = TYPE_INDEX.get(str(info.get("type") or "").title())
+            cat = info.get("category")
+            if t is None or cat not in ("Physical", "Special") or not a_ok[i]:
+                continue
+            power[i, j] = statcalc._to_int(info.get("power"))
+            special[i, j] = cat == "Special"
+            move_type[i, j] = t
+            stab[i, j] = t in own
+    def_types = np.full((n_d, 2), NO_TYPE, dtype=np.intp)
+    for k, p in enumerate(def_mons):
+        ids = _types_of(p)
+        def_types[k, : len(ids)] = ids
+    rolls = damage_arrays(
+        np.array([p["level"] for p in atk_mons], dtype=np.int64),
+        a_stats[:, 1], a_stats[:, 3], power, special, move_type, stab,
+        d_stats[:, 2], d_stats[:, 4], def_types,
+    )
+    rolls[:, :, ~d_ok, :] = 0
+    hp = np.maximum(d_stats[:, 0].astype(np.int64), 1)
+    lo, hi = rolls[..., 0], rolls[..., -1]
+    return {
+        "attackers": tuple(p["species"] for p in atk_mons),
+        "defenders": tuple(p["species"] for p in def_mons),
+        "moves": tuple(tuple(r) for r in move_names),
+        "rolls": _readonly(rolls),
+        "min": _readonly(lo),
+        "max": _readonly(hi),
+        "hp": _readonly(np.where(d_ok, hp, 0)),
+        "min_pct": _readonly(np.round(lo * 100.0 / hp, 1)),
+        "max_pct": _readonly(np.round(hi * 100.0 / hp, 1)),
+    }
+
+
+def damage_matrix(attackers: Sequence[dict], defenders: Sequence[dict]) -> Dict[str, Any]:
+    """Daño de todos los movimientos de `attackers` contra todos los `defenders`.
+    Arrays de sólo lectura: rolls (A,4,D,16), min/max/min_pct/max_pct (A,4,D), hp (D,)."""
+    return _matrix(team_fingerprint(attackers), team_fingerprint(defenders))
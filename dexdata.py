@@ -8,16 +8,23 @@ No requiere dependencias externas: usa urllib. Persistencia opcional en disco
 para evitar depender siempre de red.
 """
 import json  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
 import time  # noqa: E402
 from pathlib import Path  # noqa: E402
-from typing import Dict, Any, Optional, List  # noqa: E402
-
-try:
-    import streamlit as st  # type: ignore
-except Exception:  # pragma: no cover - disponible sólo en runtime de app
-    st = None  # type: ignore
+from types import MappingProxyType  # noqa: E402
+from typing import Dict, Any, Optional, List, Mapping, Callable, Tuple, Iterable  # noqa: E402
 
 BASE_URL = "https://play.pokemonshowdown.com/data"
+# Sólo bloquea la primera carga sin copia en disco; las revalidaciones van en segundo plano
+SHOWDOWN_TIMEOUT = float(os.environ.get("SHOWDOWN_TIMEOUT", "10"))
+POKEAPI_BASE = os.environ.get("POKEAPI_BASE", "https://pokeapi.co/api/v2").rstrip("/")
+POKEAPI_TIMEOUT = float(os.environ.get("POKEAPI_TIMEOUT", "10"))
+PREFETCH_WORKERS = 8
+POKEAPI_RATE = float(os.environ.get("POKEAPI_RATE", "20"))  # peticiones/s máximo
+# Sin red: sólo se usan los datos importados (tools/import_offline_data.py) y la caché
+OFFLINE = os.environ.get("POKEAPP_OFFLINE", "").strip().lower() in ("1", "true", "yes")
 
 # Carpeta de datos persistentes (misma que storage.py usa para DB)
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
@@ -60,21 +67,25 @@ def _read_json(path: Path) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _write_json(path: Path, obj: Dict[str, Any]) -> None:
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Escribe en un temporal y lo renombra: un lector nunca ve el fichero a medias."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        path.write_text(json.dumps(obj), encoding="utf-8")
-    except Exception:
-        pass
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            try:
+                tmp.unlink()
+            except Exception:
+                pass
 
 
-def _fetch_json(url: str) -> Optional[Dict[str, Any]]:
+def _write_json(path: Path, obj: Dict[str, Any]) -> None:
     try:
-        import urllib.request
-        with urllib.request.urlopen(url, timeout=10) as resp:
-            data = resp.read().decode("utf-8")
-            return json.loads(data)
+        _write_atomic(path, json.dumps(obj).encode("utf-8"))
     except Exception:
-        return None
+        pass
 
 
 # ---------- PokeAPI helpers (ES names) ----------
@@ -87,37 +98,44 @@ def _slugify(name: str) -> str:
     return s
 
 
-MOVES_ES_CACHE_MEM: Dict[str, str] = {}
-ABILITIES_ES_CACHE_MEM: Dict[str, str] = {}
+def _cached_lookup(kind: str, key: str, fetch_fn) -> Optional[str]:
+    """Traducción vía translations.py (SQLite + memoria, con caché negativa)."""
+    import translations
+    if OFFLINE:
+        return translations.get(kind, key)[1]
+    return translations.lookup(kind, key, fetch_fn)
 
 
-def _cached_lookup(cache_file: Path, key: str, fetch_fn, *, mem_cache: Dict[str, str]) -> Optional[str]:
-    # Memoria primero
-    if key in mem_cache:
-        return mem_cache.get(key) or None
-    try:
-        cache = json.loads(cache_file.read_text(encoding="utf-8")) if cache_file.exists() else {}
-    except Exception:
-        cache = {}
-    if key in cache:
-        val = cache.get(key)
-        if isinstance(val, str) and val:
-            mem_cache[key] = val
-            return val
-        # si estaba None o vaco, reintentar fetch para evitar cachear fallos
-    try:
-        val = fetch_fn(key)
-    except Exception:
-        val = None
-    # Solo cachear si hay valor
-    if isinstance(val, str) and val:
-        cache[key] = val
-        mem_cache[key] = val
+_RATE_LOCK = threading.Lock()
+_RATE_NEXT = 0.0
+
+
+def _rate_limit() -> None:
+    """Espacia las peticiones a PokeAPI a como mucho POKEAPI_RATE por segundo."""
+    global _RATE_NEXT
+    if POKEAPI_RATE <= 0:
+        return
+    with _RATE_LOCK:
+        now = time.monotonic()
+        slot = max(now, _RATE_NEXT)
+        _RATE_NEXT = slot + 1.0 / POKEAPI_RATE
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _fetch_name_es(resource: str, slug: str) -> Optional[str]:
+    """Nombre en español de /move/<slug> o /ability/<slug> en PokeAPI."""
+    _rate_limit()
     try:
-        cache_file.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+        import urllib.request
+        with urllib.request.urlopen(f"{POKEAPI_BASE}/{resource}/{slug}/", timeout=POKEAPI_TIMEOUT) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        for n in data.get("names", []):
+            if n and n.get("language", {}).get("name") == "es":
+                return n.get("name")
     except Exception:
-        pass
-    return val
+        return None
+    return None
 
 
 FALLBACK_MOVES_ES = {
@@ -148,23 +166,8 @@ def move_name_es(name_en: str) -> str:
     slug = _slugify(name_en)
     if slug in FALLBACK_MOVES_ES:
         return FALLBACK_MOVES_ES[slug]
-    cache_file = DATA_DIR / "moves_es_cache.json"
 
-    def fetch(slug_: str) -> Optional[str]:
-        url = f"https://pokeapi.co/api/v2/move/{slug_}/"
-        try:
-            import urllib.request
-            import json as _json
-            with urllib.request.urlopen(url, timeout=10) as resp:
-                data = _json.loads(resp.read().decode("utf-8"))
-            for n in data.get("names", []):
-                if n and n.get("language", {}).get("name") == "es":
-                    return n.get("name")
-        except Exception:
-            return None
-        return None
-
-    val = _cached_lookup(cache_file, slug, fetch, mem_cache=MOVES_ES_CACHE_MEM)
+    val = _cached_lookup("move", slug, lambda s: _fetch_name_es("move", s))
     return val or name_en
 
 
@@ -186,75 +189,272 @@ def ability_name_es(name_en: str) -> str:
     slug = _slugify(name_en)
     if slug in FALLBACK_ABILITIES_ES:
         return FALLBACK_ABILITIES_ES[slug]
-    cache_file = DATA_DIR / "abilities_es_cache.json"
 
-    def fetch(slug_: str) -> Optional[str]:
-        url = f"https://pokeapi.co/api/v2/ability/{slug_}/"
-        try:
-            import urllib.request
-            import json as _json
-            with urllib.request.urlopen(url, timeout=10) as resp:
-                data = _json.loads(resp.read().decode("utf-8"))
-            for n in data.get("names", []):
-                if n and n.get("language", {}).get("name") == "es":
-                    return n.get("name")
-        except Exception:
-            return None
-        return None
-
-    val = _cached_lookup(cache_file, slug, fetch, mem_cache=ABILITIES_ES_CACHE_MEM)
+    val = _cached_lookup("ability", slug, lambda s: _fetch_name_es("ability", s))
     return val or name_en
 
 
-def _load_dataset(name: str) -> Dict[str, Any]:
-    """Carga dataset `name` de Showdown con caché a disco y opcionalmente cacheo en memoria de Streamlit."""
+def species_name_es(name_en: str) -> str:
+    """Nombre de especie en español; sólo con datos importados (no consulta PokeAPI)."""
+    if not name_en:
+        return "-"
+    import translations
+    return translations.get("species", _slugify(name_en))[1] or name_en
+
+
+def prefetch_names_es(*, moves: Iterable[str] = (), abilities: Iterable[str] = ()) -> Dict[str, int]:
+    """Traduce de una vez todos los movimientos/habilidades que se van a pintar: los que
+    no estén en caché se piden a PokeAPI en paralelo (PREFETCH_WORKERS hilos, con
+    límite de ritmo). Después, move_name_es/ability_name_es sólo leen memoria."""
+    import translations
+    from concurrent.futures import ThreadPoolExecutor
+    if OFFLINE:
+        return {"fetched": 0, "found": 0}
+    todo: Dict[Tuple[str, str], str] = {}
+    for kind, resource, names, fallback in (
+        ("move", "move", moves, FALLBACK_MOVES_ES),
+        ("ability", "ability", abilities, FALLBACK_ABILITIES_ES),
+    ):
+        for name in names or ():
+            if not name:
+                continue
+            slug = _slugify(str(name))
+            if slug in fallback or (kind, slug) in todo:
+                continue
+            if translations.get(kind, slug)[0]:
+                continue
+            todo[(kind, slug)] = resource
+    found = 0
+    if todo:
+        def work(item: Tuple[Tuple[str, str], str]) -> bool:
+            (kind, slug), resource = item
+            val = _fetch_name_es(resource, slug)
+            translations.put(kind, slug, val)
+            return bool(val)
+
+        with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(todo)),
+                                thread_name_prefix="pokeapi") as pool:
+            found = sum(1 for ok in pool.map(work, todo.items()) if ok)
+        translations.flush()
+    return {"fetched": len(todo), "found": found}
+
+
+def _dataset_expired(name: str) -> bool:
+    try:
+        ts = int((DATA_DIR / f"ps_{name}.stamp").read_text())
+        return (_now() - ts) > CACHE_TTL
+    except Exception:
+        return True
+
+
+def _touch_stamp(name: str) -> None:
+    try:
+        _write_atomic(DATA_DIR / f"ps_{name}.stamp", str(_now()).encode("ascii"))
+    except Exception:
+        pass
+
+
+def _revalidate_dataset(name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """GET condicional (If-None-Match / If-Modified-Since) del dataset en Showdown.
+    Devuelve ('ok', obj) con datos nuevos ya escritos en disco, ('not_modified', None)
+    si el servidor responde 304, o ('error', None). El stamp sólo avanza si hubo respuesta."""
+    if OFFLINE:
+        return "error", None
+    import urllib.error
+    import urllib.request
     cache_file = DATA_DIR / f"ps_{name}.json"
-    stamp_file = DATA_DIR / f"ps_{name}.stamp"
+    meta_file = DATA_DIR / f"ps_{name}.meta.json"
+    meta = (_read_json(meta_file) or {}) if cache_file.exists() else {}
+    req = urllib.request.Request(f"{BASE_URL}/{name}.json")
+    if meta.get("etag"):
+        req.add_header("If-None-Match", meta["etag"])
+    if meta.get("last_modified"):
+        req.add_header("If-Modified-Since", meta["last_modified"])
+    try:
+        with urllib.request.urlopen(req, timeout=SHOWDOWN_TIMEOUT) as resp:
+            raw = resp.read()
+            headers = resp.headers
+        obj = json.loads(raw.decode("utf-8"))
+        if not isinstance(obj, dict) or not obj:
+            return "error", None
+        _write_atomic(cache_file, raw)
+        _write_json(meta_file, {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        })
+        _touch_stamp(name)
+        return "ok", obj
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            _touch_stamp(name)
+            return "not_modified", None
+        return "error", None
+    except Exception:
+        return "error", None
 
-    def expired() -> bool:
-        try:
-            ts = int(stamp_file.read_text())
-            return (_now() - ts) > CACHE_TTL
-        except Exception:
-            return True
+
+def _load_dataset(name: str) -> Dict[str, Any]:
+    """Carga dataset `name` de Showdown: copia en disco si está vigente; si no, GET
+    condicional y, si falla o no hay cambios, la copia en disco aunque esté caducada."""
+    cache_file = DATA_DIR / f"ps_{name}.json"
 
     # Intenta cache en disco
-    if cache_file.exists() and not expired():
+    if cache_file.exists() and not _dataset_expired(name):
         obj = _read_json(cache_file) or {}
         if obj:
             return obj
 
-    # Descarga
-    url = f"{BASE_URL}/{name}.json"
-    obj = _fetch_json(url) or {}
-    if obj:
-        _write_json(cache_file, obj)
-        try:
-            stamp_file.write_text(str(_now()))
-        except Exception:
-            pass
+    status, obj = _revalidate_dataset(name)
+    if status == "ok" and obj:
         return obj
 
     # Fallback a lo que hubiera en disco aunque esté expirado
     return _read_json(cache_file) or {}
 
 
-def pokedex_data() -> Dict[str, Any]:
-    if st is not None:
-        @st.cache_data(show_spinner=False)
-        def _load() -> Dict[str, Any]:
-            return _load_dataset("pokedex")
-        return _load()
-    return _load_dataset("pokedex")
+# ---------- Registro de datasets (una carga por proceso) ----------
+# {nombre: (caduca_en, vista de sólo lectura)}. Las lecturas no toman el lock: el
+# valor se sustituye entero cuando una recarga en segundo plano termina.
+_DATASETS: Dict[str, Tuple[float, Mapping[str, Any]]] = {}
+_DATASET_LOCK = threading.Lock()
+_DATASET_REFRESHING: set[str] = set()
+_DATASET_LOAD_LOCKS: Dict[str, threading.Lock] = {}
+_DATASET_METRICS: Dict[str, Dict[str, Any]] = {}
+_METRICS_HOOK: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
+
+def set_dataset_metrics_hook(fn: Optional[Callable[[str, Dict[str, Any]], None]]) -> None:
+    """Registra `fn(nombre, métricas)` para cada carga de dataset (None para quitarlo)."""
+    global _METRICS_HOOK
+    _METRICS_HOOK = fn
+
+
+def dataset_metrics() -> Dict[str, Dict[str, Any]]:
+    """Última carga de cada dataset: segundos, entradas, bytes aproximados en memoria."""
+    with _DATASET_LOCK:
+        return {k: dict(v) for k, v in _DATASET_METRICS.items()}
+
+
+def _deep_sizeof(obj: Any) -> int:
+    seen: set[int] = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+    return total
+
+
+def _stamp_expiry(name: str) -> float:
+    try:
+        return int((DATA_DIR / f"ps_{name}.stamp").read_text()) + CACHE_TTL
+    except Exception:
+        return 0.0
 
 
-def moves_data() -> Dict[str, Any]:
-    if st is not None:
-        @st.cache_data(show_spinner=False)
-        def _load() -> Dict[str, Any]:
-            return _load_dataset("moves")
-        return _load()
-    return _load_dataset("moves")
+def _install_dataset(name: str, obj: Dict[str, Any], t0: float, *, background: bool) -> Mapping[str, Any]:
+    view = MappingProxyType(obj)
+    metrics = {
+        "seconds": round(time.perf_counter() - t0, 4),
+        "entries": len(obj),
+        "bytes": _deep_sizeof(obj),
+        "loaded_at": _now(),
+        "background": background,
+    }
+    with _DATASET_LOCK:
+        # Sin stamp vigente (descarga fallida o modo offline) se reintenta como mucho cada hora
+        expiry = max(_stamp_expiry(name), _now() + 3600 if background else 0)
+        _DATASETS[name] = (expiry, view)
+        _DATASET_METRICS[name] = metrics
+    hook = _METRICS_HOOK
+    if hook is not None:
+        try:
+            hook(name, metrics)
+        except Exception:
+            pass
+    return view
+
+
+def _refresh_dataset(name: str) -> None:
+    """Revalidación en segundo plano: la vista en memoria sólo se sustituye si llega un
+    dataset nuevo y válido; con 304 se alarga la vigencia sin volver a parsear nada."""
+    try:
+        t0 = time.perf_counter()
+        status, obj = _revalidate_dataset(name)
+        if status == "ok" and obj:
+            _install_dataset(name, obj, t0, background=True)
+        else:
+            with _DATASET_LOCK:
+                ent = _DATASETS.get(name)
+                if ent is not None:
+                    expiry = _stamp_expiry(name) if status == "not_modified" else _now() + 3600
+                    _DATASETS[name] = (expiry, ent[1])
+    finally:
+        with _DATASET_LOCK:
+            _DATASET_REFRESHING.discard(name)
+
+
+def _dataset(name: str) -> Mapping[str, Any]:
+    """Vista de sólo lectura del dataset; se carga una vez por proceso. Si el stamp
+    ha caducado se sigue sirviendo la copia actual y se recarga en segundo plano."""
+    ent = _DATASETS.get(name)
+    if ent is not None:
+        if ent[0] < _now():
+            with _DATASET_LOCK:
+                start = name not in _DATASET_REFRESHING
+                _DATASET_REFRESHING.add(name)
+            if start:
+                threading.Thread(target=_refresh_dataset, args=(name,), daemon=True,
+                                 name=f"dexdata-{name}").start()
+        return ent[1]
+    with _DATASET_LOCK:
+        ent = _DATASETS.get(name)
+    if ent is not None:
+        return ent[1]
+    # Primera carga: el lock por dataset evita que varias sesiones lean el JSON a la vez
+    with _dataset_load_lock(name):
+        ent = _DATASETS.get(name)
+        if ent is not None:
+            return ent[1]
+        t0 = time.perf_counter()
+        # Copia en disco aunque esté caducada: arranca sin red y se refresca luego
+        obj = _read_json(DATA_DIR / f"ps_{name}.json") or _load_dataset(name)
+        return _install_dataset(name, obj, t0, background=False)
+
+
+def _dataset_load_lock(name: str) -> threading.Lock:
+    with _DATASET_LOCK:
+        return _DATASET_LOAD_LOCKS.setdefault(name, threading.Lock())
+
+
+def import_dataset(name: str, obj: Dict[str, Any]) -> Mapping[str, Any]:
+    """Instala un dataset de Showdown traído de un fichero local (como si se hubiera
+    descargado ahora): copia en disco, stamp nuevo y vista en el registro."""
+    t0 = time.perf_counter()
+    _write_json(DATA_DIR / f"ps_{name}.json", obj)
+    _touch_stamp(name)
+    try:
+        # Sin ETag/Last-Modified: la siguiente revalidación descarga completo
+        (DATA_DIR / f"ps_{name}.meta.json").unlink()
+    except Exception:
+        pass
+    return _install_dataset(name, obj, t0, background=False)
+
+
+def pokedex_data() -> Mapping[str, Any]:
+    return _dataset("pokedex")
+
+
+def moves_data() -> Mapping[str, Any]:
+    return _dataset("moves")
 
 
 def _to_data_key(showdown_id: str) -> str:
@@ -262,30 +462,63 @@ def _to_data_key(showdown_id: str) -> str:
     return showdown_id.replace("-", "").lower()
 
 
-def species_types(*, species_name: str, form_index: Optional[int] = None,
-                  form_name: Optional[str] = None, gender: Optional[str] = None) -> List[str]:
-    """Devuelve [Tipo1, Tipo2?] usando Pokédex de Showdown. Usa forma si aplica."""
+def _species_entry(species_name: str, form_index: Optional[int], form_name: Optional[str],
+                   gender: Optional[str], field: str) -> Any:
+    """Busca `field` ('types' o 'base_stats') en la tabla precalculada de especies/formas;
+    si no está, en el índice compilado o el Pokédex JSON (probando también la especie base)."""
+    import speciestable
+    row = speciestable.lookup(species_name=species_name, form_index=form_index,
+                              form_name=form_name, gender=gender)
+    if row is not None:
+        val = row.types if field == "types" else row.stats_dict()
+        if val:
+            return val
     from showdown_sprites import showdown_id  # evitar ciclos en import
+    import dexindex
     sid = showdown_id(species_name=species_name, form_index=form_index, form_name=form_name, gender=gender)
-    key = _to_data_key(sid)
-    pdx = pokedex_data()
-    entry = pdx.get(key) or {}
-    types = entry.get("types") or []
+    keys = [_to_data_key(sid)]
     # A veces las formas no están; intenta base sin forma
-    if not types and "-" in sid:
-        base = sid.split("-", 1)[0]
-        entry = pdx.get(_to_data_key(base)) or {}
-        types = entry.get("types") or []
+    if "-" in sid:
+        keys.append(_to_data_key(sid.split("-", 1)[0]))
+    if dexindex.available():
+        for key in keys:
+            entry = dexindex.species_entry(key) or {}
+            if entry.get(field):
+                return entry[field]
+        return None
+    pdx = pokedex_data()
+    src = "baseStats" if field == "base_stats" else field
+    for key in keys:
+        val = (pdx.get(key) or {}).get(src)
+        if val:
+            return val
+    return None
+
+
+def species_types(*, species_name: str, form_index: Optional[int] = None,
+                  form_name: Optional[str] = None, gender: Optional[str] = None) -> List[str]:
+    """Devuelve [Tipo1, Tipo2?] usando Pokédex de Showdown. Usa forma si aplica."""
+    types = _species_entry(species_name, form_index, form_name, gender, "types") or []
     # Normaliza a lista de títulos capitalizados
     return [str(t).title() for t in types]
 
 
+def base_stats(*, species_name: str, form_index: Optional[int] = None,
+               form_name: Optional[str] = None, gender: Optional[str] = None) -> Dict[str, int]:
+    """Stats base {'hp','atk','def','spa','spd','spe'} de la especie/forma ({} si no hay datos)."""
+    bs = _species_entry(species_name, form_index, form_name, gender, "base_stats") or {}
+    return dict(bs)
+
+
 def move_info(move_name: str) -> Optional[Dict[str, Any]]:
     if not move_name:
         return None
+    import dexindex
     key = move_name.strip().lower().replace(" ", "").replace("-", "")
-    md = moves_data()
-    entry = md.get(key)
+    if dexindex.available():
+        entry = dexindex.move_entry(key)
+    else:
+        entry = moves_data().get(key)
     if not entry:
         return None
     # Normaliza campos
@@ -0,0 +1,239 @@
+"""
+Índice compilado de la dex (SQLite de sólo lectura) a partir de los JSON de Showdown.
+
+Guarda sólo lo que usa la app: tipos y stats base por especie/forma y los campos
+de movimientos que muestra `move_info`. Se construye con tools/build_dex_index.py
+y se abre en modo read-only con mmap, así que el arranque no parsea ningún JSON y
+cada consulta es una búsqueda por clave primaria.
+
+Cada reconstrucción escribe un fichero nuevo (dex_index.<ns>.sqlite) y después
+apunta a él en dex_index.current: nunca se reemplaza un fichero que un lector
+tenga abierto (en Windows os.replace sobre un fichero abierto falla). Las
+versiones antiguas se borran cuando ya nadie las usa.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from dexdata import DATA_DIR
+
+INDEX_PATH = DATA_DIR / "dex_index.sqlite"
+INDEX_VERSION = 2
+MMAP_SIZE = 64 * 1024 * 1024
+# Sin índice (instalación por defecto) no se vuelve a mirar el disco en cada consulta:
+# sólo tras reconstruir (_GEN) o pasados estos segundos (lo puede crear otro proceso)
+MISSING_RECHECK = 5.0
+
+STAT_KEYS = ("hp", "atk", "def", "spa", "spd", "spe")
+
+_LOCAL = threading.local()
+_GEN = 0  # se incrementa al reconstruir para que cada hilo reabra su conexión
+_MISSING: Optional[tuple] = None  # (_GEN, instante monotonic) del último intento sin índice válido
+
+
+def _pointer(path: Path) -> Path:
+    return path.with_suffix(".current")
+
+
+def _resolve(path: Path) -> Optional[Path]:
+    """Fichero vigente del índice `path` (o el propio `path` si es uno anterior al versionado)."""
+    try:
+        name = _pointer(path).read_text(encoding="utf-8").strip()
+        if name and (path.parent / name).is_file():
+            return path.parent / name
+    except Exception:
+        pass
+    return path if path.is_file() else None
+
+
+def _prune(path: Path, keep: Path) -> None:
+    """Borra versiones antiguas; si alguna sigue abierta (Windows) se reintenta en la próxima."""
+    for old in [path, *path.parent.glob(f"{path.stem}.*{path.suffix}")]:
+        if old != keep:
+            try:
+                old.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    cx = getattr(_LOCAL, "cx", None)
+    if cx is not None and getattr(_LOCAL, "gen", -1) == _GEN:
+        return cx
+    if cx is not None:
+        try:
+            cx.close()
+        except Exception:
+            pass
+        _LOCAL.cx = None
+    global _MISSING
+    miss = _MISSING
+    if miss is not None and miss[0] == _GEN and time.monotonic() - miss[1] < MISSING_RECHECK:
+        return None
+    gen = _GEN
+    current = _resolve(INDEX_PATH)
+    cx = None
+    if current is not None:
+        try:
+            cx = sqlite3.connect(f"file:{current.as_posix()}?mode=ro", uri=True)
+            cx.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            row = cx.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+            if not row or int(row[0]) != INDEX_VERSION:
+                cx.close()
+                cx = None
+        except Exception:
+            cx = None
+    if cx is None:
+        _MISSING = (gen, time.monotonic())
+        return None
+    _MISSING = None
+    _LOCAL.cx = cx
+    _LOCAL.gen = _GEN
+    return cx
+
+
+def close() -> None:
+    """Cierra la conexión de este hilo (se reabre en la próxima consulta)."""
+    cx = getattr(_LOCAL, "cx", None)
+    _LOCAL.cx = None
+    if cx is not None:
+        try:
+            cx.close()
+        except Exception:
+            pass
+
+
+def available() -> bool:
+    return _connect() is not None
+
+
+def build_index(pokedex: Mapping[str, Any], moves: Mapping[str, Any], path: Path | None = None) -> Dict[str, Any]:
+    """Compila los datasets a una versión nueva de `path` (por defecto INDEX_PATH) y la
+    activa de forma atómica (ver docstring del módulo)."""
+    from dexdata import _write_atomic
+    global _GEN
+    path = Path(path or INDEX_PATH)
+    target = path.with_name(f"{path.stem}.{time.time_ns()}{path.suffix}")
+    tmp = target.with_suffix(".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    t0 = time.perf_counter()
+    species_rows = []
+    for key, e in pokedex.items():
+        if not isinstance(e, dict):
+            continue
+        types = list(e.get("types") or [])
+        bs = e.get("baseStats") or {}
+        species_rows.append((
+            key, e.get("num"), e.get("name"), e.get("baseSpecies"), e.get("forme"),
+            types[0] if types else None, types[1] if len(types) > 1 else None,
+            *[bs.get(k) for k in STAT_KEYS],
+        ))
+    move_rows = []
+    for key, e in moves.items():
+        if not isinstance(e, dict):
+            continue
+        acc = e.get("accuracy")
+        move_rows.append((
+            key, e.get("name"), e.get("type"), e.get("category"), e.get("basePower"),
+            None if acc is True else acc, 1 if acc is True else 0, e.get("pp"),
+        ))
+    from speciestable import form_rows
+    forms = form_rows(pokedex)
+    cx = sqlite3.connect(tmp)
+    try:
+        cx.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+            CREATE TABLE species (
+                key TEXT PRIMARY KEY, num INTEGER, name TEXT, base_species TEXT, forme TEXT,
+                type1 TEXT, type2 TEXT,
+                hp INTEGER, atk INTEGER, def INTEGER, spa INTEGER, spd INTEGER, spe INTEGER
+            ) WITHOUT ROWID;
+            CREATE TABLE moves (
+                key TEXT PRIMARY KEY, name TEXT, type TEXT, category TEXT,
+                power INTEGER, accuracy INTEGER, always_hits INTEGER, pp INTEGER
+            ) WITHOUT ROWID;
+            CREATE TABLE forms (
+                base_id TEXT, num INTEGER, form_index INTEGER, forme_id TEXT, female INTEGER,
+                key TEXT, sprite_id TEXT
+            );
+        """)
+        cx.executemany("INSERT INTO species VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)", species_rows)
+        cx.executemany("INSERT INTO moves VALUES(?,?,?,?,?,?,?,?)", move_rows)
+        cx.executemany("INSERT INTO forms VALUES(?,?,?,?,?,?,?)", forms)
+        cx.executemany("INSERT INTO meta VALUES(?,?)", [
+            ("version", str(INDEX_VERSION)),
+            ("built_at", str(int(time.time()))),
+        ])
+        cx.commit()
+        cx.execute("VACUUM")
+    finally:
+        cx.close()
+    os.replace(tmp, target)
+    _write_atomic(_pointer(path), target.name.encode("utf-8"))
+    if path == INDEX_PATH:
+        _GEN += 1
+        close()
+    _prune(path, target)
+    return {
+        "path": str(target),
+        "species": len(species_rows),
+        "moves": len(move_rows),
+        "forms": len(forms),
+        "bytes": target.stat().st_size,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def species_entry(key: str) -> Optional[Dict[str, Any]]:
+    """{'name','types','base_stats'} de la clave de dataset (p. ej. 'rotomheat') o None."""
+    cx = _connect()
+    if cx is None or not key:
+        return None
+    row = cx.execute(
+        "SELECT name, type1, type2, hp, atk, def, spa, spd, spe FROM species WHERE key=?",
+        (key,),
+    ).fetchone()
+    if not row:
+        return None
+    return {
+        "name": row[0],
+        "types": [t for t in row[1:3] if t],
+        "base_stats": {k: v for k, v in zip(STAT_KEYS, row[3:]) if v is not None},
+    }
+
+
+def move_entry(key: str) -> Optional[Dict[str, Any]]:
+    """Campos de movimiento con los mismos nombres que el JSON de Showdown."""
+    cx = _connect()
+    if cx is None or not key:
+        return None
+    row = cx.execute(
+        "SELECT name, type, category, power, accuracy, always_hits, pp FROM moves WHERE key=?",
+        (key,),
+    ).fetchone()
+    if not row:
+        return None
+    return {
+        "name": row[0],
+        "type": row[1],
+        "category": row[2],
+        "basePower": row[3],
+        "accuracy": True if row[5] else row[4],
+        "pp": row[6],
+    }
+
+
+def form_rows() -> Optional[List[tuple]]:
+    """Filas de la tabla especie/forma (ver speciestable.form_rows) o None sin índice."""
+    cx = _connect()
+    if cx is None:
+        return None
+    return cx.execute(
+        "SELECT base_id, num, form_index, forme_id, female, key, sprite_id FROM forms"
+    ).fetchall()
@@ -9,20 +9,26 @@ from urllib.parse import urlparse
 import streamlit as st
 
 from showdown_sprites import showdown_sprite_url
+from sprite_cache import sprite_src, sprite_image, prefetch as prefetch_sprites
+from sprite_atlas import box_atlas
+from box_grid import box_grid, box_slot, atlas_sheet
 from i18n import nature_display_es, translate_types_es, translate_type_es
-from dexdata import move_name_es, ability_name_es
+from dexdata import move_name_es, ability_name_es, prefetch_names_es
 from dexdata import species_types, move_info, type_color, showdown_export
 from ui_enhanced import team_grid_ui as _team_grid_ui_enhanced
-from utils import USERS, DEFAULT_DLL_HINT, list_user_saves
+from ui_enhanced import type_profile_ui as _type_profile_ui
+from utils import USERS, DEFAULT_DLL_HINT, latest_user_save
 from storage import get_flags_by_fingerprints, list_inventory
 from pkmmeta import pokemon_fingerprint
+from snapshots import snapshot_for
 from conex_pkhex import (
-    PKHeXRuntime, extract_team, extract_box, has_pc_data, get_bridge_path, get_box_meta_quick
+    PKHeXRuntime, SaveHandle, extract_team, extract_box, has_pc_data, get_bridge_path
 )
 
 # TamaÂ±os y ajustes
 TEAM_IMG_W = 88
 BOX_IMG_W = 56
+BOX_SLOTS = 30
 DETAIL_IMG_W = 112
 TOTAL_BOXES = 18  # valor por defecto/fallback
 
@@ -119,7 +125,7 @@ def _pokepaste_preview(paste: dict | None) -> None:
         item = mon.get("item")
         ability = mon.get("ability")
         moves = mon.get("moves") or []
-        img = showdown_sprite_url(species_name=str(sp), prefer_animated=False)
+        img = sprite_image(showdown_sprite_url(species_name=str(sp), prefer_animated=False))
         with st.container():
             cols = st.columns([1, 3])
             with cols[0]:
@@ -130,6 +136,7 @@ def _pokepaste_preview(paste: dict | None) -> None:
                     st.caption(f"Habilidad: {ability}")
                 if moves:
                     st.markdown("\n".join([f"- {m}" for m in moves]))
+    _type_profile_ui(team, title="Análisis de tipos (Pokepaste)")
 
 # Helpers de cajas para manejar Gen3/Gen4
 def _resolve_total_boxes(box_count: int, box_names: List[str]) -> int:
@@ -315,6 +322,11 @@ def _url_official_art_by_id(dex_id: int) -> str:
 
 
 def _sprite_url_from_p(p: dict, *, prefer_animated: bool = True) -> str:
+    """Sprite para HTML: data URI de la caché local o, si aún no está, la URL remota."""
+    return sprite_src(_sprite_remote_url(p, prefer_animated=prefer_animated))
+
+
+def _sprite_remote_url(p: dict, *, prefer_animated: bool = True) -> str:
     species_name = p.get("species_name") or p.get("species")
     if isinstance(species_name, str) and species_name.startswith("#") and species_name[1:].isdigit():
         species_name = None
@@ -367,89 +379,9 @@ def _extract_stats_from_p(p: dict) -> dict | None:
         if out and len(out) >= 3:
             return out
 
-        # 3) Calcularlas a partir de datos
-        species = p.get('species_name') or p.get('species')
-        if not species:
-            return None
-        # Datos base
-        try:
-            from dexdata import pokedex_data
-            from showdown_sprites import showdown_id  # evitar ciclos
-            sid = showdown_id(
-                species_name=species,
-                form_index=p.get('form_index'),
-                form_name=p.get('form_name'),
-                gender=p.get('gender'),
-            )
-            key = sid.replace('-', '').lower()
-            pdx = pokedex_data()
-            entry = pdx.get(key) or {}
-            if not entry and '-' in sid:
-                entry = pdx.get(sid.split('-', 1)[0].replace('-', '').lower()) or {}
-            bstats = entry.get('baseStats') or {}
-        except Exception:
-            bstats = {}
-        if not bstats:
-            return None
-
-        def _to_int(x, default=0):
-            try:
-                return int(x)
-            except Exception:
-                return default
-
-        level = _to_int(p.get('level') or 50, 50)
-        ivs = p.get('ivs') or {}
-        evs = p.get('evs') or {}
-
-        # Naturaleza
-        up = down = None
-        try:
-            from i18n import NATURES_ES
-            nat = p.get('nature')
-            key = str(nat or '').strip()
-            key_norm = key.lower().capitalize()
-            data = NATURES_ES.get(key) or NATURES_ES.get(key_norm)
-            if data:
-                _name, up_long, down_long = data
-                map_short = {
-                    'attack': 'atk',
-                    'special-attack': 'spa',
-                    'defense': 'def',
-                    'special-defense': 'spd',
-                    'speed': 'spe',
-                }
-                up = map_short.get(up_long)
-                down = map_short.get(down_long)
-        except Exception:
-            pass
-
-        def _nature_mult(stat_key: str) -> float:
-            if up and stat_key == up:
-                return 1.1
-            if down and stat_key == down:
-                return 0.9
-            return 1.0
-
-        def calc_hp(base, iv, ev) -> int:
-            return int(((2*base + iv + ev//4) * level) // 100 + level + 10)
-
-        def calc_other(base, iv, ev, mult) -> int:
-            val = int(((2*base + iv + ev//4) * level) // 100 + 5)
-            return int(val * mult)
-
-        res = {}
-        for k in ('hp','atk','def','spa','spd','spe'):
-            b = _to_int(bstats.get(k), None)
-            if b is None:
-                continue
-            iv = _to_int((ivs or {}).get(k), 0)
-            ev = _to_int((evs or {}).get(k), 0)
-            if k == 'hp':
-                res[k] = calc_hp(b, iv, ev)
-            else:
-                res[k] = calc_other(b, iv, ev, _nature_mult(k))
-        return res if res else None
+        # 3) Calcularlas a partir de datos (stats base + IVs/EVs + nivel + naturaleza)
+        from statcalc import stats_dicts
+        return stats_dicts([p])[0]
     except Exception:
         return None
 def _badge_row(level: int | str | None, is_shiny: bool, gender: str | None) -> str:
@@ -566,23 +498,36 @@ def _count_badges(sav_json: dict) -> int:
     return min(scan(sav_json), 8)
 
 
+def _all_trainers_types_ui() -> None:
+    """Perfil de tipos del equipo de cada entrenador (desde sus snapshots, sin bridge)."""
+    try:
+        from snapshots import snapshot_for
+        from ui_enhanced import trainers_type_overview_ui
+    except Exception:
+        return
+    teams = {}
+    for u in USERS.keys():
+        try:
+            snap = snapshot_for(u)
+        except Exception:
+            snap = None
+        teams[u] = list(snap.team or []) if snap else []
+    trainers_type_overview_ui(teams)
+
+
 def _trainer_summary_ui(sav_json: dict, box_count: int) -> None:
     """Monedas netas (liga+medallas Â¢Ã¢Â Â¢Ã¢Â¬Ã¢Â¢ compras), Puntos, Muertos, Medallas."""
     try:
         medallas = _count_badges(sav_json)
     except Exception:
         medallas = 0
-    monedas_badges = 3 * medallas
 
     jugador = st.session_state.get("trainer_selected") or st.session_state.get("user")
-    monedas_liga = coins_from_league(jugador or "")
-    bruto = monedas_badges + monedas_liga
     try:
-        from storage import total_spent
-        spent = total_spent(jugador or "")
+        from storage import get_balance
+        monedas = get_balance(jugador or "")["available"]  # saldo materializado (como la Tienda)
     except Exception:
-        spent = 0
-    monedas = max(bruto - spent, 0)
+        monedas = 0
 
     try:
         from liga_tabla import current_points_total
@@ -638,24 +583,21 @@ def _ensure_trainer_css() -> None:
     except Exception:
         pass
 
-def _trainer_summary_with_portrait_ui(sav_json: dict, box_count: int) -> None:
+def _trainer_summary_with_portrait_ui(sav_json: dict, box_count: int, snap=None, save_path: str | None = None) -> None:
     _ensure_trainer_css()
-    """Resumen con imagen del entrenador a la izquierda y KPIs a la derecha."""
+    """Resumen con imagen del entrenador a la izquierda y KPIs a la derecha.
+    Con `snap` (TrainerSnapshot) medallas y muertos salen del snapshot, sin bridge."""
     try:
-        medallas = _count_badges(sav_json)
+        medallas = snap.badges if snap is not None else _count_badges(sav_json)
     except Exception:
         medallas = 0
-    monedas_badges = 3 * medallas
 
     jugador = st.session_state.get("trainer_selected") or st.session_state.get("user")
-    monedas_liga = coins_from_league(jugador or "")
-    bruto = monedas_badges + monedas_liga
     try:
-        from storage import total_spent
-        spent = total_spent(jugador or "")
+        from storage import get_balance
+        monedas = get_balance(jugador or "")["available"]  # saldo materializado (como la Tienda)
     except Exception:
-        spent = 0
-    monedas = max(bruto - spent, 0)
+        monedas = 0
 
     try:
         from liga_tabla import current_points_total
@@ -663,12 +605,18 @@ def _trainer_summary_with_portrait_ui(sav_json: dict, box_count: int) -> None:
     except Exception:
         puntos = 0.0
 
-    box_index_muertos = _muertos_box_index(box_count)
-    try:
-        muertos_list = extract_box(sav_json, box_index_muertos) if box_count > box_index_muertos else []
-    except Exception:
-        muertos_list = []
-    muertos = len(muertos_list)
+    if snap is not None:
+        muertos = snap.muertos
+    else:
+        box_index_muertos = _muertos_box_index(box_count)
+        try:
+            muertos_list = (
+                extract_box(sav_json, box_index_muertos, save_path=save_path)
+                if box_count > box_index_muertos else []
+            )
+        except Exception:
+            muertos_list = []
+        muertos = len(muertos_list)
 
     colL, colR = st.columns([1, 3], gap="large")
     with colL:
@@ -701,6 +649,65 @@ def _trainer_summary_with_portrait_ui(sav_json: dict, box_count: int) -> None:
             st.markdown("</div>", unsafe_allow_html=True)
 
 
+def _prefetch_sprites(mons: List[dict], *, animated: bool) -> None:
+    """Descarga en segundo plano a data/sprites los sprites de `mons` que falten."""
+    try:
+        mons = [m for m in mons if isinstance(m, dict) and m]
+        prefetch_sprites(_sprite_remote_url(m, prefer_animated=animated) for m in mons)
+    except Exception:
+        pass
+
+
+def _box_atlas(save_path: str | None, box_index: int, box_list: List[dict]):
+    """Atlas de la caja (una sola hoja para sus sprites); None si aún faltan sprites
+    en disco (se pintan sueltos y el atlas sale en otro render)."""
+    if not save_path or not box_list:
+        return None
+    try:
+        import os
+        from utils import sha256_hex
+        save_hash = sha256_hex(f"{os.path.abspath(save_path)}:{os.stat(save_path).st_mtime_ns}".encode("utf-8"))[:16]
+        urls = [_sprite_remote_url(p, prefer_animated=False) if isinstance(p, dict) and p else None for p in box_list]
+        return box_atlas(save_hash, box_index, urls)
+    except Exception:
+        return None
+
+
+def _box_selection(p: dict, box_index: int, idx: int) -> dict:
+    """Datos del Pokémon de la caja que usa el panel de detalle."""
+    return {
+        "from": "box",
+        "box": box_index,
+        "slot": idx + 1,
+        "species": p.get("species_name") or p.get("species"),
+        "nickname": p.get("nickname", ""),
+        "level": p.get("level", "-"),
+        "nature": p.get("nature", "-"),
+        "moves": p.get("moves", []),
+        "moves_detail": p.get("moves_detail"),
+        "form_name": p.get("form_name"),
+        "form_index": p.get("form_index"),
+        "is_shiny": p.get("is_shiny", False),
+        "gender": p.get("gender"),
+        "dex_id": p.get("dex_id"),
+        "ivs": p.get("ivs"),
+        "evs": p.get("evs"),
+        "held_item": p.get("held_item") or p.get("Item"),
+    }
+
+
+def _prefetch_es_names(mons: List[dict]) -> None:
+    """Traduce en un solo paso (en paralelo) los movimientos/habilidades de `mons`."""
+    try:
+        mons = [m for m in mons if isinstance(m, dict)]
+        prefetch_names_es(
+            moves=[mv for m in mons for mv in (m.get("moves") or []) if mv],
+            abilities=[m.get("ability") for m in mons if m.get("ability")],
+        )
+    except Exception:
+        pass
+
+
 def _team_grid_ui(team: List[dict]) -> None:
     st.subheader("Equipo actual")
     cols = st.columns(6)
@@ -942,7 +949,7 @@ def _pokemon_detail_panel() -> None:
     colL, colM, colR = st.columns([1, 1, 1.6], gap="large")
 
     with colL:
-        img_url = _sprite_url_from_p(p, prefer_animated=True)
+        img_url = sprite_image(_sprite_remote_url(p, prefer_animated=True))
         st.image(img_url, width=DETAIL_IMG_W)
         try:
             item = p.get('held_item') or p.get('item') or '-'
@@ -1140,8 +1147,7 @@ def page_entrenadores_view() -> None:
     is_own_profile = (trainer == current_user)
     _ensure_pokepaste_state()
 
-    saves = list_user_saves(trainer) if trainer else []
-    active_path = saves[0] if saves else None
+    active_path = latest_user_save(trainer) if trainer else None
     st.info(
         f"Guardado detectado para {trainer or '-'}: {Path(active_path).name if active_path else '(sin guardados)'}"
     )
@@ -1166,7 +1172,8 @@ def page_entrenadores_view() -> None:
         if not save_path.exists():
             st.error("El archivo .sav del entrenador no existe.")
             return
-        sav_json = PKHeXRuntime.open_sav(save_path)
+        handle = SaveHandle.open(save_path)
+        sav_json = handle.data
     except Exception as e:
         st.error(f"No se pudo abrir/validar el guardado: {e}")
         try:
@@ -1175,30 +1182,33 @@ def page_entrenadores_view() -> None:
             pass
         return
 
+    # Resumen del save (equipo, medallas, muertos, cajas) calculado una vez por .sav
+    try:
+        snap = snapshot_for(trainer)
+    except Exception:
+        snap = None
+    if snap is not None and snap.key != (handle.path, handle.mtime_ns):
+        snap = None  # snapshot de otro save o del mismo fichero antes de sobrescribirlo
+
     # Meta rápida de cajas (cantidad + nombres)
     try:
-        box_count, box_names = get_box_meta_quick(sav_json, save_path=str(save_path))
+        box_count, box_names = (snap.box_count, snap.box_names) if snap else handle.box_meta()
     except Exception:
         box_count, box_names = 0, []
 
     # Resumen con retrato y KPIs
-    _trainer_summary_with_portrait_ui(sav_json, box_count)
+    _trainer_summary_with_portrait_ui(sav_json, box_count, snap=snap, save_path=handle.path)
 
-    # Equipo actual (con cache si hay ruta activa)
+    # Equipo actual
     try:
-        active_spath = str(save_path) if save_path else None
-        if active_spath:
-            import os
-            mtime = os.path.getmtime(active_spath)
-            if st is not None:
-                team = _cached_team(active_spath, mtime)
-            else:
-                team = extract_team(sav_json) or []
-        else:
-            team = extract_team(sav_json) or []
+        team = (snap.team if snap else handle.team) or []
     except Exception:
         team = []
+    _prefetch_es_names(list(team) + [st.session_state.get("selected_pokemon") or {}])
+    _prefetch_sprites(list(team) + [st.session_state.get("selected_pokemon") or {}], animated=True)
     _team_grid_ui_enhanced(team)
+    _type_profile_ui(team)
+    _all_trainers_types_ui()
 
     # Pokepaste (editor para perfil propio, lectura para otros)
     st.markdown("---")
@@ -1246,11 +1256,22 @@ def page_entrenadores_view() -> None:
     except Exception:
         pass
 
-    # Panel de detalle del Pokémon seleccionado
-    _pokemon_detail_panel()
+    # Detalle + cajas: se reejecutan solos al navegar por el PC
+    _box_section(handle, box_count, box_names)
+
+
+def _fragment(fn):
+    """st.fragment si la versión de Streamlit lo tiene; si no, la función tal cual."""
+    deco = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return deco(fn) if deco else fn
+
 
-    # Cuadrícula de cajas
-    _boxes_grid_ui(sav_json, box_count, box_names, save_path=str(save_path))
+@_fragment
+def _box_section(handle: SaveHandle, box_count: int, box_names: List[str]) -> None:
+    """Panel de detalle y cuadrícula de cajas como rerun parcial: cambiar de caja o
+    elegir una casilla no vuelve a abrir el save ni repinta resumen, equipo o Pokepaste."""
+    _pokemon_detail_panel()
+    _boxes_grid_ui(handle.data, box_count, box_names, save_path=handle.path, handle=handle)
 
 
 def page_entrenadores() -> None:
@@ -1281,10 +1302,12 @@ def page_entrenadores() -> None:
 
 # Re-define boxes grid to sanitize level default and avoid duplicate render
 def _boxes_grid_ui(
-    sav_json: dict, box_count: int, box_names: List[str], *, save_path: str | None = None
+    sav_json: dict, box_count: int, box_names: List[str], *, save_path: str | None = None,
+    handle: SaveHandle | None = None,
 ) -> None:
     st.subheader("PC (Cajas)")
-    if not has_pc_data(sav_json, save_path=save_path):
+    has_pc = handle.has_pc if handle is not None else has_pc_data(sav_json, save_path=save_path)
+    if not has_pc:
         st.warning("PC no disponible. Revisa el Bridge si persiste.")
         return
 
@@ -1302,7 +1325,9 @@ def _boxes_grid_ui(
     )
 
     try:
-        if save_path and st is not None:
+        if handle is not None:
+            box_list = handle.box(int(box_index))
+        elif save_path and st is not None:
             import os
             mtime = os.path.getmtime(str(save_path))
             box_list = _cached_box(str(save_path), mtime, int(box_index))
@@ -1311,6 +1336,10 @@ def _boxes_grid_ui(
     except Exception as e:
         st.error(f"Error al leer la caja: {e}")
         box_list = []
+    # Traducciones de la caja en un solo paso: el panel de detalle ya no espera a PokeAPI
+    _prefetch_es_names(box_list)
+    _prefetch_sprites(box_list, animated=False)
+    atlas = _box_atlas(save_path, int(box_index), box_list)
 
     # Precalcular huellas y flags (blindado/robado) para la caja actual
     try:
@@ -1342,59 +1371,50 @@ def _boxes_grid_ui(
         blindados = set()
         robados = set()
 
-    rows, cols = 5, 6
-    idx = 0
-    for _ in range(rows):
-        row_cols = st.columns(cols)
-        for cell in row_cols:
-            with cell:
-                if idx < len(box_list):
-                    p = box_list[idx]
-                    img_url = _sprite_url_from_p(p, prefer_animated=False)
-                    title = p.get("species_name") or p.get("species")
-                    try:
-                        types = species_types(
-                            species_name=title,
-                            form_index=p.get("form_index"),
-                            form_name=p.get("form_name"),
-                            gender=p.get("gender"),
-                        )
-                    except Exception:
-                        types = []
-                    html = _slot_card_html(
-                        img_url=img_url,
-                        title=title,
-                        subtitle="",
-                        img_w=BOX_IMG_W,
-                        level=None,
-                        is_shiny=bool(p.get("is_shiny", False)),
-                        gender=p.get("gender"),
-                        types=types,
-                    )
-                    st.markdown(html, unsafe_allow_html=True)
-                    if st.button("Ver", key=f"box_{box_index}_{idx}"):
-                        st.session_state.selected_pokemon = {
-                            "from": "box",
-                            "box": box_index,
-                            "slot": idx + 1,
-                            "species": title,
-                            "nickname": p.get("nickname", ""),
-                            "level": p.get("level", "-"),
-                            "nature": p.get("nature", "-"),
-                            "moves": p.get("moves", []),
-                            "moves_detail": p.get("moves_detail"),
-                            "form_name": p.get("form_name"),
-                            "form_index": p.get("form_index"),
-                            "is_shiny": p.get("is_shiny", False),
-                            "gender": p.get("gender"),
-                            "dex_id": p.get("dex_id"),
-                            "ivs": p.get("ivs"),
-                            "evs": p.get("evs"),
-                            "held_item": p.get("held_item") or p.get("Item"),
-                        }
-                else:
-                    st.markdown(_slot_empty_html(f"Slot {idx+1}"), unsafe_allow_html=True)
-                idx += 1
+    # Toda la caja en un solo componente: la selección ocurre en el navegador y
+    # sólo vuelve la casilla pulsada (antes: 30 columnas + 30 HTML + 30 botones).
+    slots = []
+    for idx in range(BOX_SLOTS):
+        p = box_list[idx] if idx < len(box_list) else None
+        if not isinstance(p, dict) or not p:
+            slots.append(None)
+            continue
+        title = p.get("species_name") or p.get("species")
+        try:
+            types = species_types(
+                species_name=title,
+                form_index=p.get("form_index"),
+                form_name=p.get("form_name"),
+                gender=p.get("gender"),
+            )
+        except Exception:
+            types = []
+        labels = translate_types_es(types[:2]) if types else []
+        pos = atlas.offsets.get(idx) if atlas else None
+        slots.append(box_slot(
+            title=title,
+            img=None if pos else _sprite_url_from_p(p, prefer_animated=False),
+            pos=pos,
+            types=[{"label": labels[i], "color": type_color(t)} for i, t in enumerate(types[:2])],
+            is_shiny=bool(p.get("is_shiny", False)),
+            gender=p.get("gender"),
+        ))
+    sel = st.session_state.get("selected_pokemon") or {}
+    picked = box_grid(
+        slots,
+        key=f"box_grid_{box_index}",
+        img_w=BOX_IMG_W,
+        sheet=atlas_sheet(atlas),
+        selected=(sel.get("slot", 0) - 1) if sel.get("from") == "box" and sel.get("box") == box_index else None,
+    )
+    if picked is not None:
+        p = box_list[picked]
+        st.session_state.selected_pokemon = _box_selection(p, box_index, picked)
+        # El panel de detalle ya se pintó en esta pasada: repetir sólo el fragmento
+        try:
+            st.rerun(scope="fragment")
+        except Exception:
+            st.rerun()
 
 
 
@@ -1413,11 +1433,8 @@ except Exception:
 
 def _active_save_for(trainer: str) -> str | None:
     try:
-        saves = list_user_saves(trainer)
-        if not saves:
-            return None
-        p = saves[0]
-        return str(p)
+        p = latest_user_save(trainer)
+        return str(p) if p else None
     except Exception:
         return None
 
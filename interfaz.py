@@ -6,10 +6,10 @@ from pathlib import Path
 
 import streamlit as st
 
-from utils import USERS, list_user_saves, DEFAULT_DLL_HINT
-from showdown_sprites import showdown_sprite_url
-from conex_pkhex import PKHeXRuntime, extract_team, get_bridge_path
-from storage import init_storage
+from utils import USERS
+
+# storage, snapshots y los sprites se importan al usarse (tras el login): la
+# pantalla de acceso no los necesita y así el arranque sólo carga streamlit + utils.
 
 
 def apply_css() -> None:
@@ -261,28 +261,13 @@ def _get_team_sprite_urls(user: str) -> list[str]:
     try:
         if not user or user == '-':
             return urls
-        # Asegurar bridge cargado (intento rápido)
-        if not get_bridge_path():
-            try:
-                import entrenadores as _ent
-                if hasattr(_ent, '_try_auto_load_bridge'):
-                    _ent._try_auto_load_bridge()
-            except Exception:
-                pass
-        if not get_bridge_path():
-            # último intento con pista por defecto o ruta ya guardada
-            try:
-                hint = st.session_state.get('pkhex_dll_path') or DEFAULT_DLL_HINT
-                if hint:
-                    PKHeXRuntime.load(hint)
-            except Exception:
-                return urls
-        saves = list_user_saves(user)
-        if not saves:
+        from showdown_sprites import showdown_sprite_url
+        from snapshots import snapshot_for
+        from sprite_cache import sprite_src
+        snap = snapshot_for(user)
+        if snap is None:
             return urls
-        sav_path = str(saves[0])
-        sav_json = PKHeXRuntime.open_sav(sav_path)
-        mons = extract_team(sav_json, save_path=sav_path) or []
+        mons = snap.team or []
         prefer_anim = False  # sin animaciones en la tarjeta
         for m in mons[:6]:
             try:
@@ -295,7 +280,7 @@ def _get_team_sprite_urls(user: str) -> list[str]:
                     gender=m.get('gender'),
                     prefer_animated=prefer_anim,
                 )
-                urls.append(url)
+                urls.append(sprite_src(url))
             except Exception:
                 continue
     except Exception:
@@ -307,28 +292,61 @@ def _get_badges_count(user: str) -> int:
     try:
         if not user or user == '-':
             return 0
-        if not get_bridge_path():
-            try:
-                import entrenadores as _ent
-                if hasattr(_ent, '_try_auto_load_bridge'):
-                    _ent._try_auto_load_bridge()
-            except Exception:
-                pass
-        saves = list_user_saves(user)
-        if not saves:
-            return 0
-        sav_path = str(saves[0])
-        sav_json = PKHeXRuntime.open_sav(sav_path)
-        return int(coins_from_badges(sav_json))
+        from snapshots import snapshot_for
+        snap = snapshot_for(user)
+        return int(snap.badge_coins) if snap else 0
     except Exception:
         return 0
 
 
+# Tarjeta de perfil ya renderizada: {user: (clave, html, caduca)}.
+# Clave = (save actual (ruta, mtime), retrato (ruta, mtime)); sin cambios no se relee nada.
+_PROFILE_HTML: dict = {}
+_PROFILE_RETRY = 30.0  # s; si algún sprite aún era remoto se reconstruye pasado este tiempo
+_PORTRAITS: dict = {}  # {user: (mtime de assets/trainers, ruta)}
+
+
+def _portrait_key(user: str) -> tuple:
+    """(ruta, mtime) del retrato; la búsqueda entre nombres/extensiones sólo se repite
+    si cambia la carpeta de retratos."""
+    import os
+    try:
+        dir_mtime = os.stat(Path('assets') / 'trainers').st_mtime_ns
+    except Exception:
+        return ('', 0)
+    hit = _PORTRAITS.get(user)
+    if hit is None or hit[0] != dir_mtime:
+        hit = (dir_mtime, _find_trainer_image_local(user))
+        _PORTRAITS[user] = hit
+    path = hit[1]
+    try:
+        return (path, os.stat(path).st_mtime_ns) if path else ('', 0)
+    except Exception:
+        return ('', 0)
+
+
 def _render_sidebar_profile() -> None:
+    import time
     usr = st.session_state.get('user') or ''
     if not usr or usr == '-':
         return
-    img = _find_trainer_image_local(usr)
+    try:
+        from snapshots import snapshot_for
+        snap = snapshot_for(usr)
+    except Exception:
+        snap = None
+    key = (snap.key if snap else None, _portrait_key(usr))
+    cached = _PROFILE_HTML.get(usr)
+    if cached and cached[0] == key and time.time() < cached[2]:
+        st.sidebar.markdown(cached[1], unsafe_allow_html=True)
+        return
+    html, complete = _sidebar_profile_html(usr, key[1][0])
+    _PROFILE_HTML[usr] = (key, html, float('inf') if complete else time.time() + _PROFILE_RETRY)
+    st.sidebar.markdown(html, unsafe_allow_html=True)
+
+
+def _sidebar_profile_html(usr: str, img: str) -> tuple:
+    """HTML de la tarjeta y si está completo (todos los sprites ya en local)."""
     def _img_uri(p: str) -> str:
         try:
             if not p:
@@ -341,6 +359,7 @@ def _render_sidebar_profile() -> None:
         except Exception:
             return ''
     team_urls = _get_team_sprite_urls(usr)
+    complete = all(u.startswith('data:') for u in team_urls)
     badges = max(0, min(8, _get_badges_count(usr)))
     # medallas: 8 puntos, activas segun conteo
     dots = ''.join([f"<span class='badge-dot{' badge-on' if i < badges else ''}'></span>" for i in range(8)])
@@ -366,13 +385,14 @@ def _render_sidebar_profile() -> None:
       {bottom}
     </div>
     """
-    st.sidebar.markdown(html, unsafe_allow_html=True)
+    return html, complete
 
 
 # --- Auth / layout ---
 def login_gate() -> None:
-    init_storage()
     if st.session_state.get("auth_ok"):
+        from storage import init_storage
+        init_storage()
         return
     st.header("Inicio de sesion")
     col1, col2 = st.columns(2)
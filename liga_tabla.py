@@ -1,67 +1,57 @@
 ﻿# -*- coding: utf-8 -*-
 from __future__ import annotations
 from typing import Dict
-from functools import lru_cache
-import json
 import streamlit as st
 
-from utils import USERS, list_user_saves
-from storage import settings_get, settings_set, clear_purchases, add_purchase
-from conex_pkhex import PKHeXRuntime, extract_box, has_pc_data
+from utils import USERS
+from storage import (
+    clear_purchases, add_purchase,
+    league_import_legacy, league_meta_get, league_meta_set, league_matches_for, league_create_matches,
+    league_set_winner, league_delete_matches, league_record_positions, league_results, league_movements,
+    league_set_movement, league_reset,
+)
+from snapshots import snapshot_for
 
 
 # ===== Estado y persistencia =====
-def _serialize_state() -> dict:
-    S = st.session_state
-    matches: Dict[str, Dict[str, list[dict]]] = {}
-    for tramo, divs in (S.get("league_matches") or {}).items():
-        tkey = str(tramo)
-        out = {"A": [], "B": []}
-        for d in ("A", "B"):
-            for (p1, p2), w in divs.get(d, {}).items():
-                out[d].append({"p1": p1, "p2": p2, "winner": w})
-        matches[tkey] = out
-    results = {u: {str(k): int(v) for k, v in mp.items()} for u, mp in (S.get("league_results") or {}).items()}
-    return {
-        "tramo": int(S.get("league_tramo", 1)),
-        "active": bool(S.get("league_active", False)),
-        "divisions": S.get("league_divisions", {"A": [], "B": []}),
-        "matches": matches,
-        "results": results,
-        "movements": S.get("league_movements", {}),
-    }
-
-
 def _restore_state() -> None:
+    """Carga meta, resultados y movimientos; de los enfrentamientos sólo el tramo activo."""
     try:
-        raw = settings_get("league_state")
-        if not raw:
+        league_import_legacy()  # no-op salvo la primera vez tras actualizar
+        meta = league_meta_get()
+        if meta is None:
             return
-        obj = json.loads(raw)
-        st.session_state.league_tramo = int(obj.get("tramo", 1))
-        st.session_state.league_active = bool(obj.get("active", False))
-        st.session_state.league_divisions = obj.get("divisions", {"A": [], "B": []})
-        res_in = obj.get("results", {})
-        st.session_state.league_results = {u: {int(k): int(v) for k, v in mp.items()} for u, mp in res_in.items()}
-        mat_in = obj.get("matches", {})
-        mat_out: Dict[int, Dict[str, Dict[tuple, str | None]]] = {}
-        for tkey, divs in mat_in.items():
-            t = int(tkey)
-            mat_out[t] = {"A": {}, "B": {}}
-            for d in ("A", "B"):
-                for m in divs.get(d, []) or []:
-                    mat_out[t][d][(m.get("p1"), m.get("p2"))] = m.get("winner")
-        st.session_state.league_matches = mat_out
-        mov = obj.get("movements", {})
-        if isinstance(mov, dict):
-            st.session_state.league_movements = {int(k): v for k, v in mov.items()}
+        tramo = meta["tramo"]
+        st.session_state.league_tramo = tramo
+        st.session_state.league_active = meta["active"]
+        if meta["divisions"]:
+            st.session_state.league_divisions = meta["divisions"]
+        st.session_state.league_results = league_results()
+        st.session_state.league_movements = league_movements()
+        matches = league_matches_for(tramo)
+        st.session_state.league_matches = {tramo: matches} if (matches["A"] or matches["B"]) else {}
     except Exception:
         pass
 
 
-def _persist():
+def _persist_meta() -> None:
     try:
-        settings_set("league_state", json.dumps(_serialize_state(), ensure_ascii=False))
+        league_meta_set(
+            tramo=int(st.session_state.get("league_tramo", 1)),
+            active=bool(st.session_state.get("league_active", False)),
+            divisions=st.session_state.get("league_divisions", {"A": [], "B": []}),
+        )
+    except Exception:
+        pass
+
+
+def _set_winner(tramo: int, division: str, pair: tuple[str, str], winner: str | None) -> None:
+    data = st.session_state.league_matches[tramo][division]
+    if data.get(pair) == winner:
+        return
+    data[pair] = winner
+    try:
+        league_set_winner(tramo, division, pair[0], pair[1], winner)
     except Exception:
         pass
 
@@ -97,28 +87,25 @@ def _gen_pairs(players: list[str]) -> list[tuple[str, str]]:
 
 def _get_matches_for(tramo: int) -> dict:
     if tramo not in st.session_state.league_matches:
-        A = st.session_state.league_divisions["A"]
-        B = st.session_state.league_divisions["B"]
-        st.session_state.league_matches[tramo] = {
-            "A": {pair: None for pair in _gen_pairs(A)},
-            "B": {pair: None for pair in _gen_pairs(B)},
-        }
-    _persist()
+        stored = league_matches_for(tramo)
+        if stored["A"] or stored["B"]:
+            st.session_state.league_matches[tramo] = stored
+        else:
+            A = st.session_state.league_divisions["A"]
+            B = st.session_state.league_divisions["B"]
+            st.session_state.league_matches[tramo] = {
+                "A": {pair: None for pair in _gen_pairs(A)},
+                "B": {pair: None for pair in _gen_pairs(B)},
+            }
+            league_create_matches(tramo, st.session_state.league_matches[tramo])
     return st.session_state.league_matches[tramo]
 
 
-@lru_cache(maxsize=64)
 def _count_muertos_for_trainer(trainer: str) -> int:
+    """Muertos (Caja 18) del snapshot del último save: sin abrir el save en cada render."""
     try:
-        saves = list_user_saves(trainer)
-        if not saves:
-            return 0
-        active_path = str(saves[0])
-        sav_json = PKHeXRuntime.open_sav(active_path)
-        if not has_pc_data(sav_json):
-            return 0
-        muertos_list = extract_box(sav_json, 17)  # Caja 18
-        return len(muertos_list or [])
+        snap = snapshot_for(trainer)
+        return int(snap.muertos) if snap else 0
     except Exception:
         return 0
 
@@ -182,10 +169,14 @@ def _finalize(tramo: int) -> None:
         raise ValueError("Faltan resultados por marcar en A o B.")
     rankA = _rank(A_players, data["A"])
     rankB = _rank(B_players, data["B"])
+    positions = {}
     for i, u in enumerate(rankA, start=1):
         _record_position(tramo, u, i)
+        positions[u] = i
     for j, u in enumerate(rankB, start=5):
         _record_position(tramo, u, j)
+        positions[u] = j
+    league_record_positions(tramo, positions)
 
     # Premio: Último de B recibe "Robar Pokémon"
     try:
@@ -205,11 +196,12 @@ def _finalize(tramo: int) -> None:
     st.session_state.league_divisions = {"A": nueva_A, "B": nueva_B}
     try:
         st.session_state.league_movements[tramo] = {"up": [rankB[0], rankB[1]], "down": [rankA[2], rankA[3]]}
+        league_set_movement(tramo, [rankB[0], rankB[1]], [rankA[2], rankA[3]])
     except Exception:
         pass
     st.session_state.league_active = False
     st.session_state.league_tramo = tramo + 1
-    _persist()
+    _persist_meta()
 
 
 def points_from_league(user: str) -> int:
@@ -267,7 +259,8 @@ def page_tabla() -> None:
                     st.session_state.league_active = False
                     if tramo in st.session_state.league_matches:
                         del st.session_state.league_matches[tramo]
-                    _persist()
+                    league_delete_matches(tramo)
+                    _persist_meta()
                     st.info("Edicion cancelada. No se guardara ningun resultado.")
                     st.rerun()
         else:
@@ -277,7 +270,7 @@ def page_tabla() -> None:
                 if st.button("Editar jornada", use_container_width=True):
                     st.session_state.league_active = True
                     _get_matches_for(tramo)
-                    _persist()
+                    _persist_meta()
                     st.rerun()
 
     st.markdown("---")
@@ -290,18 +283,16 @@ def page_tabla() -> None:
         cA, cB = st.columns(2)
         with cA:
             st.markdown("**Liga A (posiciones 1-4)**")
-            for (p1, p2), winner in data["A"].items():
+            for (p1, p2), winner in list(data["A"].items()):
                 idx = (0 if winner == p1 else 1 if winner == p2 else 0)
                 pick = st.radio(f"{p1} vs {p2}", options=[p1, p2], index=idx, horizontal=True, key=f"A_{p1}_{p2}")
-                data["A"][(p1, p2)] = pick
-                _persist()
+                _set_winner(tramo, "A", (p1, p2), pick)
         with cB:
             st.markdown("**Liga B (posiciones 5-9)**")
-            for (p1, p2), winner in data["B"].items():
+            for (p1, p2), winner in list(data["B"].items()):
                 idx = (0 if winner == p1 else 1 if winner == p2 else 0)
                 pick = st.radio(f"{p1} vs {p2}", options=[p1, p2], index=idx, horizontal=True, key=f"B_{p1}_{p2}")
-                data["B"][(p1, p2)] = pick
-                _persist()
+                _set_winner(tramo, "B", (p1, p2), pick)
 
         if _all_filled(data["A"]) and _all_filled(data["B"]):
             st.markdown("---")
@@ -400,7 +391,8 @@ def page_tabla() -> None:
                 clear_purchases()
             except Exception:
                 pass
-            _persist()
+            league_reset()
+            _persist_meta()
             st.success("Liga reiniciada.")
             st.rerun()
         else:
@@ -6,30 +6,31 @@ from utils import APP_TITLE, APP_ICON, SECTIONS, init_session_state
 
 st.set_page_config(
     page_title=APP_TITLE,
-    page_icon=APP_ICON,
+    page_icon=APP_ICON or None,  # "" haría que streamlit lo trate como imagen (numpy + PIL)
     layout="wide",
     initial_sidebar_state="expanded",
 )
 
-# Importar vistas después de configurar la página para evitar warnings
-a = __import__('interfaz')
-ui = a
-# Tienda: usar implementación principal (tienda2)
-tienda = __import__('tienda2')
-saves = __import__('saves')
+# Importar vistas después de configurar la página para evitar warnings.
+# Sólo interfaz (CSS, login y barra lateral); cada página se importa al visitarla.
+ui = __import__('interfaz')
+
+# Sección -> (módulo, función). Tienda: usar implementación principal (tienda2)
+PAGES = {
+    "Inicio": ("interfaz", "page_inicio"),
+    "Liga y Tabla": ("interfaz", "page_tabla"),
+    "Entrenadores": ("interfaz", "page_entrenadores"),
+    "Copa": ("interfaz", "page_copa"),
+    "Tienda": ("tienda2", "page_tienda"),
+    "Saves": ("saves", "page_saves"),
+}
 
 
 def router(section: str) -> None:
-    """Despacha a la página seleccionada."""
-    pages = {
-        "Inicio": ui.page_inicio,
-        "Liga y Tabla": ui.page_tabla,
-        "Entrenadores": ui.page_entrenadores,
-        "Copa": ui.page_copa,
-        "Tienda": tienda.page_tienda,
-        "Saves": saves.page_saves,
-    }
-    pages.get(section, ui.page_inicio)()
+    """Despacha a la página seleccionada (importando su módulo la primera vez)."""
+    import importlib
+    module, func = PAGES.get(section, PAGES["Inicio"])
+    getattr(importlib.import_module(module), func)()
 
 
 def main() -> None:
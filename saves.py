@@ -8,8 +8,10 @@ from storage import (
     list_saves_by_user,
     set_current_save_for_user,
     get_current_save_for_user,
+    compact_storage,
+    SAVE_RETENTION,
 )
-from utils import ensure_user_dir, ts_name
+from utils import ensure_user_dir, ts_name, prune_user_saves, format_bytes, register_user_save
 
 
 def page_saves() -> None:
@@ -36,6 +38,10 @@ def page_saves() -> None:
             dest = folder / ts_name(current_user)
             with open(dest, "wb") as f:
                 f.write(data)
+            register_user_save(current_user, dest)
+            # Resumen (equipo, medallas, muertos, cajas) calculado una vez, en segundo plano
+            from snapshots import ingest_async
+            ingest_async(current_user, dest)
         except Exception:
             pass
         st.success(f"Guardado por {current_user} y establecido como actual (id={rec['id']}).")
@@ -79,3 +85,25 @@ def page_saves() -> None:
                         )
                     else:
                         st.caption("Solo el autor puede descargar este save.")
+
+    # Sólo los saves del usuario actual; la compactación global (huérfanos de todos)
+    # se lanza con tools/compact_storage.py
+    with st.expander("Mantenimiento (retencion de tus saves)"):
+        keep = st.number_input("Saves a conservar", min_value=1, value=SAVE_RETENTION, step=1)
+        apply = st.checkbox("Borrar de verdad (si no, solo simula)", value=False)
+        if current_user and st.button("Compactar", key="compact_saves"):
+            rep = compact_storage(keep_last=int(keep), dry_run=not apply, user=current_user)
+            mine = prune_user_saves(current_user, int(keep), dry_run=not apply)
+            if apply:
+                try:
+                    from conex_pkhex import forget_saves
+                    forget_saves([p for p, _ in mine])
+                    st.cache_data.clear()
+                except Exception:
+                    pass
+            total = rep["bytes"] + sum(sz for _, sz in mine)
+            verbo = "Borrados" if apply else "Se borrarian"
+            st.info(
+                f"{verbo}: {len(rep['rows'])} registros, {len(rep['files']) + len(mine)} ficheros "
+                f"({format_bytes(total)}). VACUUM: {format_bytes(rep['db_bytes'])}."
+            )
@@ -108,6 +108,21 @@ def showdown_id(
     """
     base = _base_slug(species_name)
 
+    # --- Tabla precalculada (formeOrder del Pokédex); si falla, reglas de abajo ---
+    # Sólo si ya está construida o hace falta para un índice de forma: construirla carga
+    # el Pokédex (y en frío puede descargarlo), y esto se llama en cada sprite.
+    try:
+        from speciestable import lookup, ready
+        row = None
+        if form_index or ready():
+            row = lookup(species_name=species_name, form_index=form_index, form_name=form_name, gender=gender)
+        if row is not None and (row.sprite_id != base or not (form_index or form_name)):
+            if row.sprite_id == base and gender == "F" and base in FEMALE_DIFF:
+                return f"{base}-f"
+            return row.sprite_id
+    except Exception:
+        pass
+
     # --- Formas por índice (cuando provienen de PKHeX) ---
     if base == "rotom" and (form_index or 0) in ROTOM_FORMS:
         return f"rotom-{ROTOM_FORMS[form_index]}"
@@ -145,9 +160,10 @@ def showdown_id(
     return base
 
 
-def url_showdown_static(name_id: str) -> str:
-    """PNG estático (gen5)"""
-    return f"https://play.pokemonshowdown.com/sprites/gen5/{name_id}.png"
+def url_showdown_static(name_id: str, shiny: bool = False) -> str:
+    """PNG estático (gen5 / gen5-shiny: los shiny ya no usan el sprite normal)"""
+    folder = "gen5-shiny" if shiny else "gen5"
+    return f"https://play.pokemonshowdown.com/sprites/{folder}/{name_id}.png"
 
 
 def url_showdown_ani(name_id: str, shiny: bool = False) -> str:
@@ -169,7 +185,7 @@ def showdown_sprite_url(
     sid = showdown_id(species_name, form_index=form_index, form_name=form_name, gender=gender)
     if prefer_animated:
         return url_showdown_ani(sid, shiny=is_shiny)
-    return url_showdown_static(sid)
+    return url_showdown_static(sid, shiny=is_shiny)
 
 # =========================
 # 4) Integración con Streamlit  ejemplo (opcional)
@@ -0,0 +1,271 @@
+"""
+Resumen por entrenador calculado una vez por .sav (TrainerSnapshot).
+
+Al subir un save (o al detectar uno nuevo en data/saves/<usuario>) se abre con el
+bridge una sola vez y se guarda en la tabla trainer_snapshots: equipo, medallas,
+muertos, nombres de caja, tiempo de juego, dinero y un resumen de cada caja.
+Barra lateral, tienda, liga y Entrenadores leen de aquí y no lanzan el bridge
+para datos de resumen.
+
+    snap = snapshot_for(user)      # None si no hay save, no se pudo leer o aún se calcula
+    snap.team, snap.badges, snap.muertos, snap.boxes
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage import get_trainer_snapshot, put_trainer_snapshot, set_balance_coins
+from utils import latest_user_save
+
+SNAPSHOT_VERSION = 1
+# Segundos antes de reintentar un save que el bridge no pudo leer (bridge caído, save a medio copiar)
+FAILED_RETRY = float(os.environ.get("SNAPSHOT_FAILED_RETRY", "300"))
+
+_CACHE: Dict[str, "TrainerSnapshot"] = {}
+_LOCK = threading.Lock()
+_PENDING: set = set()
+_FAILED: Dict[Tuple[str, str, int], float] = {}  # (user, ruta, mtime_ns) -> no reintentar hasta (monotonic)
+_BRIDGE_RETRY_AT = 0.0  # si el autocargado del bridge falló, no reintentar hasta (monotonic)
+
+
+@dataclass
+class TrainerSnapshot:
+    user: str
+    save_path: str
+    save_mtime_ns: int
+    team: List[Dict[str, Any]] = field(default_factory=list)
+    badges: int = 0          # medallas (recuento de Entrenadores)
+    badge_coins: int = 0     # medallas según coins_from_badges (tienda / barra lateral)
+    muertos: int = 0
+    box_count: int = 0
+    box_names: List[str] = field(default_factory=list)
+    has_pc: bool = False
+    playtime: Optional[str] = None
+    money: Optional[int] = None
+    boxes: List[Dict[str, Any]] = field(default_factory=list)  # {index, name, count, species}
+    version: int = SNAPSHOT_VERSION
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.save_path, self.save_mtime_ns)
+
+    @classmethod
+    def from_json(cls, text: str) -> Optional["TrainerSnapshot"]:
+        try:
+            d = json.loads(text)
+            if d.get("version") != SNAPSHOT_VERSION:
+                return None
+            return cls(**d)
+        except Exception:
+            return None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+
+def _save_key(path: Path) -> Optional[Tuple[str, int]]:
+    try:
+        return (str(path), os.stat(path).st_mtime_ns)
+    except Exception:
+        return None
+
+
+def _playtime(data: Dict[str, Any]) -> Optional[str]:
+    from conex_pkhex import _first_present
+    raw = _first_present(data, "PlayTime", "Playtime", "PlayTimeString", "play_time")
+    if raw not in (None, ""):
+        return str(raw)
+    h = _first_present(data, "PlayedHours", "PlayTimeHours", "Hours")
+    m = _first_present(data, "PlayedMinutes", "PlayTimeMinutes", "Minutes")
+    try:
+        if h is not None:
+            return f"{int(h)}:{int(m or 0):02d}"
+    except Exception:
+        pass
+    return None
+
+
+def _money(data: Dict[str, Any]) -> Optional[int]:
+    from conex_pkhex import _first_present
+    try:
+        raw = _first_present(data, "Money", "money")
+        return int(raw) if raw is not None else None
+    except Exception:
+        return None
+
+
+def build_snapshot(user: str, save_path: str | Path) -> TrainerSnapshot:
+    """Abre el save (una vez, vía SaveHandle) y calcula todo el resumen."""
+    from conex_pkhex import SaveHandle
+    from entrenadores import _count_badges, _muertos_box_index
+    from interfaz import coins_from_badges
+
+    h = SaveHandle.open(save_path)
+    data = h.data
+    box_count, box_names = h.box_meta()
+    has_pc = h.has_pc
+    boxes: List[Dict[str, Any]] = []
+    muertos = 0
+    if has_pc:
+        muertos_idx = _muertos_box_index(box_count)
+        for i in range(box_count):
+            try:
+                mons = h.box(i)
+            except Exception:
+                mons = []
+            boxes.append({
+                "index": i,
+                "name": box_names[i] if i < len(box_names) else f"Caja {i+1}",
+                "count": len(mons),
+                "species": [m.get("species_name") or m.get("species") for m in mons],
+            })
+            if i == muertos_idx:
+                muertos = len(mons)
+    return TrainerSnapshot(
+        user=user,
+        save_path=h.path,
+        save_mtime_ns=h.mtime_ns,
+        team=list(h.team or []),
+        badges=int(_count_badges(data)),
+        badge_coins=int(coins_from_badges(data)),
+        muertos=muertos,
+        box_count=int(box_count),
+        box_names=list(box_names),
+        has_pc=bool(has_pc),
+        playtime=_playtime(data),
+        money=_money(data),
+        boxes=boxes,
+    )
+
+
+def ingest(user: str, save_path: str | Path) -> Optional[TrainerSnapshot]:
+    """Calcula y guarda el snapshot de `user` para `save_path` (None si falla la lectura)."""
+    key = _save_key(Path(save_path))
+    try:
+        snap = build_snapshot(user, save_path)
+    except Exception:
+        if key is not None:
+            with _LOCK:
+                _FAILED[(user,) + key] = time.monotonic() + FAILED_RETRY
+        return None
+    try:
+        put_trainer_snapshot(user, snap.save_path, snap.save_mtime_ns, snap.to_json())
+        set_balance_coins(user, badges=snap.badge_coins)
+    except Exception:
+        pass
+    with _LOCK:
+        _CACHE[user] = snap
+        _FAILED.pop((user,) + snap.key, None)
+    return snap
+
+
+def ingest_async(user: str, save_path: str | Path) -> None:
+    """ingest() en un hilo (subida de saves): la página no espera al bridge."""
+    if not _ensure_bridge():
+        return
+    key = (user, str(save_path))
+    with _LOCK:
+        if key in _PENDING:
+            return
+        _PENDING.add(key)
+
+    def run() -> None:
+        try:
+            ingest(user, save_path)
+        finally:
+            with _LOCK:
+                _PENDING.discard(key)
+
+    threading.Thread(target=run, name=f"snapshot-{user}", daemon=True).start()
+
+
+def _stored(user: str) -> Optional[TrainerSnapshot]:
+    with _LOCK:
+        snap = _CACHE.get(user)
+    if snap is not None:
+        return snap
+    try:
+        row = get_trainer_snapshot(user)
+    except Exception:
+        row = None
+    if not row:
+        return None
+    snap = TrainerSnapshot.from_json(row[2])
+    if snap is not None:
+        with _LOCK:
+            _CACHE[user] = snap
+    return snap
+
+
+def snapshot_for(user: str) -> Optional[TrainerSnapshot]:
+    """Snapshot del último save de `user`.
+
+    - Al día: se devuelve tal cual (sin bridge).
+    - Hay uno anterior y el save ha cambiado: se devuelve el anterior y se recalcula
+      en segundo plano.
+    - No hay ninguno: devuelve None y lo calcula en segundo plano; nunca espera al
+      bridge (la liga lo pide para todos los entrenadores en cada render).
+    - El save no se pudo leer: no se reintenta hasta pasados FAILED_RETRY segundos.
+    """
+    if not user or user == "-":
+        return None
+    latest = latest_user_save(user)
+    key = _save_key(Path(latest)) if latest else None
+    snap = _stored(user)
+    if key is None:
+        return snap
+    if snap is not None and snap.key == key:
+        return snap
+    with _LOCK:
+        retry_at = _FAILED.get((user,) + key)
+        if retry_at is not None and retry_at <= time.monotonic():
+            _FAILED.pop((user,) + key, None)
+            retry_at = None
+    if retry_at is not None:
+        return snap
+    ingest_async(user, key[0])
+    return snap
+
+
+def _ensure_bridge() -> bool:
+    """Carga el bridge si aún no lo está (hace falta para calcular snapshots). Si no se
+    puede, no vuelve a sondear el disco hasta pasados FAILED_RETRY segundos."""
+    global _BRIDGE_RETRY_AT
+    from conex_pkhex import PKHeXRuntime, get_bridge_path
+    if get_bridge_path():
+        return True
+    if time.monotonic() < _BRIDGE_RETRY_AT:
+        return False
+    try:
+        import entrenadores as _ent
+        _ent._try_auto_load_bridge()
+    except Exception:
+        pass
+    if not get_bridge_path():
+        try:
+            import streamlit as st
+            from utils import DEFAULT_DLL_HINT
+            hint = st.session_state.get("pkhex_dll_path") or DEFAULT_DLL_HINT
+            if hint:
+                PKHeXRuntime.load(hint)
+        except Exception:
+            pass
+    if get_bridge_path():
+        return True
+    _BRIDGE_RETRY_AT = time.monotonic() + FAILED_RETRY
+    return False
+
+
+def forget(user: str | None = None) -> None:
+    """Olvida los snapshots en memoria (todos o los de `user`)."""
+    with _LOCK:
+        if user is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(user, None)
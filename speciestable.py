@@ -0,0 +1,175 @@
+"""
+Tabla precalculada especie/forma -> clave del dataset, sprite, tipos y stats base.
+
+Se construye una vez por proceso (desde el índice compilado si existe, si no desde
+el Pokédex de Showdown) usando `formeOrder` para traducir el índice de forma de
+PKHeX a la forma de Showdown. En el camino caliente una consulta es un único
+acceso a dict por (especie o nº de dex, forma, hembra).
+
+Las consultas sin entrada se registran (logger "pokeapp.species", una vez por
+clave) y se acumulan en `misses()` para ampliar la tabla o los alias.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+log = logging.getLogger("pokeapp.species")
+
+STAT_KEYS = ("hp", "atk", "def", "spa", "spd", "spe")
+
+
+class SpeciesRow(NamedTuple):
+    key: str            # clave del dataset ('rotomheat')
+    sprite_id: str      # slug de sprite Showdown ('rotom-heat')
+    types: Tuple[str, ...]
+    base_stats: Tuple[int, ...]  # en el orden de STAT_KEYS (vacío si faltan)
+
+    def stats_dict(self) -> Dict[str, int]:
+        return dict(zip(STAT_KEYS, self.base_stats))
+
+
+# Fila de forma: (id base, nº dex, índice de forma, id de forma, hembra, clave, sprite)
+FormRow = Tuple[str, int, int, str, int, str, str]
+LookupKey = Tuple[Union[str, int], Union[int, str], bool]
+
+_TABLE: Dict[LookupKey, SpeciesRow] | None = None
+_LOCK = threading.Lock()
+_MISSES: Counter = Counter()
+
+
+def to_id(text: Any) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(text or "").lower())
+
+
+def form_rows(pokedex: Mapping[str, Any]) -> List[FormRow]:
+    """Deriva las filas de forma del Pokédex de Showdown (formeOrder, cosmeticFormes, -F)."""
+    rows: List[FormRow] = []
+    for key, e in pokedex.items():
+        if not isinstance(e, dict) or e.get("baseSpecies"):
+            continue  # sólo especies base; sus formas cuelgan de formeOrder
+        base_id = to_id(e.get("name") or key)
+        num = int(e.get("num") or 0)
+        order = e.get("formeOrder") or [e.get("name") or key]
+        for fi, forme_name in enumerate(order):
+            fkey = to_id(forme_name)
+            forme_id = fkey[len(base_id):] if fkey.startswith(base_id) else ""
+            # Formas cosméticas (Shellos-East...) no tienen entrada propia: datos de la base
+            data_key = fkey if fkey in pokedex else key
+            sprite = f"{base_id}-{forme_id}" if forme_id else base_id
+            female = 1 if forme_id == "f" else 0
+            rows.append((base_id, num, fi, forme_id, female, data_key, sprite))
+            if female and fi:
+                rows.append((base_id, num, 0, forme_id, female, data_key, sprite))
+        if f"{base_id}f" in pokedex and not any(r[0] == base_id and r[4] for r in rows[-len(order):]):
+            rows.append((base_id, num, 0, "f", 1, f"{base_id}f", f"{base_id}-f"))
+    return rows
+
+
+def _species_data(keys: Iterable[str]) -> Dict[str, Tuple[Tuple[str, ...], Tuple[int, ...]]]:
+    import dexindex
+    out: Dict[str, Tuple[Tuple[str, ...], Tuple[int, ...]]] = {}
+    if dexindex.available():
+        for k in keys:
+            ent = dexindex.species_entry(k) or {}
+            bs = ent.get("base_stats") or {}
+            out[k] = (tuple(ent.get("types") or ()), tuple(bs[s] for s in STAT_KEYS) if len(bs) == 6 else ())
+        return out
+    from dexdata import pokedex_data
+    pdx = pokedex_data()
+    for k in keys:
+        e = pdx.get(k) or {}
+        bs = e.get("baseStats") or {}
+        out[k] = (tuple(e.get("types") or ()), tuple(int(bs[s]) for s in STAT_KEYS) if len(bs) == 6 else ())
+    return out
+
+
+def _build() -> Dict[LookupKey, SpeciesRow]:
+    import dexindex
+    rows = dexindex.form_rows() if dexindex.available() else None
+    if rows is None:
+        from dexdata import pokedex_data
+        rows = form_rows(pokedex_data())
+    data = _species_data({r[5] for r in rows})
+    table: Dict[LookupKey, SpeciesRow] = {}
+    for base_id, num, fi, forme_id, female, key, sprite in rows:
+        types, stats = data.get(key, ((), ()))
+        row = SpeciesRow(key, sprite, types, stats)
+        fem = bool(female)
+        for k in ((base_id, fi, fem), (num, fi, fem), (base_id, forme_id, fem)):
+            table.setdefault(k, row)
+    return table
+
+
+def table() -> Dict[LookupKey, SpeciesRow]:
+    global _TABLE
+    if _TABLE is None:
+        with _LOCK:
+            if _TABLE is None:
+                _TABLE = _build()
+    return _TABLE
+
+
+def ready() -> bool:
+    """True si la tabla ya está construida (para usarla sin forzar la carga)."""
+    return _TABLE is not None
+
+
+def reset() -> None:
+    global _TABLE
+    with _LOCK:
+        _TABLE = None
+    _lookup.cache_clear()
+
+
+def lookup(*, species_name: Optional[str] = None, dex_id: Optional[int] = None,
+           form_index: Optional[int] = None, form_name: Optional[str] = None,
+           gender: Optional[str] = None) -> Optional[SpeciesRow]:
+    """Fila de la especie/forma o None (registrando el fallo)."""
+    try:
+        return _lookup(species_name or None, int(dex_id) if dex_id else None,
+                       int(form_index) if form_index is not None else None, form_name or None,
+                       "F" if str(gender or "").upper() == "F" else None)
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _lookup(species_name: Optional[str], dex_id: Optional[int], form_index: Optional[int],
+            form_name: Optional[str], gender: Optional[str]) -> Optional[SpeciesRow]:
+    t = table()
+    if species_name:
+        from showdown_sprites import _base_slug
+        who: Union[str, int] = _base_slug(str(species_name))
+    elif dex_id:
+        who = int(dex_id)
+    else:
+        return None
+    female = gender == "F"
+    if form_index is not None or not form_name:
+        form: Union[int, str] = int(form_index or 0)
+    else:
+        from showdown_sprites import FORM_ALIASES
+        f = str(form_name).strip().lower()
+        form = to_id(FORM_ALIASES.get(f, f))
+    row = t.get((who, form, female))
+    if row is None and female:
+        row = t.get((who, form, False))
+    if row is None and t:
+        miss = (who, form, female)
+        with _LOCK:
+            _MISSES[miss] += 1
+            first = _MISSES[miss] == 1
+        if first:
+            log.warning("Especie/forma sin entrada en la tabla: %r (forma %r, hembra=%s)", who, form, female)
+    return row
+
+
+def misses() -> Dict[LookupKey, int]:
+    """Consultas sin entrada desde el arranque, con su número de repeticiones."""
+    with _LOCK:
+        return dict(_MISSES)
@@ -0,0 +1,132 @@
+"""
+Atlas de sprites por caja: los 30 sprites de una caja en una sola imagen.
+
+`box_atlas(save_hash, box, urls)` compone (con Pillow) los sprites ya presentes en
+la caché local (sprite_cache) en una rejilla de COLS columnas y la guarda en
+data/sprites/atlas/<save_hash>-<box>.png junto a su mapa de desplazamientos
+(.json). Las variantes shiny/hembra vienen ya resueltas en cada URL.
+
+La rejilla de la caja (box_grid) recibe la hoja como data URI (`sheet_uri`) y cada
+casilla la recorta con background-position: el navegador hace una sola
+petición/decodificación por caja en lugar de 30.
+
+Si falta algún sprite en disco (o no hay Pillow) devuelve None; el llamador pinta
+las casillas sueltas y el atlas se construye en un render posterior.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from dexdata import _write_atomic
+from sprite_cache import SPRITES_DIR, local_path, prefetch
+
+CELL = 96          # tamaño de los sprites gen5 de Showdown
+COLS = 6
+MAX_ATLASES = 200  # hojas en disco; se borran las más antiguas
+
+ATLAS_DIR = SPRITES_DIR / "atlas"
+
+_LOCK = threading.Lock()
+_URIS: Dict[str, Tuple[str, str]] = {}   # ruta de la hoja -> (huella, data URI)
+
+
+class Atlas(NamedTuple):
+    path: Path
+    digest: str                          # huella de las URLs que contiene
+    cols: int
+    rows: int
+    cell: int
+    offsets: Dict[int, Tuple[int, int]]  # casilla -> (x, y) en píxeles de la hoja
+
+
+def _digest(urls: Sequence[Optional[str]]) -> str:
+    return hashlib.sha256("\n".join(u or "" for u in urls).encode("utf-8")).hexdigest()[:16]
+
+
+def _read_meta(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def _prune() -> None:
+    try:
+        sheets = sorted(ATLAS_DIR.glob("*.png"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in sheets[MAX_ATLASES:]:
+            for f in (old, old.with_suffix(".json")):
+                try:
+                    f.unlink()
+                except Exception:
+                    pass
+    except Exception:
+        pass
+
+
+def _compose(files: Sequence[Optional[Path]]) -> Tuple[bytes, Dict[int, Tuple[int, int]], int]:
+    from PIL import Image
+    rows = max(1, -(-len(files) // COLS))
+    sheet = Image.new("RGBA", (COLS * CELL, rows * CELL), (0, 0, 0, 0))
+    offsets: Dict[int, Tuple[int, int]] = {}
+    for slot, f in enumerate(files):
+        if f is None:
+            continue
+        x, y = (slot % COLS) * CELL, (slot // COLS) * CELL
+        with Image.open(f) as im:
+            im = im.convert("RGBA")
+            if im.width > CELL or im.height > CELL:
+                im.thumbnail((CELL, CELL), Image.NEAREST)
+            sheet.paste(im, (x + (CELL - im.width) // 2, y + (CELL - im.height) // 2), im)
+        offsets[slot] = (x, y)
+    buf = BytesIO()
+    sheet.save(buf, format="PNG", optimize=True)
+    return buf.getvalue(), offsets, rows
+
+
+def box_atlas(save_hash: str, box: int, urls: Sequence[Optional[str]]) -> Optional[Atlas]:
+    """Hoja de la caja `box` del save `save_hash` (URLs de sprite por casilla, None = vacía)."""
+    digest = _digest(urls)
+    path = ATLAS_DIR / f"{save_hash}-{int(box)}.png"
+    meta = _read_meta(path)
+    if meta and meta.get("digest") == digest and path.is_file():
+        return Atlas(path, digest, meta["cols"], meta["rows"], meta["cell"],
+                     {int(k): tuple(v) for k, v in meta["offsets"].items()})
+    files: List[Optional[Path]] = [local_path(u) if u else None for u in urls]
+    if any(u and f is None for u, f in zip(urls, files)):
+        prefetch(u for u in urls if u)
+        return None
+    try:
+        data, offsets, rows = _compose(files)
+        ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, data)
+        _write_atomic(path.with_suffix(".json"), json.dumps({
+            "digest": digest, "cols": COLS, "rows": rows, "cell": CELL,
+            "offsets": {str(k): v for k, v in offsets.items()},
+        }).encode("utf-8"))
+    except Exception:
+        return None
+    with _LOCK:
+        _URIS.pop(str(path), None)
+    _prune()
+    return Atlas(path, digest, COLS, rows, CELL, offsets)
+
+
+def sheet_uri(atlas: Atlas) -> str:
+    """Data URI de la hoja (en memoria mientras no cambie su huella)."""
+    key = str(atlas.path)
+    with _LOCK:
+        cached = _URIS.get(key)
+    if cached is not None and cached[0] == atlas.digest:
+        return cached[1]
+    uri = "data:image/png;base64," + base64.b64encode(atlas.path.read_bytes()).decode("ascii")
+    with _LOCK:
+        if len(_URIS) >= MAX_ATLASES:
+            _URIS.pop(next(iter(_URIS)))
+        _URIS[key] = (atlas.digest, uri)
+    return uri
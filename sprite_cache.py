@@ -0,0 +1,179 @@
+"""
+Caché local de sprites de Showdown.
+
+Los sprites se guardan en data/sprites/<variante>/<id>.(png|gif), donde la variante
+es la carpeta de Showdown (gen5, ani, ani-shiny...). La app los sirve desde disco:
+
+- `sprite_src(url)`: data URI (en memoria) para el HTML de las tarjetas.
+- `sprite_image(url)`: ruta local para `st.image` (lo sirve el media manager).
+
+Si el sprite aún no está en disco se devuelve la URL remota y se encola su descarga
+en segundo plano; el siguiente render ya lo pinta desde local. `prefetch(urls)`
+encola de una vez todos los de un equipo o una caja.
+
+SHOWDOWN_SPRITES_BASE permite apuntar a otro servidor (p. ej. uno local de pruebas).
+"""
+from __future__ import annotations
+
+import base64
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from dexdata import DATA_DIR, OFFLINE, _write_atomic
+
+REMOTE_BASE = "https://play.pokemonshowdown.com/sprites"
+FETCH_BASE = os.environ.get("SHOWDOWN_SPRITES_BASE", REMOTE_BASE).rstrip("/")
+FETCH_TIMEOUT = float(os.environ.get("SPRITES_TIMEOUT", "10"))
+FETCH_WORKERS = 4
+NEGATIVE_TTL = 6 * 3600    # no reintentar un 404 durante 6 h
+MAX_DATA_URIS = 2048       # data URIs en memoria (png gen5 ~2-5 KB, gif ani ~10-40 KB)
+
+SPRITES_DIR = DATA_DIR / "sprites"
+
+_MIME = {"png": "image/png", "gif": "image/gif"}
+_REL_RE = re.compile(r"^([a-z0-9-]+)/([a-z0-9-]+)\.(png|gif)$")
+
+_LOCK = threading.Lock()
+_POOL: Optional[ThreadPoolExecutor] = None
+_PENDING: Set[str] = set()
+_FAILED: Dict[str, float] = {}
+_DATA_URIS: Dict[str, str] = {}
+_STATS = {"hits": 0, "misses": 0, "fetched": 0, "failed": 0}
+
+
+def _relpath(url: str) -> Optional[str]:
+    """'https://play.pokemonshowdown.com/sprites/ani/rotom-heat.gif' -> 'ani/rotom-heat.gif'."""
+    if not isinstance(url, str) or not url.startswith(REMOTE_BASE + "/"):
+        return None
+    rel = url[len(REMOTE_BASE) + 1:]
+    return rel if _REL_RE.match(rel) else None
+
+
+def local_path(url: str) -> Optional[Path]:
+    """Ruta en disco del sprite si ya está descargado."""
+    rel = _relpath(url)
+    if rel is None:
+        return None
+    path = SPRITES_DIR / rel
+    return path if path.is_file() else None
+
+
+def _fetch(rel: str) -> bool:
+    import urllib.error
+    import urllib.request
+    try:
+        try:
+            with urllib.request.urlopen(f"{FETCH_BASE}/{rel}", timeout=FETCH_TIMEOUT) as resp:
+                data = resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                with _LOCK:
+                    _FAILED[rel] = time.time()
+            raise
+        if not data:
+            raise ValueError("sprite vacío")
+        path = SPRITES_DIR / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, data)
+        with _LOCK:
+            _STATS["fetched"] += 1
+        return True
+    except Exception:
+        with _LOCK:
+            _STATS["failed"] += 1
+        return False
+    finally:
+        with _LOCK:
+            _PENDING.discard(rel)
+
+
+def _enqueue(rel: str) -> bool:
+    """Encola la descarga si no está ya en curso ni marcada como inexistente."""
+    global _POOL
+    if OFFLINE:
+        return False
+    with _LOCK:
+        if rel in _PENDING:
+            return False
+        failed = _FAILED.get(rel)
+        if failed is not None and time.time() - failed < NEGATIVE_TTL:
+            return False
+        _PENDING.add(rel)
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="sprites")
+        pool = _POOL
+    pool.submit(_fetch, rel)
+    return True
+
+
+def prefetch(urls: Iterable[str]) -> int:
+    """Encola en segundo plano los sprites que falten en disco. Devuelve cuántos."""
+    n = 0
+    for url in urls or ():
+        rel = _relpath(url)
+        if rel and not (SPRITES_DIR / rel).is_file() and _enqueue(rel):
+            n += 1
+    return n
+
+
+def wait(timeout: float = 30.0) -> bool:
+    """Espera a que terminen las descargas encoladas (herramientas y pruebas)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with _LOCK:
+            if not _PENDING:
+                return True
+        time.sleep(0.02)
+    return False
+
+
+def _resolve(url: str) -> Tuple[Optional[str], Optional[Path]]:
+    rel = _relpath(url)
+    if rel is None:
+        return None, None
+    path = SPRITES_DIR / rel
+    if path.is_file():
+        with _LOCK:
+            _STATS["hits"] += 1
+        return rel, path
+    with _LOCK:
+        _STATS["misses"] += 1
+    _enqueue(rel)
+    return rel, None
+
+
+def sprite_src(url: str) -> str:
+    """Data URI del sprite local para incrustar en HTML; la URL remota si aún no está."""
+    rel, path = _resolve(url)
+    if path is None:
+        return url
+    with _LOCK:
+        cached = _DATA_URIS.get(rel)
+    if cached is not None:
+        return cached
+    try:
+        data = path.read_bytes()
+    except Exception:
+        return url
+    uri = f"data:{_MIME[rel.rsplit('.', 1)[1]]};base64,{base64.b64encode(data).decode('ascii')}"
+    with _LOCK:
+        if len(_DATA_URIS) >= MAX_DATA_URIS:
+            _DATA_URIS.pop(next(iter(_DATA_URIS)))
+        _DATA_URIS[rel] = uri
+    return uri
+
+
+def sprite_image(url: str) -> str:
+    """Ruta local para st.image; la URL remota si aún no está."""
+    _, path = _resolve(url)
+    return str(path) if path is not None else url
+
+
+def stats() -> Dict[str, int]:
+    with _LOCK:
+        return {**_STATS, "pending": len(_PENDING), "data_uris": len(_DATA_URIS)}
@@ -0,0 +1,118 @@
+"""
+Cálculo vectorizado de estadísticas (NumPy) para muchos Pokémon a la vez.
+
+`compute_stats` aplica la fórmula de Gen 3+ sobre matrices N×6 (PS, Ataque,
+Defensa, At. Esp., Def. Esp., Velocidad); `batch_stats` prepara esas matrices a
+partir de los dicts que devuelve el bridge (equipo, caja o PC completo).
+La naturaleza se aplica con una matriz 25×6 de multiplicadores en décimas
+(9/10/11) para que todo sea aritmética entera, como en el juego.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from i18n import NATURES_ES
+
+STAT_KEYS = ("hp", "atk", "def", "spa", "spd", "spe")
+_LONG_TO_SHORT = {
+    "attack": "atk",
+    "defense": "def",
+    "special-attack": "spa",
+    "special-defense": "spd",
+    "speed": "spe",
+}
+
+NATURE_NAMES: Tuple[str, ...] = tuple(NATURES_ES.keys())
+NATURE_INDEX: Dict[str, int] = {n.lower(): i for i, n in enumerate(NATURE_NAMES)}
+NEUTRAL_NATURE = NATURE_INDEX["hardy"]
+
+
+def _nature_matrix() -> np.ndarray:
+    m = np.full((len(NATURE_NAMES), len(STAT_KEYS)), 10, dtype=np.int32)
+    for i, name in enumerate(NATURE_NAMES):
+        _es, up, down = NATURES_ES[name]
+        if up and down:
+            m[i, STAT_KEYS.index(_LONG_TO_SHORT[up])] = 11
+            m[i, STAT_KEYS.index(_LONG_TO_SHORT[down])] = 9
+    m.setflags(write=False)
+    return m
+
+
+NATURE_MULT = _nature_matrix()
+
+
+def nature_index(nature: Any) -> int:
+    """Índice en NATURE_MULT (naturaleza neutra si no se reconoce)."""
+    return NATURE_INDEX.get(str(nature or "").strip().lower(), NEUTRAL_NATURE)
+
+
+def compute_stats(base: np.ndarray, ivs: np.ndarray, evs: np.ndarray,
+                  levels: np.ndarray, natures: np.ndarray) -> np.ndarray:
+    """Stats finales N×6 (int32). `base/ivs/evs` son N×6, `levels` y `natures` (índices
+    de NATURE_MULT) son vectores de N."""
+    base = np.asarray(base, dtype=np.int32)
+    lv = np.asarray(levels, dtype=np.int32)[:, None]
+    core = ((2 * base + np.asarray(ivs, dtype=np.int32) + np.asarray(evs, dtype=np.int32) // 4) * lv) // 100
+    out = ((core + 5) * NATURE_MULT[np.asarray(natures, dtype=np.intp)]) // 10
+    out[:, 0] = core[:, 0] + lv[:, 0] + 10
+    return out
+
+
+def _to_int(x: Any, default: int = 0) -> int:
+    try:
+        return int(x)
+    except Exception:
+        return default
+
+
+@lru_cache(maxsize=4096)
+def _base_row(species: str, form_index: Optional[int], form_name: Optional[str],
+              gender: Optional[str]) -> Optional[Tuple[int, ...]]:
+    from dexdata import base_stats
+    try:
+        bs = base_stats(species_name=species, form_index=form_index, form_name=form_name, gender=gender)
+    except Exception:
+        return None
+    if not bs or any(bs.get(k) is None for k in STAT_KEYS):
+        return None
+    return tuple(int(bs[k]) for k in STAT_KEYS)
+
+
+def batch_stats(mons: Sequence[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """(stats N×6, válido N). Una fila no es válida si no hay stats base para la especie;
+    faltan IVs/EVs -> 0, nivel -> 50, como en la ficha de Entrenadores."""
+    n = len(mons)
+    base = np.zeros((n, 6), dtype=np.int32)
+    ivs = np.zeros((n, 6), dtype=np.int32)
+    evs = np.zeros((n, 6), dtype=np.int32)
+    levels = np.full(n, 50, dtype=np.int32)
+    natures = np.full(n, NEUTRAL_NATURE, dtype=np.intp)
+    valid = np.zeros(n, dtype=bool)
+    for i, p in enumerate(mons):
+        if not isinstance(p, dict):
+            continue
+        species = p.get("species_name") or p.get("species")
+        if not species:
+            continue
+        fi = p.get("form_index")
+        row = _base_row(str(species), fi if isinstance(fi, int) else None, p.get("form_name"), p.get("gender"))
+        if row is None:
+            continue
+        valid[i] = True
+        base[i] = row
+        iv = p.get("ivs") or {}
+        ev = p.get("evs") or {}
+        ivs[i] = [_to_int(iv.get(k)) for k in STAT_KEYS]
+        evs[i] = [_to_int(ev.get(k)) for k in STAT_KEYS]
+        levels[i] = _to_int(p.get("level") or 50, 50)
+        natures[i] = nature_index(p.get("nature"))
+    return compute_stats(base, ivs, evs, levels, natures), valid
+
+
+def stats_dicts(mons: Sequence[dict]) -> List[Optional[Dict[str, int]]]:
+    """Como batch_stats pero en dicts {'hp','atk',...} (None si no hay datos)."""
+    arr, valid = batch_stats(mons)
+    return [dict(zip(STAT_KEYS, map(int, row))) if ok else None for row, ok in zip(arr, valid)]
@@ -2,20 +2,39 @@
 import os
 import sqlite3
 import hashlib
+import json
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as _FutureTimeout
 from pathlib import Path
-from typing import Optional, List, Tuple, Any
-import httpx
-from supabase import create_client, Client
+from typing import Optional, List, Tuple, Any, Callable, Dict
+
+from storage_backends import (
+    StorageBackend,
+    LocalSQLiteBackend,
+    SupabaseBackend,
+    FakeRemoteBackend,
+)
 
 # Rutas de datos en la raíz del proyecto
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 SAVES_DIR = DATA_DIR / "saves"
 DB_PATH = DATA_DIR / "app.db"
-_SUPABASE: Client | None = None
 _SUPABASE_BUCKET = os.environ.get("SUPABASE_BUCKET", "saves")
 
+# Caché de metadatos remotos (sólo con Supabase): TTL por clave y espejo local
+META_CACHE_TTL = float(os.environ.get("STORAGE_META_TTL", "30"))
+REMOTE_READ_TIMEOUT = float(os.environ.get("STORAGE_REMOTE_TIMEOUT", "1.5"))
+_META_CACHE: Dict[str, Tuple[float, Any]] = {}
+_META_LOCK = threading.Lock()
+_META_GEN = 0  # se incrementa al invalidar para descartar lecturas en vuelo
+_META_STATS: Dict[str, float] = {
+    "hits": 0, "misses": 0, "remote_calls": 0, "remote_errors": 0,
+    "remote_ms": 0.0, "mirror_reads": 0,
+}
+_REMOTE_POOL: ThreadPoolExecutor | None = None
+
 
 def _supabase_enabled() -> bool:
     url = os.environ.get("SUPABASE_URL", "").strip()
@@ -23,86 +42,252 @@ def _supabase_enabled() -> bool:
     return bool(url and key)
 
 
-def _sb() -> Client:
-    global _SUPABASE
-    if _SUPABASE is None:
+def _bucket_name() -> str:
+    return _SUPABASE_BUCKET or "saves"
+
+
+# ---------- Backend de saves ----------
+# Se elige una sola vez por proceso: STORAGE_BACKEND=local|supabase|fake.
+# Sin variable: Supabase si hay credenciales, si no local (comportamiento anterior).
+_BACKEND: StorageBackend | None = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def _make_backend() -> StorageBackend:
+    kind = os.environ.get("STORAGE_BACKEND", "").strip().lower()
+    if not kind:
+        kind = "supabase" if _supabase_enabled() else "local"
+    if kind == "supabase":
         url = os.environ.get("SUPABASE_URL", "").strip()
         key = os.environ.get("SUPABASE_KEY", "").strip()
         if not url or not key:
             raise RuntimeError("Supabase no configurado")
-        _SUPABASE = create_client(url, key)
-    return _SUPABASE
+        return SupabaseBackend(url, key, _bucket_name())
+    if kind == "fake":
+        return FakeRemoteBackend.from_env()
+    return LocalSQLiteBackend(lambda: _conn(), SAVES_DIR)
 
 
-def _bucket_name() -> str:
-    return _SUPABASE_BUCKET or "saves"
+def _backend() -> StorageBackend:
+    global _BACKEND
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = _make_backend()
+    return _BACKEND
+
+
+def set_backend(backend: StorageBackend | None) -> StorageBackend | None:
+    """Sustituye el backend activo (None = volver a elegir según entorno) y
+    limpia la caché de metadatos. Devuelve el anterior."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        prev, _BACKEND = _BACKEND, backend
+    invalidate_metadata_cache()
+    return prev
 
 
 def _conn():
     return sqlite3.connect(DB_PATH)
 
 
+# ---------- Esquema: migraciones versionadas ----------
+# Cada paso se aplica una sola vez (tabla schema_version) y en su propia transacción.
+# Los pasos usan IF NOT EXISTS para adoptar bases de datos creadas antes del versionado.
+
+def _m001_base(cx) -> None:
+    cx.execute("""CREATE TABLE IF NOT EXISTS saves (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT NOT NULL,
+        original_name TEXT,
+        sha256 TEXT NOT NULL,
+        uploader TEXT,
+        created_at INTEGER NOT NULL
+    )""")
+    cx.execute("""CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )""")
+    cx.execute("""CREATE TABLE IF NOT EXISTS purchases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user TEXT NOT NULL,
+        item TEXT NOT NULL,
+        price INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        status TEXT,
+        redeemed_at INTEGER
+    )""")
+    cx.execute("""CREATE TABLE IF NOT EXISTS redemptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        purchase_id INTEGER NOT NULL,
+        user TEXT NOT NULL,
+        item TEXT NOT NULL,
+        payload_json TEXT,
+        created_at INTEGER NOT NULL
+    )""")
+    cx.execute("""CREATE TABLE IF NOT EXISTS pokemon_flags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        owner TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        flags_json TEXT,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL
+    )""")
+
+
+def _m002_purchase_status(cx) -> None:
+    # Bases antiguas: `purchases` sin status / redeemed_at
+    cols = {r[1] for r in cx.execute("PRAGMA table_info(purchases)").fetchall()}
+    if 'status' not in cols:
+        cx.execute("ALTER TABLE purchases ADD COLUMN status TEXT")
+    if 'redeemed_at' not in cols:
+        cx.execute("ALTER TABLE purchases ADD COLUMN redeemed_at INTEGER")
+
+
+def _m003_indexes(cx) -> None:
+    cx.execute("CREATE INDEX IF NOT EXISTS idx_flags_fp ON pokemon_flags(fingerprint)")
+    cx.execute("CREATE INDEX IF NOT EXISTS idx_flags_owner ON pokemon_flags(owner)")
+    cx.execute("CREATE INDEX IF NOT EXISTS idx_purchases_user ON purchases(user)")
+    cx.execute("CREATE INDEX IF NOT EXISTS idx_purchases_created ON purchases(created_at)")
+
+
+def _m004_saves_mirror(cx) -> None:
+    # Espejo local de los metadatos remotos (se lee si Supabase va lento o falla)
+    cx.execute("""CREATE TABLE IF NOT EXISTS saves_mirror (
+        id INTEGER PRIMARY KEY,
+        filename TEXT NOT NULL,
+        original_name TEXT,
+        sha256 TEXT,
+        uploader TEXT,
+        created_at INTEGER NOT NULL
+    )""")
+
+
+def _m005_balances(cx) -> None:
+    # Saldo materializado por usuario (lo mantienen add_purchase / clear_purchases / fuentes de monedas)
+    cx.execute("""CREATE TABLE IF NOT EXISTS balances (
+        user TEXT PRIMARY KEY,
+        spent INTEGER NOT NULL DEFAULT 0,
+        league_coins INTEGER NOT NULL DEFAULT 0,
+        badge_coins INTEGER NOT NULL DEFAULT 0,
+        updated_at INTEGER NOT NULL
+    )""")
+
+
+def _m006_league(cx) -> None:
+    # Liga normalizada: una fila por enfrentamiento / posición / movimiento
+    cx.execute("""CREATE TABLE IF NOT EXISTS league_matches (
+        tramo INTEGER NOT NULL,
+        division TEXT NOT NULL,
+        p1 TEXT NOT NULL,
+        p2 TEXT NOT NULL,
+        winner TEXT,
+        seq INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (tramo, division, p1, p2)
+    )""")
+    cx.execute("""CREATE TABLE IF NOT EXISTS league_results (
+        user TEXT NOT NULL,
+        tramo INTEGER NOT NULL,
+        pos INTEGER NOT NULL,
+        PRIMARY KEY (user, tramo)
+    )""")
+    cx.execute("""CREATE TABLE IF NOT EXISTS league_movements (
+        tramo INTEGER PRIMARY KEY,
+        up_json TEXT,
+        down_json TEXT
+    )""")
+
+
+def _m007_saves_by_uploader(cx) -> None:
+    # list_saves_by_user: WHERE uploader=? ORDER BY id DESC
+    cx.execute("CREATE INDEX IF NOT EXISTS idx_saves_uploader ON saves(uploader, id)")
+
+
+def _m008_trainer_snapshots(cx) -> None:
+    # Resumen derivado del último .sav de cada entrenador (snapshots.py)
+    cx.execute("""CREATE TABLE IF NOT EXISTS trainer_snapshots (
+        user TEXT PRIMARY KEY,
+        save_path TEXT NOT NULL,
+        save_mtime_ns INTEGER NOT NULL,
+        data_json TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+    )""")
+
+
+def _m009_league_balances(cx) -> None:
+    # Las monedas de liga del saldo salían de session_state: se recalculan desde league_results
+    _sync_league_balances(cx)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "base", _m001_base),
+    (2, "purchase_status", _m002_purchase_status),
+    (3, "indexes", _m003_indexes),
+    (4, "saves_mirror", _m004_saves_mirror),
+    (5, "balances", _m005_balances),
+    (6, "league", _m006_league),
+    (7, "saves_by_uploader", _m007_saves_by_uploader),
+    (8, "trainer_snapshots", _m008_trainer_snapshots),
+    (9, "league_balances", _m009_league_balances),
+]
+
+_INIT_LOCK = threading.Lock()
+_INIT_DONE = False
+
+
+def schema_version(cx: sqlite3.Connection) -> int:
+    cx.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at INTEGER NOT NULL
+    )""")
+    row = cx.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+    return int(row[0] or 0)
+
+
+def migrate(db_path: Path | None = None) -> List[int]:
+    """Aplica en orden las migraciones pendientes. Devuelve las versiones aplicadas."""
+    applied: List[int] = []
+    cx = sqlite3.connect(db_path or DB_PATH, isolation_level=None)
+    try:
+        current = schema_version(cx)
+        for version, name, step in MIGRATIONS:
+            if version <= current:
+                continue
+            cx.execute("BEGIN IMMEDIATE")
+            try:
+                # Otro proceso pudo aplicarla entre la lectura de arriba y el BEGIN
+                if cx.execute("SELECT 1 FROM schema_version WHERE version=?", (version,)).fetchone():
+                    cx.execute("COMMIT")
+                    continue
+                step(cx)
+                cx.execute(
+                    "INSERT INTO schema_version(version, name, applied_at) VALUES(?,?,?)",
+                    (version, name, int(time.time())),
+                )
+                cx.execute("COMMIT")
+            except Exception:
+                cx.execute("ROLLBACK")
+                raise
+            applied.append(version)
+    finally:
+        cx.close()
+    return applied
+
+
 def init_storage():
-    DATA_DIR.mkdir(exist_ok=True)
-    SAVES_DIR.mkdir(exist_ok=True)
-    with _conn() as cx:
-        cx.execute("""CREATE TABLE IF NOT EXISTS saves (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            filename TEXT NOT NULL,
-            original_name TEXT,
-            sha256 TEXT NOT NULL,
-            uploader TEXT,
-            created_at INTEGER NOT NULL
-        )""")
-        cx.execute("""CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )""")
-        cx.execute("""CREATE TABLE IF NOT EXISTS purchases (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user TEXT NOT NULL,
-            item TEXT NOT NULL,
-            price INTEGER NOT NULL,
-            created_at INTEGER NOT NULL,
-            status TEXT,
-            redeemed_at INTEGER
-        )""")
-        # Migraciones ligeras: columnas nuevas si faltan
-        try:
-            cols = {r[1] for r in cx.execute("PRAGMA table_info(purchases)").fetchall()}
-            if 'status' not in cols:
-                cx.execute("ALTER TABLE purchases ADD COLUMN status TEXT")
-            if 'redeemed_at' not in cols:
-                cx.execute("ALTER TABLE purchases ADD COLUMN redeemed_at INTEGER")
-        except Exception:
-            pass
-        cx.execute("""CREATE TABLE IF NOT EXISTS redemptions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            purchase_id INTEGER NOT NULL,
-            user TEXT NOT NULL,
-            item TEXT NOT NULL,
-            payload_json TEXT,
-            created_at INTEGER NOT NULL
-        )""")
-        cx.execute("""CREATE TABLE IF NOT EXISTS pokemon_flags (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            owner TEXT NOT NULL,
-            fingerprint TEXT NOT NULL,
-            flags_json TEXT,
-            created_at INTEGER NOT NULL,
-            updated_at INTEGER NOT NULL
-        )""")
-        try:
-            cx.execute("CREATE INDEX IF NOT EXISTS idx_flags_fp ON pokemon_flags(fingerprint)")
-            cx.execute("CREATE INDEX IF NOT EXISTS idx_flags_owner ON pokemon_flags(owner)")
-        except Exception:
-            pass
-        try:
-            cx.execute("CREATE INDEX IF NOT EXISTS idx_purchases_user ON purchases(user)")
-            cx.execute("CREATE INDEX IF NOT EXISTS idx_purchases_created ON purchases(created_at)")
-        except Exception:
-            pass
-        cx.commit()
+    """Prepara carpetas y esquema una sola vez por proceso (las siguientes llamadas no hacen DDL)."""
+    global _INIT_DONE
+    if _INIT_DONE:
+        return
+    with _INIT_LOCK:
+        if _INIT_DONE:
+            return
+        DATA_DIR.mkdir(exist_ok=True)
+        SAVES_DIR.mkdir(exist_ok=True)
+        migrate()
+        start_balance_reconciler()
+        _INIT_DONE = True
 
 
 def _sha256(b: bytes) -> str:
@@ -111,46 +296,124 @@ def _sha256(b: bytes) -> str:
     return h.hexdigest()
 
 
-def _iso_to_ts(val: Any) -> int:
+# ---------- Caché de metadatos remotos ----------
+
+def _remote_pool() -> ThreadPoolExecutor:
+    global _REMOTE_POOL
+    if _REMOTE_POOL is None:
+        _REMOTE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="storage-meta")
+    return _REMOTE_POOL
+
+
+def _mirror_rows(rows: List[Tuple]) -> None:
+    """Replica en SQLite las filas remotas leídas (id, filename, original, sha, user, ts)."""
+    rows = [r for r in rows if r and r[0] is not None]
+    if not rows:
+        return
     try:
-        if val is None:
-            return 0
-        import datetime
-        if isinstance(val, (int, float)):
-            return int(val)
-        s = str(val).replace("Z", "+00:00")
-        dt = datetime.datetime.fromisoformat(s)
-        return int(dt.timestamp())
+        with _conn() as cx:
+            cx.executemany(
+                """INSERT INTO saves_mirror(id, filename, original_name, sha256, uploader, created_at)
+                   VALUES(?,?,?,?,?,?)
+                   ON CONFLICT(id) DO UPDATE SET filename=excluded.filename,
+                       original_name=excluded.original_name, sha256=excluded.sha256,
+                       uploader=excluded.uploader, created_at=excluded.created_at""",
+                rows,
+            )
+            cx.commit()
     except Exception:
-        return 0
+        pass
 
 
-def _fetch_save_by_id(save_id: int) -> Optional[Tuple]:
-    if _supabase_enabled():
+def _meta_remote_load(key: str, remote_fn: Callable[[], Any], gen: int, ttl: float) -> Any:
+    t0 = time.perf_counter()
+    try:
+        val = remote_fn()
+    except Exception:
+        with _META_LOCK:
+            _META_STATS["remote_errors"] += 1
+        raise
+    finally:
+        with _META_LOCK:
+            _META_STATS["remote_calls"] += 1
+            _META_STATS["remote_ms"] += (time.perf_counter() - t0) * 1000.0
+    with _META_LOCK:
+        if gen == _META_GEN:
+            _META_CACHE[key] = (time.monotonic() + ttl, val)
+    if isinstance(val, list):
+        _mirror_rows(val)
+    elif isinstance(val, tuple):
+        _mirror_rows([val])
+    return val
+
+
+def _meta_read(key: str, remote_fn: Callable[[], Any], mirror_fn: Callable[[], Any], *, ttl: float | None = None) -> Any:
+    """Lectura read-through: caché TTL -> backend remoto (con timeout) -> espejo SQLite.
+    Si el remoto tarda más de REMOTE_READ_TIMEOUT se sirve el espejo y la petición
+    sigue en segundo plano rellenando la caché para el próximo rerun."""
+    now = time.monotonic()
+    with _META_LOCK:
+        ent = _META_CACHE.get(key)
+        if ent is not None and ent[0] > now:
+            _META_STATS["hits"] += 1
+            return ent[1]
+        _META_STATS["misses"] += 1
+        gen = _META_GEN
+    fut = _remote_pool().submit(_meta_remote_load, key, remote_fn, gen, META_CACHE_TTL if ttl is None else ttl)
+    try:
+        return fut.result(timeout=REMOTE_READ_TIMEOUT)
+    except (_FutureTimeout, Exception):
+        with _META_LOCK:
+            _META_STATS["mirror_reads"] += 1
         try:
-            client = _sb()
-            res = client.table("saves").select("*").eq("id", int(save_id)).limit(1).execute()
-            data = (res.data or [])
-            if not data:
-                return None
-            row = data[0]
-            ts = _iso_to_ts(row.get("created_at"))
-            return (
-                row.get("id"),
-                row.get("filename"),
-                row.get("original_name"),
-                row.get("sha256"),
-                row.get("user"),
-                ts,
-            )
+            return mirror_fn()
         except Exception:
             return None
+
+
+def invalidate_metadata_cache(prefix: str | None = None) -> None:
+    """Invalida la caché de metadatos (todas las claves o las que empiezan por `prefix`).
+
+    `prefix` debe acabar en ':' (p. ej. "saves:user:ana:"): "save:1" también
+    borraría "save:10", "save:123"...
+    """
+    global _META_GEN
+    with _META_LOCK:
+        _META_GEN += 1
+        if prefix is None:
+            _META_CACHE.clear()
+            return
+        for k in [k for k in _META_CACHE if k.startswith(prefix)]:
+            _META_CACHE.pop(k, None)
+
+
+def metadata_cache_stats() -> dict:
+    """Contadores de la caché: aciertos, fallos, hit rate y latencia media del remoto."""
+    with _META_LOCK:
+        out = dict(_META_STATS)
+        out["entries"] = len(_META_CACHE)
+    lookups = out["hits"] + out["misses"]
+    out["hit_rate"] = (out["hits"] / lookups) if lookups else 0.0
+    out["avg_remote_ms"] = (out["remote_ms"] / out["remote_calls"]) if out["remote_calls"] else 0.0
+    return out
+
+
+def _mirror_query(sql: str, params: tuple, *, one: bool = False):
     with _conn() as cx:
-        row = cx.execute(
-            "SELECT id, filename, original_name, sha256, uploader, created_at FROM saves WHERE id=?",
-            (int(save_id),),
-        ).fetchone()
-        return row
+        cur = cx.execute(sql, params)
+        return cur.fetchone() if one else cur.fetchall()
+
+
+def _fetch_save_by_id(save_id: int) -> Optional[Tuple]:
+    backend = _backend()
+    if backend.remote:
+        def mirror() -> Optional[Tuple]:
+            return _mirror_query(
+                "SELECT id, filename, original_name, sha256, uploader, created_at FROM saves_mirror WHERE id=?",
+                (int(save_id),), one=True,
+            )
+        return _meta_read(f"save:{int(save_id)}", lambda: backend.get_save(int(save_id)), mirror)
+    return backend.get_save(int(save_id))
 
 
 def save_upload(content: bytes, original_name: str, uploader: str|None=None) -> dict:
@@ -158,79 +421,45 @@ def save_upload(content: bytes, original_name: str, uploader: str|None=None) ->
     ts = int(time.time())
     safe_name = f"{ts}_{sha[:8]}.sav"
 
-    if _supabase_enabled():
+    backend = _backend()
+    if backend.remote:
         try:
-            client = _sb()
-            bucket = _bucket_name()
-            # Subir al bucket (sin upsert para evitar headers inválidos)
-            client.storage.from_(bucket).upload(
-                safe_name,
-                content,
-                {"content-type": "application/octet-stream"},
-            )
-            public_url = client.storage.from_(bucket).get_public_url(safe_name)
+            url = backend.put_blob(safe_name, content)
             # Insertar metadatos en tabla remota
-            res = client.table("saves").insert(
-                {
-                    "filename": safe_name,
-                    "original_name": original_name,
-                    "user": uploader,
-                    "url": public_url,
-                    "sha256": sha,
-                }
-            ).execute()
-            new_id = None
-            try:
-                data = res.data or []
-                if data:
-                    new_id = data[0].get("id")
-            except Exception:
-                new_id = None
+            new_id = backend.insert_save(
+                filename=safe_name, original_name=original_name, sha256=sha,
+                uploader=uploader, created_at=ts, url=url,
+            )
+            if new_id is not None:
+                _mirror_rows([(new_id, safe_name, original_name, sha, uploader, ts)])
+            invalidate_metadata_cache("saves:")
             return {
                 "id": new_id,
                 "filename": safe_name,
                 "sha256": sha,
                 "created_at": ts,
-                "url": public_url,
+                "url": url,
             }
         except Exception:
             return {"id": None, "filename": safe_name, "sha256": sha, "created_at": ts, "url": None}
 
-    # Fallback local
-    (SAVES_DIR / safe_name).write_bytes(content)
-    with _conn() as cx:
-        cx.execute(
-            "INSERT INTO saves(filename, original_name, sha256, uploader, created_at) VALUES(?,?,?,?,?)",
-            (safe_name, original_name, sha, uploader, ts)
-        )
-        rowid = cx.execute("SELECT last_insert_rowid()").fetchone()[0]
-        cx.commit()
+    backend.put_blob(safe_name, content)
+    rowid = backend.insert_save(
+        filename=safe_name, original_name=original_name, sha256=sha, uploader=uploader, created_at=ts,
+    )
     return {"id": rowid, "filename": safe_name, "sha256": sha, "created_at": ts}
 
 
 def list_saves(limit: int = 50) -> List[Tuple]:
-    if _supabase_enabled():
-        client = _sb()
-        res = client.table("saves").select("*").order("id", desc=True).limit(limit).execute()
-        out = []
-        for row in res.data or []:
-            ts = _iso_to_ts(row.get("created_at"))
-            out.append(
-                (
-                    row.get("id"),
-                    row.get("filename"),
-                    row.get("original_name"),
-                    row.get("sha256"),
-                    row.get("user"),
-                    ts,
-                )
+    backend = _backend()
+    if backend.remote:
+        def mirror() -> List[Tuple]:
+            return _mirror_query(
+                "SELECT id, filename, original_name, sha256, uploader, created_at FROM saves_mirror ORDER BY id DESC LIMIT ?",
+                (limit,),
             )
-        return out
-    with _conn() as cx:
-        return cx.execute(
-            "SELECT id, filename, original_name, sha256, uploader, created_at FROM saves ORDER BY id DESC LIMIT ?",
-            (limit,)
-        ).fetchall()
+        return _meta_read(f"saves:all:{int(limit)}", lambda: backend.list_saves(limit), mirror) or []
+    return backend.list_saves(limit)
 
 
 def set_current_save(save_id: int):
@@ -253,23 +482,8 @@ def get_current_save() -> Optional[Tuple]:
 
 
 def load_save_bytes(filename: str) -> bytes:
-    if _supabase_enabled():
-        try:
-            client = _sb()
-            bucket = _bucket_name()
-            # Prefer public URL (bucket es público)
-            url = client.storage.from_(bucket).get_public_url(filename)
-            resp = httpx.get(url, timeout=10)
-            resp.raise_for_status()
-            return resp.content
-        except Exception:
-            try:
-                res = client.storage.from_(bucket).download(filename)
-                return res
-            except Exception:
-                return b""
     try:
-        return (SAVES_DIR / filename).read_bytes()
+        return _backend().get_blob(filename)
     except Exception:
         return b""
 
@@ -281,44 +495,21 @@ def get_current_save_path() -> Path | None:
     return SAVES_DIR / cur[1]
 
 def list_saves_by_user(user: str, limit: int = 50) -> List[Tuple]:
-    if _supabase_enabled():
-        try:
-            client = _sb()
-            res = (
-                client.table("saves")
-                .select("*")
-                .eq("user", user)
-                .order("id", desc=True)
-                .limit(limit)
-                .execute()
+    backend = _backend()
+    if backend.remote:
+        def mirror() -> List[Tuple]:
+            return _mirror_query(
+                """
+                SELECT id, filename, original_name, sha256, uploader, created_at
+                FROM saves_mirror
+                WHERE uploader = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (user, limit),
             )
-            out = []
-            for row in res.data or []:
-                ts = _iso_to_ts(row.get("created_at"))
-                out.append(
-                    (
-                        row.get("id"),
-                        row.get("filename"),
-                        row.get("original_name"),
-                        row.get("sha256"),
-                        row.get("user"),
-                        ts,
-                    )
-                )
-            return out
-        except Exception:
-            return []
-    with _conn() as cx:
-        return cx.execute(
-            """
-            SELECT id, filename, original_name, sha256, uploader, created_at
-            FROM saves
-            WHERE uploader = ?
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (user, limit),
-        ).fetchall()
+        return _meta_read(f"saves:user:{user}:{int(limit)}", lambda: backend.list_saves_by_user(user, limit), mirror) or []
+    return backend.list_saves_by_user(user, limit)
 
 
 def _user_key(user: str) -> str:
@@ -337,6 +528,8 @@ def set_current_save_for_user(user: str, save_id: int) -> None:
             (_user_key(user), str(int(save_id))),
         )
         cx.commit()
+    # El save actual vive en settings (local, sin caché) y las filas de saves no
+    # cambian: no hay metadatos que invalidar.
 
 
 def get_current_save_for_user(user: str) -> Optional[Tuple]:
@@ -354,24 +547,232 @@ def get_current_save_path_for_user(user: str):
         return None
     return SAVES_DIR / cur[1]
 
+# Retención / compactación
+
+SAVE_RETENTION = int(os.environ.get("SAVE_RETENTION", "10"))
+
+
+def _protected_save_ids(cx) -> set[int]:
+    """Ids marcados como save actual (global o por usuario): nunca se borran."""
+    out: set[int] = set()
+    for (val,) in cx.execute(
+        "SELECT value FROM settings WHERE key='current_save' OR key LIKE 'current_save:%'"
+    ).fetchall():
+        try:
+            out.add(int(val))
+        except Exception:
+            continue
+    return out
+
+
+ORPHAN_MIN_AGE = 3600  # s: un blob más reciente puede ser una subida cuya fila aún no existe
+
+
+def _backend_filenames(backend: StorageBackend) -> Optional[set]:
+    """Ficheros que referencia un backend remoto (None si no se pudo listar: no se barre nada)."""
+    try:
+        return {r[1] for r in backend.list_saves(1_000_000) if r and r[1]}
+    except Exception:
+        return None
+
+
+def compact_storage(*, keep_last: int = SAVE_RETENTION, dry_run: bool = True,
+                    user: str | None = None) -> dict:
+    """Aplica la retención de saves locales y compacta la base de datos.
+
+    - Conserva los `keep_last` saves más recientes de cada usuario y cualquier save actual.
+      Con `user`, sólo se recortan los saves de ese usuario y no se barren huérfanos.
+    - Las filas sólo se recortan con el backend local (con Supabase / fake la tabla
+      local no es la fuente de verdad). Primero se borran las filas y después sus blobs.
+    - Huérfanos: ficheros de data/saves que no referencia el backend activo (ni la tabla
+      local) y con más de ORPHAN_MIN_AGE segundos (no se tocan subidas en curso).
+    - Si no es `dry_run`, ejecuta VACUUM y ANALYZE.
+    Devuelve un informe con ids/ficheros afectados y bytes recuperados."""
+    keep_last = max(1, int(keep_last))
+    report: dict = {"dry_run": dry_run, "keep_last": keep_last, "rows": [], "files": [], "bytes": 0, "db_bytes": 0}
+    started = time.time()
+    backend = _backend()
+    doomed: List[Tuple[int, str]] = []
+    referenced: Optional[set] = set()
+    with _conn() as cx:
+        protected = _protected_save_ids(cx)
+        rows = cx.execute(
+            "SELECT id, filename, COALESCE(uploader, '') FROM saves ORDER BY uploader, id DESC"
+        ).fetchall()
+    if not backend.remote:
+        seen: Dict[str, int] = {}
+        for sid, fname, up in rows:
+            if user is not None and up != user:
+                continue
+            seen[up] = seen.get(up, 0) + 1
+            if seen[up] > keep_last and int(sid) not in protected:
+                doomed.append((int(sid), fname))
+        doomed_ids = {sid for sid, _ in doomed}
+        referenced = {fname for sid, fname, _ in rows if int(sid) not in doomed_ids}
+    elif user is None:
+        remote_names = _backend_filenames(backend)
+        referenced = None if remote_names is None else remote_names | {fname for _, fname, _ in rows}
+    report["rows"] = sorted(sid for sid, _ in doomed)
+
+    if not dry_run and doomed:
+        with _conn() as cx:
+            cx.executemany("DELETE FROM saves WHERE id=?", [(sid,) for sid, _ in doomed])
+            cx.commit()
+
+    candidates: List[Path] = [SAVES_DIR / fname for _, fname in doomed]
+    if user is None and referenced is not None:
+        try:
+            for f in SAVES_DIR.iterdir():
+                if not f.is_file() or f.name in referenced or f in candidates:
+                    continue
+                if f.stat().st_mtime > started - ORPHAN_MIN_AGE:
+                    continue
+                candidates.append(f)
+        except Exception:
+            pass
+    for f in candidates:
+        try:
+            size = f.stat().st_size
+        except Exception:
+            continue
+        report["files"].append(str(f))
+        report["bytes"] += size
+        if not dry_run:
+            try:
+                f.unlink()
+            except Exception:
+                pass
+    if dry_run:
+        return report
+    db_before = DB_PATH.stat().st_size if DB_PATH.exists() else 0
+    cx = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        cx.execute("VACUUM")
+        cx.execute("ANALYZE")
+    finally:
+        cx.close()
+    db_after = DB_PATH.stat().st_size if DB_PATH.exists() else 0
+    report["db_bytes"] = max(db_before - db_after, 0)
+    return report
+
 # Tienda
 
 def add_purchase(user: str, item: str, price: int) -> int:
     ts = int(time.time())
     with _conn() as cx:
+        # Misma transacción: compra + saldo materializado
+        _ensure_balance_row(cx, user)
         cx.execute(
             "INSERT INTO purchases(user, item, price, created_at, status) VALUES(?,?,?,?,?)",
             (user, item, int(price), ts, 'pending')
         )
         rowid = cx.execute("SELECT last_insert_rowid()").fetchone()[0]
+        cx.execute(
+            "UPDATE balances SET spent=spent+?, updated_at=? WHERE user=?",
+            (int(price), ts, user),
+        )
         cx.commit()
         return int(rowid)
 
 
 def total_spent(user: str) -> int:
+    return get_balance(user)["spent"]
+
+
+def _raw_spent(cx, user: str) -> int:
+    row = cx.execute("SELECT COALESCE(SUM(price),0) FROM purchases WHERE user=?", (user,)).fetchone()
+    return int(row[0] or 0)
+
+
+def _ensure_balance_row(cx, user: str) -> None:
+    """Crea la fila de saldo si falta, partiendo de las compras y la liga existentes (una sola vez)."""
+    if cx.execute("SELECT 1 FROM balances WHERE user=?", (user,)).fetchone():
+        return
+    cx.execute(
+        "INSERT OR IGNORE INTO balances(user, spent, league_coins, updated_at) VALUES(?,?,?,?)",
+        (user, _raw_spent(cx, user), _league_coins(cx, user), int(time.time())),
+    )
+
+
+def get_balance(user: str) -> dict:
+    """Saldo materializado: gastado, monedas de liga y medallas y disponible."""
+    with _conn() as cx:
+        row = cx.execute(
+            "SELECT spent, league_coins, badge_coins FROM balances WHERE user=?", (user,)
+        ).fetchone()
+        if row is None:
+            _ensure_balance_row(cx, user)
+            cx.commit()
+            row = cx.execute(
+                "SELECT spent, league_coins, badge_coins FROM balances WHERE user=?", (user,)
+            ).fetchone()
+    spent, league, badges = (int(v or 0) for v in row)
+    return {
+        "spent": spent,
+        "league": league,
+        "badges": badges,
+        "available": max(league + badges - spent, 0),
+    }
+
+
+def set_balance_coins(user: str, *, league: int | None = None, badges: int | None = None) -> None:
+    """Actualiza las fuentes de monedas (liga / medallas) del saldo de `user`."""
+    if league is None and badges is None:
+        return
+    ts = int(time.time())
+    with _conn() as cx:
+        _ensure_balance_row(cx, user)
+        if league is not None:
+            cx.execute("UPDATE balances SET league_coins=?, updated_at=? WHERE user=?", (int(league), ts, user))
+        if badges is not None:
+            cx.execute("UPDATE balances SET badge_coins=?, updated_at=? WHERE user=?", (int(badges), ts, user))
+        cx.commit()
+
+
+def reconcile_balances(*, fix: bool = True) -> Dict[str, Tuple[int, int]]:
+    """Compara el gasto materializado con SUM(price) de `purchases`.
+    Devuelve {user: (ledger, real)} para los descuadres; si `fix`, los corrige (y
+    recalcula también las monedas de liga desde league_results)."""
+    out: Dict[str, Tuple[int, int]] = {}
     with _conn() as cx:
-        row = cx.execute("SELECT COALESCE(SUM(price),0) FROM purchases WHERE user=?", (user,)).fetchone()
-        return int(row[0] or 0)
+        raw = dict(cx.execute("SELECT user, COALESCE(SUM(price),0) FROM purchases GROUP BY user").fetchall())
+        ledger = dict(cx.execute("SELECT user, spent FROM balances").fetchall())
+        for user in set(raw) | set(ledger):
+            real = int(raw.get(user) or 0)
+            have = int(ledger.get(user) or 0)
+            if user in ledger and have != real:
+                out[user] = (have, real)
+        if fix and out:
+            ts = int(time.time())
+            cx.executemany(
+                "UPDATE balances SET spent=?, updated_at=? WHERE user=?",
+                [(real, ts, user) for user, (_, real) in out.items()],
+            )
+        if fix:
+            _sync_league_balances(cx)
+            cx.commit()
+    return out
+
+
+_RECONCILER: threading.Thread | None = None
+
+
+def start_balance_reconciler(interval: float = 600.0) -> None:
+    """Lanza (una vez por proceso) un hilo que revisa periódicamente el saldo materializado."""
+    global _RECONCILER
+    if _RECONCILER is not None and _RECONCILER.is_alive():
+        return
+
+    def _loop() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                reconcile_balances(fix=True)
+            except Exception:
+                pass
+
+    _RECONCILER = threading.Thread(target=_loop, name="balance-reconciler", daemon=True)
+    _RECONCILER.start()
 
 
 def list_purchases(user: str | None = None, limit: int = 100):
@@ -459,6 +860,7 @@ def get_flags_by_fingerprints(fps: list[str]) -> dict:
 def clear_purchases() -> None:
     with _conn() as cx:
         cx.execute("DELETE FROM purchases")
+        cx.execute("UPDATE balances SET spent=0, updated_at=?", (int(time.time()),))
         cx.commit()
 
 # Pokemon flags reset helpers
@@ -474,6 +876,29 @@ def clear_pokemon_flags_for_owner(owner: str) -> None:
         cx.execute("DELETE FROM pokemon_flags WHERE owner=?", (owner,))
         cx.commit()
 
+# Trainer snapshots
+
+def put_trainer_snapshot(user: str, save_path: str, save_mtime_ns: int, data_json: str) -> None:
+    with _conn() as cx:
+        cx.execute(
+            """INSERT INTO trainer_snapshots(user, save_path, save_mtime_ns, data_json, created_at)
+                   VALUES(?,?,?,?,?)
+                   ON CONFLICT(user) DO UPDATE SET save_path=excluded.save_path,
+                       save_mtime_ns=excluded.save_mtime_ns, data_json=excluded.data_json,
+                       created_at=excluded.created_at""",
+            (user, str(save_path), int(save_mtime_ns), data_json, int(time.time()))
+        )
+        cx.commit()
+
+
+def get_trainer_snapshot(user: str) -> Optional[Tuple[str, int, str]]:
+    """(save_path, save_mtime_ns, data_json) del último snapshot de `user`."""
+    with _conn() as cx:
+        row = cx.execute(
+            "SELECT save_path, save_mtime_ns, data_json FROM trainer_snapshots WHERE user=?", (user,)
+        ).fetchone()
+    return (row[0], int(row[1]), row[2]) if row else None
+
 # Settings genéricos
 
 def settings_set(key: str, value: str) -> None:
@@ -491,3 +916,219 @@ def settings_get(key: str) -> str | None:
         row = cx.execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
         return row[0] if row else None
 
+
+def settings_delete(key: str) -> None:
+    with _conn() as cx:
+        cx.execute("DELETE FROM settings WHERE key=?", (key,))
+        cx.commit()
+
+# Liga (estado normalizado)
+
+# Monedas de la tienda por posición final en cada tramo
+LEAGUE_COINS_BY_POSITION = {1: 12, 2: 11, 3: 9, 4: 8, 5: 9, 6: 6, 7: 5, 8: 4, 9: 2}
+
+
+def _league_coins(cx, user: str) -> int:
+    rows = cx.execute("SELECT pos FROM league_results WHERE user=?", (user,)).fetchall()
+    return sum(LEAGUE_COINS_BY_POSITION.get(int(pos), 0) for (pos,) in rows)
+
+
+def _sync_league_balances(cx) -> None:
+    """Recalcula balances.league_coins desde league_results (sin commit: lo hace el llamante)."""
+    users = {u for (u,) in cx.execute("SELECT DISTINCT user FROM league_results").fetchall()}
+    users |= {u for (u,) in cx.execute("SELECT user FROM balances").fetchall()}
+    ts = int(time.time())
+    for user in users:
+        _ensure_balance_row(cx, user)
+        coins = _league_coins(cx, user)
+        cx.execute(
+            "UPDATE balances SET league_coins=?, updated_at=? WHERE user=? AND league_coins<>?",
+            (coins, ts, user, coins),
+        )
+
+
+def league_coins(user: str) -> int:
+    """Monedas de liga de `user` según las posiciones guardadas (no según la sesión)."""
+    with _conn() as cx:
+        return _league_coins(cx, user)
+
+
+_LEAGUE_META_KEYS = ("league:tramo", "league:active", "league:divisions")
+
+
+def league_meta_get() -> dict | None:
+    """Tramo, estado y divisiones de la liga; None si nunca se guardó."""
+    with _conn() as cx:
+        rows = dict(cx.execute(
+            f"SELECT key, value FROM settings WHERE key IN ({','.join('?' * len(_LEAGUE_META_KEYS))})",
+            _LEAGUE_META_KEYS,
+        ).fetchall())
+    if "league:tramo" not in rows:
+        return None
+    try:
+        divisions = json.loads(rows.get("league:divisions") or "{}")
+    except Exception:
+        divisions = {}
+    return {
+        "tramo": int(rows.get("league:tramo") or 1),
+        "active": rows.get("league:active") == "1",
+        "divisions": divisions if isinstance(divisions, dict) else {},
+    }
+
+
+def league_meta_set(*, tramo: int | None = None, active: bool | None = None, divisions: dict | None = None) -> None:
+    vals = []
+    if tramo is not None:
+        vals.append(("league:tramo", str(int(tramo))))
+    if active is not None:
+        vals.append(("league:active", "1" if active else "0"))
+    if divisions is not None:
+        vals.append(("league:divisions", json.dumps(divisions, ensure_ascii=False)))
+    if not vals:
+        return
+    with _conn() as cx:
+        cx.executemany(
+            """INSERT INTO settings(key,value) VALUES(?,?)
+                   ON CONFLICT(key) DO UPDATE SET value=excluded.value""",
+            vals,
+        )
+        cx.commit()
+
+
+def league_matches_for(tramo: int) -> dict:
+    """Enfrentamientos de un tramo: {"A": {(p1, p2): winner}, "B": {...}} en orden de creación."""
+    out: dict = {"A": {}, "B": {}}
+    with _conn() as cx:
+        rows = cx.execute(
+            "SELECT division, p1, p2, winner FROM league_matches WHERE tramo=? ORDER BY division, seq",
+            (int(tramo),),
+        ).fetchall()
+    for div, p1, p2, w in rows:
+        out.setdefault(div, {})[(p1, p2)] = w
+    return out
+
+
+def league_create_matches(tramo: int, matches: dict) -> None:
+    """Inserta los enfrentamientos de un tramo ({"A": {(p1, p2): winner}, ...})."""
+    rows = []
+    for div, pairs in matches.items():
+        for seq, ((p1, p2), w) in enumerate(pairs.items()):
+            rows.append((int(tramo), div, p1, p2, w, seq))
+    with _conn() as cx:
+        cx.executemany(
+            "INSERT OR IGNORE INTO league_matches(tramo, division, p1, p2, winner, seq) VALUES(?,?,?,?,?,?)",
+            rows,
+        )
+        cx.commit()
+
+
+def league_set_winner(tramo: int, division: str, p1: str, p2: str, winner: str | None) -> None:
+    with _conn() as cx:
+        cx.execute(
+            "UPDATE league_matches SET winner=? WHERE tramo=? AND division=? AND p1=? AND p2=?",
+            (winner, int(tramo), division, p1, p2),
+        )
+        cx.commit()
+
+
+def league_delete_matches(tramo: int) -> None:
+    with _conn() as cx:
+        cx.execute("DELETE FROM league_matches WHERE tramo=?", (int(tramo),))
+        cx.commit()
+
+
+def league_record_positions(tramo: int, positions: dict) -> None:
+    """Guarda {user: pos} del tramo cerrado."""
+    with _conn() as cx:
+        cx.executemany(
+            """INSERT INTO league_results(user, tramo, pos) VALUES(?,?,?)
+                   ON CONFLICT(user, tramo) DO UPDATE SET pos=excluded.pos""",
+            [(u, int(tramo), int(pos)) for u, pos in positions.items()],
+        )
+        _sync_league_balances(cx)
+        cx.commit()
+
+
+def league_results() -> dict:
+    """{user: {tramo: pos}}"""
+    out: dict = {}
+    with _conn() as cx:
+        for user, tramo, pos in cx.execute("SELECT user, tramo, pos FROM league_results").fetchall():
+            out.setdefault(user, {})[int(tramo)] = int(pos)
+    return out
+
+
+def league_set_movement(tramo: int, up: list, down: list) -> None:
+    with _conn() as cx:
+        cx.execute(
+            """INSERT INTO league_movements(tramo, up_json, down_json) VALUES(?,?,?)
+                   ON CONFLICT(tramo) DO UPDATE SET up_json=excluded.up_json, down_json=excluded.down_json""",
+            (int(tramo), json.dumps(list(up), ensure_ascii=False), json.dumps(list(down), ensure_ascii=False)),
+        )
+        cx.commit()
+
+
+def league_movements() -> dict:
+    """{tramo: {"up": [...], "down": [...]}}"""
+    out: dict = {}
+    with _conn() as cx:
+        for tramo, up, down in cx.execute("SELECT tramo, up_json, down_json FROM league_movements").fetchall():
+            try:
+                out[int(tramo)] = {"up": json.loads(up or "[]"), "down": json.loads(down or "[]")}
+            except Exception:
+                continue
+    return out
+
+
+def league_reset() -> None:
+    with _conn() as cx:
+        cx.execute("DELETE FROM league_matches")
+        cx.execute("DELETE FROM league_results")
+        cx.execute("DELETE FROM league_movements")
+        _sync_league_balances(cx)
+        cx.commit()
+
+
+def league_import_legacy() -> bool:
+    """Migra una sola vez el blob `settings['league_state']` a las tablas de liga.
+    El blob original se conserva como `league_state_legacy`."""
+    raw = settings_get("league_state")
+    if not raw:
+        return False
+    try:
+        obj = json.loads(raw)
+    except Exception:
+        return False
+    with _conn() as cx:
+        for tkey, divs in (obj.get("matches") or {}).items():
+            for div in ("A", "B"):
+                for seq, m in enumerate((divs or {}).get(div) or []):
+                    cx.execute(
+                        "INSERT OR IGNORE INTO league_matches(tramo, division, p1, p2, winner, seq) VALUES(?,?,?,?,?,?)",
+                        (int(tkey), div, m.get("p1"), m.get("p2"), m.get("winner"), seq),
+                    )
+        for user, mp in (obj.get("results") or {}).items():
+            for tkey, pos in mp.items():
+                cx.execute(
+                    "INSERT OR REPLACE INTO league_results(user, tramo, pos) VALUES(?,?,?)",
+                    (user, int(tkey), int(pos)),
+                )
+        for tkey, mv in (obj.get("movements") or {}).items():
+            cx.execute(
+                "INSERT OR REPLACE INTO league_movements(tramo, up_json, down_json) VALUES(?,?,?)",
+                (int(tkey), json.dumps(mv.get("up") or []), json.dumps(mv.get("down") or [])),
+            )
+        cx.executemany(
+            """INSERT INTO settings(key,value) VALUES(?,?)
+                   ON CONFLICT(key) DO UPDATE SET value=excluded.value""",
+            [
+                ("league:tramo", str(int(obj.get("tramo", 1)))),
+                ("league:active", "1" if obj.get("active") else "0"),
+                ("league:divisions", json.dumps(obj.get("divisions") or {"A": [], "B": []}, ensure_ascii=False)),
+                ("league_state_legacy", raw),
+            ],
+        )
+        cx.execute("DELETE FROM settings WHERE key='league_state'")
+        _sync_league_balances(cx)
+        cx.commit()
+    return True
@@ -0,0 +1,263 @@
+"""
+Backends de almacenamiento de saves (blobs + metadatos) para storage.py.
+
+- LocalSQLiteBackend: data/app.db + ficheros en data/saves (modo por defecto).
+- SupabaseBackend: tabla `saves` + bucket de Supabase Storage.
+- FakeRemoteBackend: remoto en memoria con latencia y fallos inyectables, para
+  probar/benchmarkear el camino remoto sin red.
+
+Todas las filas de metadatos se devuelven como tuplas
+(id, filename, original_name, sha256, uploader, created_at).
+"""
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+SaveRow = Tuple[Any, str, Optional[str], Optional[str], Optional[str], int]
+
+
+class RemoteUnavailable(RuntimeError):
+    """Fallo (real o inyectado) del almacenamiento remoto."""
+
+
+class StorageBackend(Protocol):
+    name: str
+    remote: bool  # True => storage.py aplica caché TTL + espejo local
+
+    def put_blob(self, filename: str, content: bytes) -> Optional[str]: ...
+    def get_blob(self, filename: str) -> bytes: ...
+    def insert_save(self, *, filename: str, original_name: str, sha256: str,
+                    uploader: Optional[str], created_at: int, url: Optional[str] = None) -> Optional[int]: ...
+    def get_save(self, save_id: int) -> Optional[SaveRow]: ...
+    def list_saves(self, limit: int) -> List[SaveRow]: ...
+    def list_saves_by_user(self, user: str, limit: int) -> List[SaveRow]: ...
+
+
+def _iso_to_ts(val: Any) -> int:
+    try:
+        if val is None:
+            return 0
+        import datetime
+        if isinstance(val, (int, float)):
+            return int(val)
+        s = str(val).replace("Z", "+00:00")
+        dt = datetime.datetime.fromisoformat(s)
+        return int(dt.timestamp())
+    except Exception:
+        return 0
+
+
+def _row_from_remote(row: dict) -> SaveRow:
+    return (
+        row.get("id"),
+        row.get("filename"),
+        row.get("original_name"),
+        row.get("sha256"),
+        row.get("user"),
+        _iso_to_ts(row.get("created_at")),
+    )
+
+
+# ---------- Local (SQLite + disco) ----------
+
+class LocalSQLiteBackend:
+    name = "local"
+    remote = False
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], saves_dir: Path):
+        self._connect = connect
+        self.saves_dir = saves_dir
+
+    def put_blob(self, filename: str, content: bytes) -> Optional[str]:
+        (self.saves_dir / filename).write_bytes(content)
+        return None
+
+    def get_blob(self, filename: str) -> bytes:
+        return (self.saves_dir / filename).read_bytes()
+
+    def insert_save(self, *, filename, original_name, sha256, uploader, created_at, url=None) -> Optional[int]:
+        with self._connect() as cx:
+            cx.execute(
+                "INSERT INTO saves(filename, original_name, sha256, uploader, created_at) VALUES(?,?,?,?,?)",
+                (filename, original_name, sha256, uploader, int(created_at)),
+            )
+            rowid = cx.execute("SELECT last_insert_rowid()").fetchone()[0]
+            cx.commit()
+        return int(rowid)
+
+    def get_save(self, save_id: int) -> Optional[SaveRow]:
+        with self._connect() as cx:
+            return cx.execute(
+                "SELECT id, filename, original_name, sha256, uploader, created_at FROM saves WHERE id=?",
+                (int(save_id),),
+            ).fetchone()
+
+    def list_saves(self, limit: int) -> List[SaveRow]:
+        with self._connect() as cx:
+            return cx.execute(
+                "SELECT id, filename, original_name, sha256, uploader, created_at FROM saves ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def list_saves_by_user(self, user: str, limit: int) -> List[SaveRow]:
+        with self._connect() as cx:
+            return cx.execute(
+                """
+                SELECT id, filename, original_name, sha256, uploader, created_at
+                FROM saves
+                WHERE uploader = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (user, limit),
+            ).fetchall()
+
+
+# ---------- Supabase ----------
+
+class SupabaseBackend:
+    name = "supabase"
+    remote = True
+
+    def __init__(self, url: str, key: str, bucket: str = "saves"):
+        self._url = url
+        self._key = key
+        self.bucket = bucket or "saves"
+        self._client = None
+
+    def _sb(self):
+        if self._client is None:
+            from supabase import create_client  # import diferido: sólo si hay Supabase
+            self._client = create_client(self._url, self._key)
+        return self._client
+
+    def put_blob(self, filename: str, content: bytes) -> Optional[str]:
+        store = self._sb().storage.from_(self.bucket)
+        # Subir al bucket (sin upsert para evitar headers inválidos)
+        store.upload(filename, content, {"content-type": "application/octet-stream"})
+        return store.get_public_url(filename)
+
+    def get_blob(self, filename: str) -> bytes:
+        store = self._sb().storage.from_(self.bucket)
+        try:
+            # Prefer public URL (bucket es público)
+            import httpx
+            resp = httpx.get(store.get_public_url(filename), timeout=10)
+            resp.raise_for_status()
+            return resp.content
+        except Exception:
+            return store.download(filename)
+
+    def insert_save(self, *, filename, original_name, sha256, uploader, created_at, url=None) -> Optional[int]:
+        res = self._sb().table("saves").insert(
+            {
+                "filename": filename,
+                "original_name": original_name,
+                "user": uploader,
+                "url": url,
+                "sha256": sha256,
+            }
+        ).execute()
+        data = res.data or []
+        return data[0].get("id") if data else None
+
+    def get_save(self, save_id: int) -> Optional[SaveRow]:
+        res = self._sb().table("saves").select("*").eq("id", int(save_id)).limit(1).execute()
+        data = res.data or []
+        return _row_from_remote(data[0]) if data else None
+
+    def list_saves(self, limit: int) -> List[SaveRow]:
+        res = self._sb().table("saves").select("*").order("id", desc=True).limit(limit).execute()
+        return [_row_from_remote(row) for row in res.data or []]
+
+    def list_saves_by_user(self, user: str, limit: int) -> List[SaveRow]:
+        res = (
+            self._sb().table("saves")
+            .select("*")
+            .eq("user", user)
+            .order("id", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return [_row_from_remote(row) for row in res.data or []]
+
+
+# ---------- Remoto simulado (en proceso) ----------
+
+class FakeRemoteBackend:
+    """Remoto en memoria: cada llamada duerme `latency` (+/- `jitter`) segundos y
+    falla con probabilidad `failure_rate` lanzando RemoteUnavailable."""
+    name = "fake"
+    remote = True
+
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0, seed: int | None = None):
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.failure_rate = float(failure_rate)
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._blobs: Dict[str, bytes] = {}
+        self._rows: Dict[int, SaveRow] = {}
+        self._next_id = 1
+
+    @classmethod
+    def from_env(cls) -> "FakeRemoteBackend":
+        return cls(
+            latency=float(os.environ.get("STORAGE_FAKE_LATENCY", "0.05")),
+            jitter=float(os.environ.get("STORAGE_FAKE_JITTER", "0")),
+            failure_rate=float(os.environ.get("STORAGE_FAKE_FAILURE_RATE", "0")),
+        )
+
+    def _io(self) -> None:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise RemoteUnavailable("fallo inyectado en FakeRemoteBackend")
+
+    def put_blob(self, filename: str, content: bytes) -> Optional[str]:
+        self._io()
+        with self._lock:
+            self._blobs[filename] = bytes(content)
+        return f"fake://{filename}"
+
+    def get_blob(self, filename: str) -> bytes:
+        self._io()
+        with self._lock:
+            if filename not in self._blobs:
+                raise FileNotFoundError(filename)
+            return self._blobs[filename]
+
+    def insert_save(self, *, filename, original_name, sha256, uploader, created_at, url=None) -> Optional[int]:
+        self._io()
+        with self._lock:
+            sid = self._next_id
+            self._next_id += 1
+            self._rows[sid] = (sid, filename, original_name, sha256, uploader, int(created_at))
+        return sid
+
+    def get_save(self, save_id: int) -> Optional[SaveRow]:
+        self._io()
+        with self._lock:
+            return self._rows.get(int(save_id))
+
+    def list_saves(self, limit: int) -> List[SaveRow]:
+        self._io()
+        with self._lock:
+            return [self._rows[k] for k in sorted(self._rows, reverse=True)[:limit]]
+
+    def list_saves_by_user(self, user: str, limit: int) -> List[SaveRow]:
+        self._io()
+        with self._lock:
+            rows = [self._rows[k] for k in sorted(self._rows, reverse=True) if self._rows[k][4] == user]
+        return rows[:limit]
@@ -0,0 +1,89 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Los módulos de la app viven en la raíz del repo (sin paquete)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class StandIn:
+    """Servidor HTTP local que sustituye a PokeAPI / Showdown en las pruebas.
+
+    `routes[path] = fn(headers) -> (status, headers, body)`; `delay` hace que cada
+    respuesta tarde ese tiempo (para medir concurrencia). Registra cada petición.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.delay = 0.0
+        self.requests = []  # (path, cabeceras, instante de llegada)
+        self.inflight = 0
+        self.max_inflight = 0
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stand_in._lock:
+                    stand_in.requests.append((self.path, dict(self.headers), time.monotonic()))
+                    stand_in.inflight += 1
+                    stand_in.max_inflight = max(stand_in.max_inflight, stand_in.inflight)
+                try:
+                    if stand_in.delay:
+                        time.sleep(stand_in.delay)
+                    route = stand_in.routes.get(self.path)
+                    status, headers, body = route(dict(self.headers)) if route else (404, {}, b"")
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stand_in._lock:
+                        stand_in.inflight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def paths(self):
+        with self._lock:
+            return [p for p, _, _ in self.requests]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def standin():
+    server = StandIn()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def remote_store(tmp_path, monkeypatch):
+    """storage con un FakeRemoteBackend (sin latencia ni fallos) y SQLite temporal para el espejo."""
+    import storage
+    from storage_backends import FakeRemoteBackend
+
+    db = tmp_path / "app.db"
+    monkeypatch.setattr(storage, "DB_PATH", db)
+    monkeypatch.setattr(storage, "SAVES_DIR", tmp_path / "saves")
+    monkeypatch.setattr(storage, "_META_STATS", {k: 0 for k in storage._META_STATS})
+    storage.migrate(db)
+    backend = FakeRemoteBackend(seed=1)
+    prev = storage.set_backend(backend)
+    yield backend
+    storage.set_backend(prev)
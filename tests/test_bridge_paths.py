@@ -0,0 +1,93 @@
+import stat
+import sys
+import threading
+
+import pytest
+
+import conex_pkhex
+from conex_pkhex import PKHeXRuntime, SaveHandle, extract_box
+
+# Bridge falso: el .sav contiene el nombre de la especie; cada caja devuelve ese Pokémon
+FAKE_BRIDGE = '''#!{python}
+import json, sys, time
+species = open(sys.argv[1], encoding="utf-8").read().strip()
+if "--box" in sys.argv:
+    n = int(sys.argv[sys.argv.index("--box") + 1])
+    time.sleep(0.05)
+    print(json.dumps({{"Boxes": [{{"Name": f"{{species}} {{n}}", "Mons": [{{"Species": species, "Level": 5}}]}}]}}))
+else:
+    print(json.dumps({{"BridgeTag": "pc-probed-v7", "BoxCount": 3, "Party": {{"Mons": []}}}}))
+'''
+
+
+@pytest.fixture
+def bridge(tmp_path, monkeypatch):
+    exe = tmp_path / "PKHeXBridge"
+    exe.write_text(FAKE_BRIDGE.format(python=sys.executable), encoding="utf-8")
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(conex_pkhex, "_LAST_SAV_PATH", None)
+    monkeypatch.setattr(conex_pkhex, "_BOX_CACHE", {})
+    monkeypatch.setattr(conex_pkhex, "_HANDLES", type(conex_pkhex._HANDLES)())
+    monkeypatch.setenv("PKHEX_MODE", "auto")
+    PKHeXRuntime.load(str(exe))
+    yield tmp_path
+    monkeypatch.setattr(conex_pkhex, "_BRIDGE_PATH", None)
+
+
+def _save(tmp_path, name):
+    p = tmp_path / f"{name}.sav"
+    p.write_text(name, encoding="utf-8")
+    return p
+
+
+def test_handle_reads_its_own_save_while_others_open(bridge):
+    a = SaveHandle.open(_save(bridge, "Pikachu"))
+    b_path = _save(bridge, "Eevee")
+    errors = []
+
+    def read_a():
+        for i in range(3):
+            mons = a.box(i)
+            if [m["species"] for m in mons] != ["Pikachu"]:
+                errors.append(mons)
+
+    def open_others():
+        for _ in range(3):
+            PKHeXRuntime.open_sav(b_path)  # mueve el "último save" a otro fichero
+
+    threads = [threading.Thread(target=read_a), threading.Thread(target=open_others)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert a.box_meta()[1][:2] == ["Pikachu 0", "Pikachu 1"]
+
+
+def test_save_path_is_used_without_reopening(bridge, monkeypatch):
+    spath = _save(bridge, "Bulbasaur")
+    data = PKHeXRuntime.open_sav(spath)
+    PKHeXRuntime.open_sav(_save(bridge, "Charmander"))
+
+    def no_reopen(path):
+        raise AssertionError("extract_box no debería relanzar el bridge completo")
+
+    monkeypatch.setattr(PKHeXRuntime, "open_sav", staticmethod(no_reopen))
+    mons = extract_box(data, 2, save_path=str(spath))
+    assert [m["species"] for m in mons] == ["Bulbasaur"]
+    assert conex_pkhex._LAST_SAV_PATH == str(spath)
+
+
+def test_explicit_path_reads_keep_other_saves_cached(bridge, monkeypatch):
+    a, b = _save(bridge, "Pikachu"), _save(bridge, "Eevee")
+    data = PKHeXRuntime.open_sav(a)
+    extract_box(data, 0, save_path=str(a))
+    extract_box(data, 0, save_path=str(b))
+
+    runs = []
+    real_run = conex_pkhex.subprocess.run
+    monkeypatch.setattr(conex_pkhex.subprocess, "run", lambda *args, **kw: runs.append(args) or real_run(*args, **kw))
+    assert [m["species"] for m in extract_box(data, 0, save_path=str(a))] == ["Pikachu"]
+    assert [m["species"] for m in extract_box(data, 0, save_path=str(b))] == ["Eevee"]
+    assert runs == []  # ambas cajas salen de la caché
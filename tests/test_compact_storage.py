@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+
+import storage
+from storage_backends import FakeRemoteBackend, LocalSQLiteBackend
+
+
+@pytest.fixture
+def local_store(tmp_path, monkeypatch):
+    db, saves = tmp_path / "app.db", tmp_path / "saves"
+    saves.mkdir()
+    monkeypatch.setattr(storage, "DB_PATH", db)
+    monkeypatch.setattr(storage, "SAVES_DIR", saves)
+    storage.migrate(db)
+    prev = storage.set_backend(LocalSQLiteBackend(storage._conn, saves))
+    yield saves
+    storage.set_backend(prev)
+
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def _add(saves, name, user, *, age=7200):
+    (saves / name).write_bytes(b"x" * 10)
+    _age(saves / name, age)
+    with storage._conn() as cx:
+        cx.execute(
+            "INSERT INTO saves(filename, original_name, sha256, uploader, created_at) VALUES(?,?,?,?,?)",
+            (name, name, "0" * 64, user, 0),
+        )
+        cx.commit()
+
+
+def _filenames():
+    with storage._conn() as cx:
+        return sorted(r[0] for r in cx.execute("SELECT filename FROM saves"))
+
+
+def test_retention_keeps_recent_and_skips_fresh_orphans(local_store):
+    for i in range(3):
+        _add(local_store, f"a{i}.sav", "ana")
+    _add(local_store, "b0.sav", "beto")
+    (local_store / "old_orphan.sav").write_bytes(b"o")
+    _age(local_store / "old_orphan.sav", 7200)
+    (local_store / "uploading.sav").write_bytes(b"u")  # subida en curso: aún sin fila
+
+    rep = storage.compact_storage(keep_last=1, dry_run=False)
+
+    assert _filenames() == ["a2.sav", "b0.sav"]
+    assert sorted(p.name for p in local_store.iterdir()) == ["a2.sav", "b0.sav", "uploading.sav"]
+    assert len(rep["rows"]) == 2
+
+
+def test_user_scope_only_touches_that_user(local_store):
+    for i in range(2):
+        _add(local_store, f"a{i}.sav", "ana")
+        _add(local_store, f"b{i}.sav", "beto")
+    (local_store / "old_orphan.sav").write_bytes(b"o")
+    _age(local_store / "old_orphan.sav", 7200)
+
+    storage.compact_storage(keep_last=1, dry_run=False, user="ana")
+
+    assert _filenames() == ["a1.sav", "b0.sav", "b1.sav"]
+    assert (local_store / "old_orphan.sav").exists()
+
+
+def test_remote_backend_keeps_rows_and_referenced_blobs(local_store):
+    _add(local_store, "local.sav", "ana")
+    fake = FakeRemoteBackend()
+    fake.insert_save(filename="remote.sav", original_name="r", sha256="0", uploader="ana", created_at=0)
+    for name in ("remote.sav", "stray.sav"):
+        (local_store / name).write_bytes(b"r")
+        _age(local_store / name, 7200)
+    storage.set_backend(fake)
+
+    storage.compact_storage(keep_last=1, dry_run=False)
+
+    assert _filenames() == ["local.sav"]
+    assert (local_store / "remote.sav").exists()
+    assert (local_store / "local.sav").exists()
+    assert not (local_store / "stray.sav").exists()
@@ -0,0 +1,17 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+import damagecalc
+
+_spec = importlib.util.spec_from_file_location(
+    "bench_damage", Path(__file__).resolve().parents[1] / "tools" / "bench_damage.py"
+)
+bench_damage = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench_damage)
+
+
+def test_numpy_damage_matches_scalar_reference():
+    args = bench_damage._synthetic(8, 6, np.random.default_rng(3))
+    assert (damagecalc.damage_arrays(*args) == bench_damage._scalar(*args)).all()
@@ -0,0 +1,124 @@
+import json
+import time
+
+import pytest
+
+import dexdata
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def _pokedex(version):
+    return json.dumps({"bulbasaur": {"num": 1, "name": "Bulbasaur", "v": version}}).encode("utf-8")
+
+
+def _conditional(body):
+    """200 con ETag/Last-Modified, o 304 si el cliente ya tiene esa versión."""
+    def route(headers):
+        if headers.get("If-None-Match") == ETAG or headers.get("If-Modified-Since") == LAST_MODIFIED:
+            return 304, {}, b""
+        return 200, {"ETag": ETAG, "Last-Modified": LAST_MODIFIED}, body
+    return route
+
+
+@pytest.fixture
+def showdown(standin, tmp_path, monkeypatch):
+    monkeypatch.setattr(dexdata, "BASE_URL", standin.url)
+    monkeypatch.setattr(dexdata, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(dexdata, "OFFLINE", False)
+    monkeypatch.setattr(dexdata, "SHOWDOWN_TIMEOUT", 2.0)
+    monkeypatch.setattr(dexdata, "_DATASETS", {})
+    monkeypatch.setattr(dexdata, "_DATASET_REFRESHING", set())
+    return standin
+
+
+def _stamp(tmp_path):
+    return int((tmp_path / "ps_pokedex.stamp").read_text())
+
+
+def test_200_writes_file_meta_and_stamp(showdown, tmp_path):
+    showdown.routes["/pokedex.json"] = _conditional(_pokedex(1))
+
+    status, obj = dexdata._revalidate_dataset("pokedex")
+
+    assert status == "ok" and obj["bulbasaur"]["v"] == 1
+    assert json.loads((tmp_path / "ps_pokedex.json").read_text())["bulbasaur"]["v"] == 1
+    meta = json.loads((tmp_path / "ps_pokedex.meta.json").read_text())
+    assert meta == {"etag": ETAG, "last_modified": LAST_MODIFIED}
+    assert abs(_stamp(tmp_path) - time.time()) < 5
+
+
+@pytest.mark.parametrize("validator", ["etag", "last_modified"])
+def test_304_keeps_file_and_advances_stamp(showdown, tmp_path, validator):
+    showdown.routes["/pokedex.json"] = _conditional(_pokedex(1))
+    dexdata._revalidate_dataset("pokedex")
+    meta = {"etag": None, "last_modified": None, validator: ETAG if validator == "etag" else LAST_MODIFIED}
+    (tmp_path / "ps_pokedex.meta.json").write_text(json.dumps(meta))
+    (tmp_path / "ps_pokedex.stamp").write_text("0")
+
+    status, obj = dexdata._revalidate_dataset("pokedex")
+
+    assert (status, obj) == ("not_modified", None)
+    sent = showdown.requests[-1][1]
+    header = "If-None-Match" if validator == "etag" else "If-Modified-Since"
+    assert header in sent
+    assert json.loads((tmp_path / "ps_pokedex.json").read_text())["bulbasaur"]["v"] == 1
+    assert _stamp(tmp_path) > 0
+
+
+def test_network_error_keeps_old_file_and_stamp(showdown, tmp_path, monkeypatch):
+    (tmp_path / "ps_pokedex.json").write_bytes(_pokedex(0))
+    (tmp_path / "ps_pokedex.stamp").write_text("123")
+    monkeypatch.setattr(dexdata, "BASE_URL", "http://127.0.0.1:9")  # nadie escucha
+
+    assert dexdata._revalidate_dataset("pokedex") == ("error", None)
+    assert json.loads((tmp_path / "ps_pokedex.json").read_text())["bulbasaur"]["v"] == 0
+    assert _stamp(tmp_path) == 123
+    # _load_dataset cae a la copia en disco aunque esté caducada
+    assert dexdata._load_dataset("pokedex")["bulbasaur"]["v"] == 0
+
+
+def test_server_error_and_bad_json_do_not_touch_file(showdown, tmp_path):
+    (tmp_path / "ps_pokedex.json").write_bytes(_pokedex(0))
+    showdown.routes["/pokedex.json"] = lambda h: (500, {}, b"")
+    assert dexdata._revalidate_dataset("pokedex") == ("error", None)
+    showdown.routes["/pokedex.json"] = lambda h: (200, {}, b'{"bulbasaur": {"num"')
+    assert dexdata._revalidate_dataset("pokedex") == ("error", None)
+    assert json.loads((tmp_path / "ps_pokedex.json").read_text())["bulbasaur"]["v"] == 0
+
+
+def test_write_is_atomic(showdown, tmp_path, monkeypatch):
+    (tmp_path / "ps_pokedex.json").write_bytes(_pokedex(0))
+    showdown.routes["/pokedex.json"] = _conditional(_pokedex(1))
+
+    def fail_replace(src, dst):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(dexdata.os, "replace", fail_replace)
+    assert dexdata._revalidate_dataset("pokedex") == ("error", None)
+    monkeypatch.undo()
+
+    # El fichero anterior sigue entero y no quedan temporales
+    assert json.loads((tmp_path / "ps_pokedex.json").read_text())["bulbasaur"]["v"] == 0
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_expired_dataset_is_served_while_refreshing(showdown, tmp_path):
+    (tmp_path / "ps_pokedex.json").write_bytes(_pokedex(0))
+    (tmp_path / "ps_pokedex.stamp").write_text("0")  # caducado
+    showdown.routes["/pokedex.json"] = _conditional(_pokedex(1))
+    showdown.delay = 0.5
+
+    t0 = time.monotonic()
+    first = dexdata.pokedex_data()
+    assert first["bulbasaur"]["v"] == 0
+    second = dexdata.pokedex_data()  # arranca la revalidación en segundo plano
+    assert second["bulbasaur"]["v"] == 0
+    assert time.monotonic() - t0 < 0.4
+
+    deadline = time.monotonic() + 5
+    while dexdata.pokedex_data()["bulbasaur"]["v"] != 1 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert dexdata.pokedex_data()["bulbasaur"]["v"] == 1
+    assert len(showdown.requests) == 1
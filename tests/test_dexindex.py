@@ -0,0 +1,50 @@
+import dexindex
+
+POKEDEX = {"bulbasaur": {"num": 1, "name": "Bulbasaur", "types": ["Grass", "Poison"],
+                         "baseStats": {"hp": 45, "atk": 49, "def": 49, "spa": 65, "spd": 65, "spe": 45}}}
+MOVES = {"tackle": {"name": "Tackle", "type": "Normal", "category": "Physical", "basePower": 40,
+                    "accuracy": 100, "pp": 35}}
+
+
+def _index(tmp_path, monkeypatch):
+    monkeypatch.setattr(dexindex, "INDEX_PATH", tmp_path / "dex_index.sqlite")
+    monkeypatch.setattr(dexindex, "_MISSING", None)
+    dexindex.close()
+
+
+def _count_resolves(monkeypatch):
+    calls = []
+    real = dexindex._resolve
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(dexindex, "_resolve", counting)
+    return calls
+
+
+def test_missing_index_is_not_looked_up_on_every_call(tmp_path, monkeypatch):
+    _index(tmp_path, monkeypatch)
+    calls = _count_resolves(monkeypatch)
+
+    for _ in range(100):
+        assert dexindex.available() is False
+        assert dexindex.species_entry("bulbasaur") is None
+    assert len(calls) == 1
+
+    # Pasado MISSING_RECHECK se vuelve a mirar (lo puede haber creado otro proceso)
+    monkeypatch.setattr(dexindex, "MISSING_RECHECK", 0.0)
+    dexindex.available()
+    assert len(calls) == 2
+
+
+def test_build_index_clears_the_negative_result(tmp_path, monkeypatch):
+    _index(tmp_path, monkeypatch)
+    assert dexindex.available() is False
+
+    dexindex.build_index(POKEDEX, MOVES)
+
+    assert dexindex.available() is True
+    assert dexindex.species_entry("bulbasaur")["types"] == ["Grass", "Poison"]
+    dexindex.close()
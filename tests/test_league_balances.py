@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "app.db"
+    monkeypatch.setattr(storage, "DB_PATH", path)
+    storage.migrate(path)
+    return path
+
+
+def test_recorded_positions_reach_the_balance(db):
+    storage.league_record_positions(1, {"ana": 1, "beto": 9})
+    storage.league_record_positions(2, {"ana": 3})
+
+    # Sin pasar por la página de Liga ni por session_state
+    assert storage.get_balance("ana")["league"] == 12 + 9
+    assert storage.get_balance("beto")["league"] == 2
+    assert storage.get_balance("carla")["league"] == 0
+    assert storage.league_coins("ana") == 21
+
+
+def test_reset_clears_league_coins(db):
+    storage.league_record_positions(1, {"ana": 1})
+    storage.league_reset()
+    assert storage.get_balance("ana")["league"] == 0
+
+
+def test_reconcile_fixes_drifted_league_coins(db):
+    storage.league_record_positions(1, {"ana": 2})
+    storage.set_balance_coins("ana", league=0)  # saldo desfasado (p. ej. sincronizado desde una sesión vacía)
+    storage.reconcile_balances(fix=True)
+    assert storage.get_balance("ana")["league"] == 11
+
+
+def test_migration_backfills_existing_balances(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    monkeypatch.setattr(storage, "DB_PATH", path)
+    steps = storage.MIGRATIONS
+    monkeypatch.setattr(storage, "MIGRATIONS", [m for m in steps if m[0] < 9])
+    storage.migrate(path)
+    with sqlite3.connect(path) as cx:
+        cx.execute("INSERT INTO league_results(user, tramo, pos) VALUES('ana', 1, 1)")
+        cx.execute("INSERT INTO balances(user, spent, league_coins, updated_at) VALUES('ana', 0, 0, 0)")
+        cx.commit()
+
+    monkeypatch.setattr(storage, "MIGRATIONS", steps)
+    assert storage.migrate(path) == [9]
+    assert storage.get_balance("ana")["league"] == 12
@@ -0,0 +1,62 @@
+import storage
+
+
+def test_hit_within_ttl_does_not_call_remote(remote_store):
+    storage.save_upload(b"sav", "ruby.sav", uploader="ana")
+    calls = remote_store.calls
+
+    first = storage.list_saves_by_user("ana")
+    for _ in range(5):
+        assert storage.list_saves_by_user("ana") == first
+    assert remote_store.calls == calls + 1
+
+
+def test_refetch_after_expiry(remote_store, monkeypatch):
+    monkeypatch.setattr(storage, "META_CACHE_TTL", 0.0)
+    storage.list_saves()
+    storage.list_saves()
+    stats = storage.metadata_cache_stats()
+    assert stats["remote_calls"] == 2 and stats["hits"] == 0
+
+
+def test_save_upload_invalidates_listings(remote_store):
+    first = storage.save_upload(b"a", "a.sav", uploader="ana")
+    assert [r[0] for r in storage.list_saves_by_user("ana")] == [first["id"]]
+    assert [r[0] for r in storage.list_saves()] == [first["id"]]
+
+    second = storage.save_upload(b"b", "b.sav", uploader="ana")
+
+    assert [r[0] for r in storage.list_saves_by_user("ana")] == [second["id"], first["id"]]
+    assert [r[0] for r in storage.list_saves()] == [second["id"], first["id"]]
+
+
+def test_current_save_for_user_follows_switch(remote_store):
+    a = storage.save_upload(b"a", "a.sav", uploader="ana")
+    b = storage.save_upload(b"b", "b.sav", uploader="ana")
+
+    storage.set_current_save_for_user("ana", a["id"])
+    assert storage.get_current_save_for_user("ana")[0] == a["id"]
+    storage.set_current_save_for_user("ana", b["id"])
+    assert storage.get_current_save_for_user("ana")[0] == b["id"]
+    storage.set_current_save_for_user("ana", a["id"])  # vuelve a una fila ya cacheada
+    assert storage.get_current_save_for_user("ana")[0] == a["id"]
+    # Cada fila se pidió una vez al remoto; el cambio de save actual no invalida nada
+    assert storage.metadata_cache_stats()["remote_calls"] == 2
+
+
+def test_prefix_invalidation_is_scoped(remote_store):
+    storage.list_saves_by_user("ana")
+    storage.list_saves_by_user("beto")
+    storage.invalidate_metadata_cache("saves:user:ana:")
+    assert storage.metadata_cache_stats()["entries"] == 1
+
+
+def test_stats_counts(remote_store):
+    storage.list_saves()
+    storage.list_saves()
+    storage.list_saves()
+    stats = storage.metadata_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["remote_calls"], stats["mirror_reads"]) == (2, 1, 1, 0)
+    assert stats["entries"] == 1
+    assert abs(stats["hit_rate"] - 2 / 3) < 1e-9
+    assert stats["avg_remote_ms"] >= 0.0
@@ -0,0 +1,65 @@
+import sqlite3
+import threading
+
+import storage
+
+
+def _tables(db):
+    with sqlite3.connect(db) as cx:
+        return {r[0] for r in cx.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def _versions(db):
+    with sqlite3.connect(db) as cx:
+        return [r[0] for r in cx.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+def test_fresh_db_applies_every_step_once(tmp_path):
+    db = tmp_path / "app.db"
+    latest = storage.MIGRATIONS[-1][0]
+    assert storage.migrate(db) == [v for v, _, _ in storage.MIGRATIONS]
+    assert _versions(db) == list(range(1, latest + 1))
+    assert {"saves", "purchases", "balances", "league_matches", "trainer_snapshots"} <= _tables(db)
+    assert storage.migrate(db) == []
+
+
+def test_upgrade_from_v1_keeps_data(tmp_path):
+    db = tmp_path / "app.db"
+    with sqlite3.connect(db) as cx:
+        # Base anterior al versionado de purchases: sin status / redeemed_at
+        cx.execute("""CREATE TABLE purchases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user TEXT NOT NULL, item TEXT NOT NULL,
+            price INTEGER NOT NULL, created_at INTEGER NOT NULL)""")
+        cx.execute("INSERT INTO purchases(user, item, price, created_at) VALUES('ana', 'pocion', 3, 1)")
+        storage.schema_version(cx)
+        cx.execute("INSERT INTO schema_version(version, name, applied_at) VALUES(1, 'base', 1)")
+        storage._m001_base(cx)
+        cx.commit()
+
+    assert storage.migrate(db) == [v for v, _, _ in storage.MIGRATIONS if v > 1]
+    with sqlite3.connect(db) as cx:
+        cols = {r[1] for r in cx.execute("PRAGMA table_info(purchases)")}
+        rows = cx.execute("SELECT user, item, price, status FROM purchases").fetchall()
+    assert {"status", "redeemed_at"} <= cols
+    assert rows == [("ana", "pocion", 3, None)]
+
+
+def test_concurrent_migrate_applies_each_step_once(tmp_path):
+    db = tmp_path / "app.db"
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(storage.migrate(db))
+        except Exception as e:  # pragma: no cover - el fallo se comprueba abajo
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    applied = sorted(v for r in results for v in r)
+    assert applied == [v for v, _, _ in storage.MIGRATIONS]
+    assert _versions(db) == applied
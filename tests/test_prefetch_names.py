@@ -0,0 +1,74 @@
+import json
+import sqlite3
+
+import pytest
+
+import dexdata
+import translations
+
+
+def _names_es(value):
+    body = json.dumps({"names": [
+        {"language": {"name": "en"}, "name": "english"},
+        {"language": {"name": "es"}, "name": value},
+    ]}).encode("utf-8")
+    return lambda headers: (200, {"Content-Type": "application/json"}, body)
+
+
+@pytest.fixture
+def pokeapi(standin, tmp_path, monkeypatch):
+    monkeypatch.setattr(dexdata, "POKEAPI_BASE", standin.url)
+    monkeypatch.setattr(dexdata, "OFFLINE", False)
+    monkeypatch.setattr(dexdata, "_RATE_NEXT", 0.0)
+    monkeypatch.setattr(translations, "DATA_DIR", tmp_path)  # sin cachés JSON antiguas
+    translations.reset(tmp_path / "translations.sqlite")
+    yield standin
+    translations.reset(translations.DB_PATH)
+
+
+def test_prefetch_runs_in_parallel_and_persists(pokeapi, monkeypatch):
+    monkeypatch.setattr(dexdata, "POKEAPI_RATE", 0)
+    slugs = [f"move-{i}" for i in range(8)]
+    for i, slug in enumerate(slugs):
+        pokeapi.routes[f"/move/{slug}/"] = _names_es(f"Movimiento {i}")
+    pokeapi.routes["/ability/levitate/"] = _names_es("Levitación")
+    pokeapi.delay = 0.2
+
+    rep = dexdata.prefetch_names_es(moves=slugs + ["Ember"], abilities=["Levitate", "Blaze"])
+
+    # "ember" y "blaze" tienen traducción fija: no se piden
+    assert rep == {"fetched": 9, "found": 9}
+    assert pokeapi.max_inflight > 1
+    assert pokeapi.max_inflight <= dexdata.PREFETCH_WORKERS
+    with sqlite3.connect(translations.DB_PATH) as cx:
+        rows = dict(cx.execute("SELECT slug, value FROM translations WHERE kind='move'").fetchall())
+    assert rows["move-3"] == "Movimiento 3"
+
+    # Segunda vez: todo sale de memoria / SQLite, sin red
+    translations.reset(translations.DB_PATH)
+    before = len(pokeapi.requests)
+    assert dexdata.prefetch_names_es(moves=slugs, abilities=["Levitate"]) == {"fetched": 0, "found": 0}
+    assert dexdata.ability_name_es("Levitate") == "Levitación"
+    assert len(pokeapi.requests) == before
+
+
+def test_prefetch_respects_rate_limit(pokeapi, monkeypatch):
+    monkeypatch.setattr(dexdata, "POKEAPI_RATE", 20.0)
+    slugs = [f"rate-{i}" for i in range(6)]
+    for slug in slugs:
+        pokeapi.routes[f"/move/{slug}/"] = _names_es(slug)
+
+    dexdata.prefetch_names_es(moves=slugs)
+
+    starts = sorted(t for _, _, t in pokeapi.requests)
+    assert len(starts) == 6
+    # 6 peticiones a 20/s: al menos 5 huecos de 50 ms entre la primera y la última
+    assert starts[-1] - starts[0] >= 5 / 20.0 * 0.9
+
+
+def test_missing_names_are_negatively_cached(pokeapi, monkeypatch):
+    monkeypatch.setattr(dexdata, "POKEAPI_RATE", 0)
+    rep = dexdata.prefetch_names_es(moves=["Not A Move"])
+    assert rep == {"fetched": 1, "found": 0}
+    assert dexdata.move_name_es("Not A Move") == "Not A Move"
+    assert pokeapi.paths() == ["/move/not-a-move/"]
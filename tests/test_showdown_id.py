@@ -0,0 +1,17 @@
+import dexdata
+import showdown_sprites
+import speciestable
+
+
+def test_showdown_id_does_not_load_pokedex_for_base_forms(monkeypatch):
+    calls = []
+    monkeypatch.setattr(dexdata, "pokedex_data", lambda: calls.append(1) or {})
+    speciestable.reset()
+    showdown_sprites.showdown_id.cache_clear()
+
+    assert showdown_sprites.showdown_id("Mr. Mime") == "mrmime"
+    assert showdown_sprites.showdown_id("Frillish", gender="F") == "frillish-f"
+    assert showdown_sprites.showdown_id("Vulpix", form_name="Alolan") == "vulpix-alola"
+    assert calls == []
+    assert not speciestable.ready()
+    showdown_sprites.showdown_id.cache_clear()
@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+import conex_pkhex
+import snapshots
+from snapshots import TrainerSnapshot
+
+
+@pytest.fixture
+def snaps(tmp_path, monkeypatch):
+    save = tmp_path / "ash.sav"
+    save.write_bytes(b"sav")
+    stored = {}
+    monkeypatch.setattr(snapshots, "_CACHE", {})
+    monkeypatch.setattr(snapshots, "_PENDING", set())
+    monkeypatch.setattr(snapshots, "_FAILED", {})
+    monkeypatch.setattr(snapshots, "latest_user_save", lambda user: str(save))
+    monkeypatch.setattr(snapshots, "_ensure_bridge", lambda: True)
+    monkeypatch.setattr(snapshots, "get_trainer_snapshot", lambda user: stored.get(user))
+    monkeypatch.setattr(snapshots, "put_trainer_snapshot",
+                        lambda user, path, mtime, js: stored.__setitem__(user, (path, mtime, js)))
+    monkeypatch.setattr(snapshots, "set_balance_coins", lambda user, badges: None)
+    return save
+
+
+def _until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return cond()
+
+
+def test_missing_snapshot_is_built_in_background(snaps, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_build(user, path):
+        calls.append(path)
+        release.wait(5)
+        st = snaps.stat()
+        return TrainerSnapshot(user=user, save_path=str(path), save_mtime_ns=st.st_mtime_ns, muertos=3)
+
+    monkeypatch.setattr(snapshots, "build_snapshot", slow_build)
+
+    t0 = time.monotonic()
+    assert snapshots.snapshot_for("ash") is None
+    assert snapshots.snapshot_for("ash") is None  # no se lanza un segundo cálculo
+    assert time.monotonic() - t0 < 0.5
+    release.set()
+
+    assert _until(lambda: snapshots.snapshot_for("ash") is not None)
+    assert snapshots.snapshot_for("ash").muertos == 3
+    assert calls == [str(snaps)]
+
+
+def test_failed_save_is_retried_after_ttl(snaps, monkeypatch):
+    calls = []
+
+    def broken_build(user, path):
+        calls.append(path)
+        raise RuntimeError("bridge caído")
+
+    monkeypatch.setattr(snapshots, "build_snapshot", broken_build)
+    monkeypatch.setattr(snapshots, "FAILED_RETRY", 0.2)
+
+    assert snapshots.snapshot_for("ash") is None
+    assert _until(lambda: len(snapshots._FAILED) == 1)
+    assert snapshots.snapshot_for("ash") is None
+    time.sleep(0.05)
+    assert len(calls) == 1  # dentro del TTL no se reintenta
+
+    time.sleep(0.2)
+    snapshots.snapshot_for("ash")
+    assert _until(lambda: len(calls) == 2)
+
+
+def test_missing_bridge_is_not_probed_on_every_call(monkeypatch):
+    probes = []
+    fake = types.SimpleNamespace(_try_auto_load_bridge=lambda: probes.append(1))
+    monkeypatch.setitem(sys.modules, "entrenadores", fake)
+    monkeypatch.setattr(conex_pkhex, "_BRIDGE_PATH", None)
+    monkeypatch.setattr(conex_pkhex.PKHeXRuntime, "load", staticmethod(lambda hint: None))
+    monkeypatch.setattr(snapshots, "_BRIDGE_RETRY_AT", 0.0)
+    monkeypatch.setattr(snapshots, "FAILED_RETRY", 0.2)
+
+    assert snapshots._ensure_bridge() is False
+    assert snapshots._ensure_bridge() is False
+    assert len(probes) == 1
+
+    time.sleep(0.25)
+    assert snapshots._ensure_bridge() is False
+    assert len(probes) == 2
@@ -0,0 +1,85 @@
+import base64
+import time
+
+import pytest
+
+import sprite_cache
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+def _url(name, folder="gen5"):
+    return f"{sprite_cache.REMOTE_BASE}/{folder}/{name}.png"
+
+
+@pytest.fixture
+def sprites(standin, tmp_path, monkeypatch):
+    monkeypatch.setattr(sprite_cache, "FETCH_BASE", standin.url)
+    monkeypatch.setattr(sprite_cache, "SPRITES_DIR", tmp_path)
+    monkeypatch.setattr(sprite_cache, "OFFLINE", False)
+    monkeypatch.setattr(sprite_cache, "_PENDING", set())
+    monkeypatch.setattr(sprite_cache, "_FAILED", {})
+    monkeypatch.setattr(sprite_cache, "_DATA_URIS", {})
+    yield standin
+    sprite_cache.wait(5)
+
+
+def _until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return cond()
+
+
+def test_miss_returns_remote_url_then_data_uri(sprites, tmp_path):
+    sprites.routes["/gen5/pikachu.png"] = lambda h: (200, {"Content-Type": "image/png"}, PNG)
+    url = _url("pikachu")
+
+    assert sprite_cache.sprite_src(url) == url  # aún no está: URL remota + descarga en 2º plano
+    assert sprite_cache.wait(5)
+    assert (tmp_path / "gen5" / "pikachu.png").read_bytes() == PNG
+
+    uri = sprite_cache.sprite_src(url)
+    assert uri == "data:image/png;base64," + base64.b64encode(PNG).decode("ascii")
+    assert sprite_cache.sprite_image(url) == str(tmp_path / "gen5" / "pikachu.png")
+    assert sprites.paths() == ["/gen5/pikachu.png"]
+
+
+def test_pending_fetches_are_deduplicated(sprites):
+    sprites.routes["/gen5/eevee.png"] = lambda h: (200, {}, PNG)
+    sprites.delay = 0.3
+    url = _url("eevee")
+
+    for _ in range(5):
+        sprite_cache.sprite_src(url)
+    assert sprite_cache.prefetch([url, url]) == 0  # ya en curso
+    assert sprite_cache.wait(5)
+
+    assert sprites.paths() == ["/gen5/eevee.png"]
+
+
+def test_404_is_negatively_cached(sprites):
+    url = _url("missingno")
+    sprite_cache.sprite_src(url)
+    assert sprite_cache.wait(5)
+    assert sprite_cache.prefetch([url]) == 0
+    assert sprite_cache.sprite_src(url) == url
+    assert sprites.paths() == ["/gen5/missingno.png"]
+
+
+def test_data_uris_are_evicted_past_the_limit(sprites, tmp_path, monkeypatch):
+    monkeypatch.setattr(sprite_cache, "MAX_DATA_URIS", 3)
+    (tmp_path / "gen5").mkdir()
+    names = [f"mon{i}" for i in range(5)]
+    for n in names:
+        (tmp_path / "gen5" / f"{n}.png").write_bytes(PNG)
+
+    for n in names:
+        assert sprite_cache.sprite_src(_url(n)).startswith("data:image/png;base64,")
+
+    # Se conservan las 3 últimas; las más antiguas salen primero
+    assert list(sprite_cache._DATA_URIS) == [f"gen5/{n}.png" for n in names[-3:]]
+    assert sprite_cache.stats()["data_uris"] == 3
+    assert sprites.paths() == []
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import storage
+from storage_backends import FakeRemoteBackend, LocalSQLiteBackend, RemoteUnavailable
+
+
+def _insert(backend, name, user, ts=0):
+    return backend.insert_save(filename=name, original_name=name, sha256="0" * 64, uploader=user, created_at=ts)
+
+
+def test_fake_remote_roundtrip_and_call_count():
+    b = FakeRemoteBackend()
+    assert b.put_blob("a.sav", b"abc") == "fake://a.sav"
+    sid = _insert(b, "a.sav", "ana", ts=5)
+    _insert(b, "b.sav", "beto")
+
+    assert b.get_blob("a.sav") == b"abc"
+    assert b.get_save(sid) == (sid, "a.sav", "a.sav", "0" * 64, "ana", 5)
+    assert [r[1] for r in b.list_saves(10)] == ["b.sav", "a.sav"]
+    assert [r[1] for r in b.list_saves_by_user("ana", 10)] == ["a.sav"]
+    with pytest.raises(FileNotFoundError):
+        b.get_blob("missing.sav")
+    assert b.calls == 8
+
+
+def test_fake_remote_failure_rate_is_seeded():
+    def outcomes(seed):
+        b = FakeRemoteBackend(failure_rate=0.5, seed=seed)
+        out = []
+        for _ in range(40):
+            try:
+                b.list_saves(1)
+                out.append(True)
+            except RemoteUnavailable:
+                out.append(False)
+        return out
+
+    first = outcomes(7)
+    assert first == outcomes(7)
+    assert 5 < first.count(False) < 35
+    with pytest.raises(RemoteUnavailable):
+        FakeRemoteBackend(failure_rate=1.0).get_save(1)
+
+
+def test_fake_remote_latency():
+    b = FakeRemoteBackend(latency=0.05, jitter=0.01, seed=3)
+    t0 = time.perf_counter()
+    for _ in range(4):
+        b.list_saves(1)
+    assert time.perf_counter() - t0 >= 4 * 0.04
+
+
+def test_local_backend_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "app.db")
+    storage.migrate(tmp_path / "app.db")
+    b = LocalSQLiteBackend(storage._conn, tmp_path)
+    assert b.put_blob("a.sav", b"abc") is None
+    sid = _insert(b, "a.sav", "ana")
+    assert b.get_blob("a.sav") == b"abc"
+    assert b.get_save(sid)[1:5] == ("a.sav", "a.sav", "0" * 64, "ana")
+    assert [r[0] for r in b.list_saves_by_user("ana", 5)] == [sid]
+    assert b.list_saves_by_user("beto", 5) == []
+
+
+def test_slow_remote_falls_back_to_local_mirror(remote_store, monkeypatch):
+    info = storage.save_upload(b"sav", "ruby.sav", uploader="ana")  # también queda en el espejo
+    storage.invalidate_metadata_cache()
+    monkeypatch.setattr(storage, "REMOTE_READ_TIMEOUT", 0.05)
+    remote_store.latency = 0.5
+
+    t0 = time.perf_counter()
+    rows = storage.list_saves_by_user("ana")
+    assert time.perf_counter() - t0 < 0.4
+    assert [r[0] for r in rows] == [info["id"]]
+    assert storage.metadata_cache_stats()["mirror_reads"] == 1
+
+
+def test_failing_remote_falls_back_to_local_mirror(remote_store):
+    info = storage.save_upload(b"sav", "ruby.sav", uploader="ana")
+    storage.invalidate_metadata_cache()
+    remote_store.failure_rate = 1.0
+
+    assert [r[0] for r in storage.list_saves()] == [info["id"]]
+    assert storage._fetch_save_by_id(info["id"])[1] == info["filename"]
+    stats = storage.metadata_cache_stats()
+    assert stats["remote_errors"] == 2 and stats["mirror_reads"] == 2
@@ -0,0 +1,21 @@
+import numpy as np
+
+from typechart import CHART, CHART_GEN4, TYPE_INDEX as I
+
+
+def test_gen4_chart_steel_resists_ghost_and_dark():
+    assert CHART_GEN4[I["Ghost"], I["Steel"]] == 0.5
+    assert CHART_GEN4[I["Dark"], I["Steel"]] == 0.5
+    assert CHART[I["Ghost"], I["Steel"]] == 1.0
+
+
+def test_gen4_chart_has_no_fairy():
+    assert np.all(CHART_GEN4[I["Fairy"], :] == 1.0)
+    assert np.all(CHART_GEN4[:, I["Fairy"]] == 1.0)
+    assert CHART_GEN4[I["Dragon"], I["Dragon"]] == 2.0
+
+
+def test_gen4_chart_matches_current_elsewhere():
+    diff = {(a, d) for a, d in zip(*np.nonzero(CHART_GEN4 != CHART))}
+    fairy = I["Fairy"]
+    assert {(a, d) for a, d in diff if fairy not in (a, d)} == {(I["Ghost"], I["Steel"]), (I["Dark"], I["Steel"])}
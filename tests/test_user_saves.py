@@ -0,0 +1,59 @@
+import os
+
+import utils
+
+
+def _folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "BASE_SAVES_DIR", tmp_path)
+    utils.invalidate_user_saves()
+    folder = tmp_path / "ana"
+    folder.mkdir()
+    for i, name in enumerate(("a.sav", "b.sav")):
+        (folder / name).write_bytes(b"x")
+        os.utime(folder / name, (1000 + i, 1000 + i))
+    return folder
+
+
+def test_registered_in_place_overwrite_moves_to_head(tmp_path, monkeypatch):
+    folder = _folder(tmp_path, monkeypatch)
+    assert utils.latest_user_save("ana").name == "b.sav"
+
+    # La subida sobrescribe a.sav en su sitio: la carpeta conserva su mtime
+    dir_mtime = folder.stat().st_mtime_ns
+    (folder / "a.sav").write_bytes(b"y")
+    os.utime(folder, ns=(dir_mtime, dir_mtime))
+    utils.register_user_save("ana", folder / "a.sav")
+
+    assert utils.latest_user_save("ana").name == "a.sav"
+    assert [p.name for p in utils.list_user_saves("ana")] == ["a.sav", "b.sav"]
+
+
+def test_index_does_not_stat_every_save(tmp_path, monkeypatch):
+    folder = _folder(tmp_path, monkeypatch)
+    for i in range(50):
+        (folder / f"old{i:02d}.sav").write_bytes(b"x")
+        os.utime(folder / f"old{i:02d}.sav", (10 + i, 10 + i))
+    assert utils.latest_user_save("ana").name == "b.sav"
+
+    calls = []
+    real_stat = utils.Path.stat
+
+    def counting_stat(self, *a, **kw):
+        calls.append(self)
+        return real_stat(self, *a, **kw)
+
+    monkeypatch.setattr(utils.Path, "stat", counting_stat)
+    for _ in range(10):
+        utils.latest_user_save("ana")
+    assert len(calls) <= 10 * 2  # carpeta (+ cabeza), no los 52 ficheros
+
+
+def test_deleted_head_triggers_rescan(tmp_path, monkeypatch):
+    folder = _folder(tmp_path, monkeypatch)
+    assert utils.latest_user_save("ana").name == "b.sav"
+
+    dir_mtime = folder.stat().st_mtime_ns
+    (folder / "b.sav").unlink()
+    os.utime(folder, ns=(dir_mtime, dir_mtime))
+
+    assert utils.latest_user_save("ana").name == "a.sav"
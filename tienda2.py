@@ -9,52 +9,63 @@ from pathlib import Path
 
 import streamlit as st
 
-from utils import USERS, list_user_saves
+from utils import USERS, latest_user_save
 from storage import (
-    add_purchase, total_spent, list_purchases, set_purchase_status, add_redemption, upsert_pokemon_flags,
+    add_purchase, get_balance, set_balance_coins, list_purchases, set_purchase_status, add_redemption, upsert_pokemon_flags,
     get_flags_by_fingerprints, clear_all_pokemon_flags, clear_pokemon_flags_for_owner,
+    league_coins, LEAGUE_COINS_BY_POSITION,
 )
-from conex_pkhex import PKHeXRuntime, get_bridge_path, extract_team, extract_box
-from interfaz import coins_from_badges
+from conex_pkhex import PKHeXRuntime, extract_team, extract_box
+from snapshots import snapshot_for
 
 # Smbolo de moneda (consistente en toda la app)
 COIN = "\U0001FA99"
-COINS_BY_POSITION = {1: 12, 2: 11, 3: 9, 4: 8, 5: 9, 6: 6, 7: 5, 8: 4, 9: 2}
+COINS_BY_POSITION = LEAGUE_COINS_BY_POSITION
 
 
 def _coins_from_league(user: str) -> int:
-    lr = st.session_state.get("league_results", {})
-    user_map = lr.get(user, {})
-    return sum(COINS_BY_POSITION.get(pos, 0) for pos in user_map.values())
+    """Monedas de liga desde las tablas league_* (no depende de haber abierto la Liga)."""
+    try:
+        return league_coins(user)
+    except Exception:
+        return 0
+
 
+BADGE_SYNC_EVERY = 60.0  # s entre refrescos de las monedas por medallas de un usuario
+_BADGE_SYNC: dict = {}   # {user: time.time() del último refresco}
 
-@st.cache_data(ttl=60, show_spinner=False)
-def _calc_money_for_user(user: str) -> int:
-    liga = _coins_from_league(user)
-    badge_coins = 0
+
+def _sync_badge_coins(user: str) -> None:
+    """Refresca (como mucho cada 60 s por usuario) las monedas por medallas en el saldo
+    materializado. No usa st.cache_data: la escritura debe ocurrir aunque se repitan
+    los argumentos."""
+    now = time.time()
+    if now - _BADGE_SYNC.get(user, 0.0) < BADGE_SYNC_EVERY:
+        return
+    _BADGE_SYNC[user] = now
     try:
-        if get_bridge_path():
-            saves = list_user_saves(user)
-            if saves:
-                sav_json = PKHeXRuntime.open_sav(str(saves[0]))
-                badge_coins = coins_from_badges(sav_json)
+        snap = snapshot_for(user)
+        if snap is not None:
+            set_balance_coins(user, badges=int(snap.badge_coins))
     except Exception:
-        badge_coins = 0
-    return int(liga + badge_coins)
+        pass
 
 
-def _money_available(user: str | None) -> int:
-    if not user:
-        return 0
+def _balance(user: str) -> dict:
     try:
-        base = _calc_money_for_user(user)
+        _sync_badge_coins(user)
     except Exception:
-        base = 0
+        pass
     try:
-        spent = total_spent(user)
+        return get_balance(user)
     except Exception:
-        spent = 0
-    return max(int(base) - int(spent), 0)
+        return {"spent": 0, "league": 0, "badges": 0, "available": 0}
+
+
+def _money_available(user: str | None) -> int:
+    if not user:
+        return 0
+    return int(_balance(user)["available"])
 
 
 def _pokeapi_item_png(slug: str) -> str:
@@ -243,15 +254,10 @@ def page_tienda() -> None:
     _, colR = st.columns([5, 2])
     with colR:
         if current_user != "-":
-            try:
-                base = _calc_money_for_user(current_user)
-            except Exception:
-                base = 0
-            try:
-                spent = total_spent(current_user)
-            except Exception:
-                spent = 0
-            avail = max(int(base) - int(spent), 0)
+            bal = _balance(current_user)
+            base = bal["league"] + bal["badges"]
+            spent = bal["spent"]
+            avail = bal["available"]
             st.metric("Disponible", f"{COIN} {avail}")
             st.caption(f"Base: {COIN} {base} | Gastado: {COIN} {spent}")
         else:
@@ -431,9 +437,9 @@ def _render_redeem_flow(ctx: dict, current_user: str) -> None:
         origin_kind = st.selectbox("Origen", ["Equipo"] + [f"Caja {i+1}" for i in range(18) if i != 17], key="rob_origin")
         mons: List[dict] = []
         try:
-            saves = list_user_saves(target)
-            if saves:
-                spath = str(saves[0])
+            latest = latest_user_save(target)
+            if latest:
+                spath = str(latest)
                 sav_json = PKHeXRuntime.open_sav(spath)
                 if origin_kind == "Equipo":
                     mons = extract_team(sav_json, save_path=spath)
@@ -500,9 +506,9 @@ def _render_redeem_flow(ctx: dict, current_user: str) -> None:
         origin_kind = st.selectbox("Origen", ["Equipo"] + [f"Caja {i+1}" for i in range(18)], key="shield_origin")
         mons: List[dict] = []
         try:
-            saves = list_user_saves(current_user)
-            if saves:
-                spath = str(saves[0])
+            latest = latest_user_save(current_user)
+            if latest:
+                spath = str(latest)
                 sav_json = PKHeXRuntime.open_sav(spath)
                 if origin_kind == "Equipo":
                     mons = extract_team(sav_json, save_path=spath)
@@ -559,9 +565,9 @@ def _render_redeem_flow(ctx: dict, current_user: str) -> None:
         origin_kind = st.selectbox("Origen", ["Equipo"] + [f"Caja {i+1}" for i in range(18)], key="shieldrob_origin")
         mons: List[dict] = []
         try:
-            saves = list_user_saves(current_user)
-            if saves:
-                spath = str(saves[0])
+            latest = latest_user_save(current_user)
+            if latest:
+                spath = str(latest)
                 sav_json = PKHeXRuntime.open_sav(spath)
                 if origin_kind == "Equipo":
                     mons = extract_team(sav_json, save_path=spath)
@@ -620,9 +626,9 @@ def _render_redeem_flow(ctx: dict, current_user: str) -> None:
     if _eq_item(item, "Revivir Pokemon"):
         mons: List[dict] = []
         try:
-            saves = list_user_saves(current_user)
-            if saves:
-                spath = str(saves[0])
+            latest = latest_user_save(current_user)
+            if latest:
+                spath = str(latest)
                 sav_json = PKHeXRuntime.open_sav(spath)
                 mons = extract_box(sav_json, 17, save_path=spath)  # Caja 18
             else:
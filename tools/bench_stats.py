@@ -0,0 +1,106 @@
+"""Benchmark de statcalc.batch_stats (NumPy) frente a la ruta escalar anterior.
+
+Genera N Pokémon sintéticos (stats base aleatorias, IVs/EVs/nivel/naturaleza) y
+compara el cálculo uno a uno en Python con una sola llamada vectorizada.
+Comprueba además que ambos dan los mismos números.
+
+Uso:
+    python tools/bench_stats.py --n 30 540 5000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+import statcalc  # noqa: E402
+from i18n import NATURES_ES  # noqa: E402
+
+KEYS = statcalc.STAT_KEYS
+_SHORT = {"attack": "atk", "defense": "def", "special-attack": "spa", "special-defense": "spd", "speed": "spe"}
+
+
+def _scalar(base: dict, p: dict) -> dict:
+    """Ruta escalar (la de entrenadores._extract_stats_from_p antes de statcalc)."""
+    level = int(p.get("level") or 50)
+    ivs = p.get("ivs") or {}
+    evs = p.get("evs") or {}
+    data = NATURES_ES.get(str(p.get("nature") or "").strip().lower().capitalize())
+    up = _SHORT.get(data[1]) if data and data[1] else None
+    down = _SHORT.get(data[2]) if data and data[2] else None
+    res = {}
+    for k in KEYS:
+        b = base[k]
+        iv = int(ivs.get(k) or 0)
+        ev = int(evs.get(k) or 0)
+        core = ((2 * b + iv + ev // 4) * level) // 100
+        if k == "hp":
+            res[k] = core + level + 10
+        else:
+            # Multiplicador entero (equivale a int(val * 1.1/0.9) sin error de coma flotante)
+            res[k] = ((core + 5) * (11 if k == up else 9 if k == down else 10)) // 10
+    return res
+
+
+def _mons(n: int, rng: random.Random):
+    natures = list(NATURES_ES)
+    bases, mons = [], []
+    for _ in range(n):
+        bases.append({k: rng.randint(5, 255) for k in KEYS})
+        mons.append({
+            "level": rng.randint(1, 100),
+            "nature": rng.choice(natures),
+            "ivs": {k: rng.randint(0, 31) for k in KEYS},
+            "evs": {k: rng.choice((0, 4, 84, 252)) for k in KEYS},
+        })
+    return bases, mons
+
+
+def _arrays(bases, mons):
+    base = np.array([[b[k] for k in KEYS] for b in bases], dtype=np.int32)
+    ivs = np.array([[m["ivs"][k] for k in KEYS] for m in mons], dtype=np.int32)
+    evs = np.array([[m["evs"][k] for k in KEYS] for m in mons], dtype=np.int32)
+    levels = np.array([m["level"] for m in mons], dtype=np.int32)
+    natures = np.array([statcalc.nature_index(m["nature"]) for m in mons], dtype=np.intp)
+    return base, ivs, evs, levels, natures
+
+
+def run(sizes, reps: int) -> None:
+    rng = random.Random(1234)
+    print(f"{'N':>6} {'escalar ms':>11} {'numpy ms':>9} {'numpy+prep ms':>14} {'x':>6}")
+    for n in sizes:
+        bases, mons = _mons(n, rng)
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            ref = [_scalar(b, m) for b, m in zip(bases, mons)]
+        t_scalar = (time.perf_counter() - t0) / reps * 1000
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            arrs = _arrays(bases, mons)
+        t_prep = (time.perf_counter() - t0) / reps * 1000
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            out = statcalc.compute_stats(*arrs)
+        t_vec = (time.perf_counter() - t0) / reps * 1000
+        expected = np.array([[r[k] for k in KEYS] for r in ref])
+        assert (out == expected).all(), "resultados distintos entre escalar y NumPy"
+        print(f"{n:>6} {t_scalar:>11.3f} {t_vec:>9.3f} {t_prep + t_vec:>14.3f} {t_scalar / max(t_vec, 1e-9):>6.0f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, nargs="+", default=[6, 30, 540, 5000])
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+    run(args.n, args.reps)
+
+
+if __name__ == '__main__':
+    main()
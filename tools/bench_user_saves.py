@@ -0,0 +1,76 @@
+"""Benchmark del índice de saves por usuario (utils.latest_user_save).
+
+Crea N saves falsos por usuario en un directorio temporal y mide la latencia de
+`latest_user_save` frente al antiguo glob + stat + sort.
+
+Uso:
+    python tools/bench_user_saves.py --users 3 --saves 50 200 500
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import utils  # noqa: E402
+
+
+def _glob_latest(folder: Path):
+    saves = sorted(folder.glob("*.sav"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return saves[0] if saves else None
+
+
+def _timeit(fn, reps: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) / reps * 1e6  # µs por llamada
+
+
+def run(users: int, sizes: list[int], reps: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.BASE_SAVES_DIR = Path(tmp)
+        utils.invalidate_user_saves()
+        print(f"{'saves/usuario':>14} {'glob+stat µs':>14} {'índice µs':>12} {'tras alta µs':>13}")
+        for n in sizes:
+            names = [f"u{i}" for i in range(users)]
+            for u in names:
+                folder = utils.ensure_user_dir(u)
+                for k in range(n):
+                    p = folder / f"{k:06d}_{u}.sav"
+                    if not p.exists():
+                        p.write_bytes(b"\0" * 16)
+                        os.utime(p, ns=(k * 1_000_000, k * 1_000_000))
+            utils.invalidate_user_saves()
+            for u in names:
+                utils.latest_user_save(u)  # calentar el índice
+            u = names[0]
+            folder = utils.BASE_SAVES_DIR / u
+            t_glob = _timeit(lambda folder=folder: _glob_latest(folder), max(1, reps // 20))
+            t_idx = _timeit(lambda u=u: utils.latest_user_save(u), reps)
+            # Alta de un save nuevo por el camino de subida (register_user_save)
+            newp = folder / f"zz_{n}_{u}.sav"
+            newp.write_bytes(b"\0" * 16)
+            utils.register_user_save(u, newp)
+            t_new = _timeit(lambda u=u: utils.latest_user_save(u), reps)
+            assert utils.latest_user_save(u) == newp
+            print(f"{n:>14} {t_glob:>14.1f} {t_idx:>12.1f} {t_new:>13.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=3)
+    ap.add_argument("--saves", type=int, nargs="+", default=[50, 200, 500])
+    ap.add_argument("--reps", type=int, default=2000)
+    args = ap.parse_args()
+    run(args.users, sorted(args.saves), args.reps)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Compila data/dex_index.sqlite a partir de los JSON de Showdown (pokedex + moves).
+
+Usa la copia en disco de dexdata (y la descarga si falta o ha caducado).
+Vuelve a ejecutarlo tras actualizar los datasets.
+
+Uso:
+    python tools/build_dex_index.py
+    python tools/build_dex_index.py --pokedex ps_pokedex.json --moves ps_moves.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import dexdata  # noqa: E402
+import dexindex  # noqa: E402
+from utils import format_bytes  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pokedex", type=Path, help="JSON de pokedex (por defecto, caché de dexdata)")
+    ap.add_argument("--moves", type=Path, help="JSON de moves (por defecto, caché de dexdata)")
+    ap.add_argument("--out", type=Path, default=dexindex.INDEX_PATH)
+    args = ap.parse_args()
+    pokedex = json.loads(args.pokedex.read_text(encoding="utf-8")) if args.pokedex else dexdata._load_dataset("pokedex")
+    moves = json.loads(args.moves.read_text(encoding="utf-8")) if args.moves else dexdata._load_dataset("moves")
+    if not pokedex or not moves:
+        sys.exit("No hay datos de Showdown (sin red ni copia en disco).")
+    rep = dexindex.build_index(pokedex, moves, args.out)
+    print(f"{rep['path']}: {rep['species']} especies, {rep['moves']} movimientos, {rep['forms']} formas, "
+          f"{format_bytes(rep['bytes'])} en {rep['seconds']} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Presupuesto de tiempo de arranque de main.py (python -X importtime).
+
+Lanza `python -X importtime -c "import streamlit; import main"` varias veces y
+reconstruye el árbol de imports. streamlit se importa antes a propósito: es fijo
+y domina el total, así que sólo se cuenta lo que añade la app:
+
+- el tiempo propio de cada módulo del repo (main, interfaz, utils...), y
+- el acumulado de los paquetes de terceros importados mientras se ejecuta un
+  módulo del repo (supabase, httpx, PIL...), incluidos los imports diferidos que
+  hace streamlit dentro de una llamada (p. ej. set_page_config con un icono que
+  toma por imagen carga numpy + PIL).
+
+Falla (código 1) si la mediana supera el presupuesto o si al arrancar se carga
+algún módulo de --forbid (páginas y dependencias pesadas que deben ser diferidas).
+
+Uso:
+    python tools/check_import_time.py
+    python tools/check_import_time.py --budget-ms 40 --runs 7 --top 15
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_BUDGET_MS = 25.0
+DEFAULT_FORBID = (
+    "storage", "storage_backends", "snapshots", "conex_pkhex", "tienda2", "saves",
+    "entrenadores", "liga_tabla", "copa", "copa2", "dexdata", "sprite_cache",
+    "showdown_sprites", "supabase", "httpx",
+)
+STATEMENT = "import streamlit; import main"
+
+
+class Entry(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _repo_modules() -> set:
+    names = {p.stem for p in ROOT.glob("*.py")}
+    names |= {p.parent.name for p in ROOT.glob("*/__init__.py")}
+    return names
+
+
+def _parse(stderr: str) -> List[Entry]:
+    """Líneas 'import time: self | cumulative | <sangría>nombre' en orden de salida."""
+    out: List[Entry] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            parts = line[len("import time:"):].split("|")
+            self_us, cum_us, raw = int(parts[0]), int(parts[1]), parts[2]
+        except Exception:
+            continue
+        name = raw.lstrip(" ")
+        depth = (len(raw) - len(name) - 1) // 2
+        out.append(Entry(name.strip(), self_us, cum_us, depth))
+    return out
+
+
+def _parents(entries: List[Entry]) -> List[str]:
+    """Módulo que importó a cada entrada ('' = nivel superior).
+
+    -X importtime escribe los hijos antes que el padre, con un nivel más de sangría:
+    el padre de una entrada es la siguiente entrada con menos profundidad.
+    """
+    parents = [""] * len(entries)
+    waiting: Dict[int, List[int]] = {}  # profundidad -> índices a la espera de padre
+    for i, e in enumerate(entries):
+        for d in [d for d in waiting if d > e.depth]:
+            for child in waiting.pop(d):
+                parents[child] = e.name
+        waiting.setdefault(e.depth, []).append(i)
+    return parents
+
+
+def _top(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def attribute(entries: List[Entry], repo: set) -> Tuple[Dict[str, int], List[str]]:
+    """Coste atribuible a la app por módulo (µs) y módulos cargados al arrancar."""
+    parents = _parents(entries)
+    cost: Dict[str, int] = {}
+    for e, parent in zip(entries, parents):
+        if _top(e.name) in repo:
+            cost[e.name] = cost.get(e.name, 0) + e.self_us
+        elif parent and _top(parent) in repo and _top(e.name) != "streamlit":
+            cost[e.name] = cost.get(e.name, 0) + e.cumulative_us
+    return cost, [e.name for e in entries]
+
+
+def measure(runs: int) -> Tuple[List[float], Dict[str, int], List[str]]:
+    repo = _repo_modules()
+    totals: List[float] = []
+    last_cost: Dict[str, int] = {}
+    loaded: List[str] = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STATEMENT],
+            cwd=str(ROOT), capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise SystemExit(f"fallo al importar main:\n{proc.stderr[-2000:]}")
+        cost, loaded = attribute(_parse(proc.stderr), repo)
+        totals.append(sum(cost.values()) / 1000.0)
+        last_cost = cost
+    return totals, last_cost, loaded
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-ms", type=float,
+                    default=float(os.environ.get("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)),
+                    help=f"mediana máxima en ms (def. {DEFAULT_BUDGET_MS:g}, o IMPORT_BUDGET_MS)")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="módulos más caros a listar")
+    ap.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBID),
+                    help="módulos que no deben cargarse al arrancar")
+    args = ap.parse_args()
+
+    totals, cost, loaded = measure(max(1, args.runs))
+    median = statistics.median(totals)
+    print(f"arranque de la app (sin streamlit): mediana {median:.1f} ms "
+          f"[{', '.join(f'{t:.1f}' for t in totals)}] / presupuesto {args.budget_ms:g} ms")
+    for name, us in sorted(cost.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000.0:8.2f} ms  {name}")
+
+    loaded_tops = {_top(n) for n in loaded} | set(loaded)
+    eager = [m for m in args.forbid if m in loaded_tops]
+    failed = False
+    if eager:
+        print(f"ERROR: se cargan al arrancar: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"ERROR: el arranque supera el presupuesto ({median:.1f} > {args.budget_ms:g} ms)")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
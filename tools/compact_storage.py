@@ -0,0 +1,53 @@
+"""Retención y compactación de saves.
+
+Uso:
+    python tools/compact_storage.py              # dry-run (no borra nada)
+    python tools/compact_storage.py --keep 5 --apply
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import storage  # noqa: E402
+from utils import USERS, prune_user_saves, format_bytes  # noqa: E402
+
+
+def run(keep: int, apply: bool) -> dict:
+    storage.init_storage()
+    rep = storage.compact_storage(keep_last=keep, dry_run=not apply)
+    user_files = []
+    for u in USERS.keys():
+        user_files += prune_user_saves(u, keep, dry_run=not apply)
+    rep["user_files"] = [str(p) for p, _ in user_files]
+    rep["bytes"] += sum(sz for _, sz in user_files)
+    if apply:
+        try:
+            from conex_pkhex import forget_saves
+            forget_saves([p for p, _ in user_files])
+        except Exception:
+            pass
+    return rep
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--keep", type=int, default=storage.SAVE_RETENTION, help="saves a conservar por usuario")
+    ap.add_argument("--apply", action="store_true", help="borrar de verdad (por defecto dry-run)")
+    args = ap.parse_args()
+    rep = run(args.keep, args.apply)
+    tag = "borrados" if args.apply else "se borrarían"
+    print(f"Filas de saves {tag}: {len(rep['rows'])} {rep['rows']}")
+    for f in rep["files"] + rep["user_files"]:
+        print(f"  {f}")
+    print(f"Ficheros {tag}: {len(rep['files']) + len(rep['user_files'])} ({format_bytes(rep['bytes'])})")
+    if args.apply:
+        print(f"VACUUM: {format_bytes(rep['db_bytes'])} recuperados en {storage.DB_PATH.name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Importa datos locales para arrancar sin red (POKEAPP_OFFLINE=1).
+
+- Volcado CSV de PokeAPI (carpeta data/v2/csv del repo PokeAPI/pokeapi):
+  moves.csv + move_names.csv, abilities.csv + ability_names.csv,
+  pokemon_species.csv + pokemon_species_names.csv -> data/translations.sqlite
+- JSON de Showdown (pokedex.json, moves.json) -> caché de dexdata + data/dex_index.sqlite
+
+Uso:
+    python tools/import_offline_data.py --pokeapi-csv ~/pokeapi/data/v2/csv
+    python tools/import_offline_data.py --pokedex pokedex.json --moves moves.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import dexdata  # noqa: E402
+import dexindex  # noqa: E402
+import translations  # noqa: E402
+from utils import format_bytes  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pokeapi-csv", type=Path, help="carpeta con los CSV de PokeAPI")
+    ap.add_argument("--lang-id", type=int, default=translations.POKEAPI_LANG_ES, help="local_language_id (7 = es)")
+    ap.add_argument("--pokedex", type=Path, help="pokedex.json de Showdown")
+    ap.add_argument("--moves", type=Path, help="moves.json de Showdown")
+    args = ap.parse_args()
+    if not (args.pokeapi_csv or args.pokedex or args.moves):
+        ap.error("indica al menos --pokeapi-csv, --pokedex o --moves")
+
+    if args.pokeapi_csv:
+        t0 = time.perf_counter()
+        counts = translations.import_pokeapi_csv(args.pokeapi_csv, lang_id=args.lang_id)
+        if not counts:
+            sys.exit(f"No se encontraron CSV de PokeAPI en {args.pokeapi_csv}")
+        desc = ", ".join(f"{n} {kind}" for kind, n in counts.items())
+        print(f"Traducciones: {desc} en {time.perf_counter() - t0:.2f} s -> {translations.DB_PATH}")
+
+    for name, path in (("pokedex", args.pokedex), ("moves", args.moves)):
+        if path:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+            dexdata.import_dataset(name, obj)
+            print(f"Showdown {name}: {len(obj)} entradas")
+    if args.pokedex or args.moves:
+        rep = dexindex.build_index(dexdata.pokedex_data(), dexdata.moves_data())
+        print(f"Índice: {rep['species']} especies, {rep['moves']} movimientos, {rep['forms']} formas, "
+              f"{format_bytes(rep['bytes'])} -> {rep['path']}")
+
+
+if __name__ == '__main__':
+    main()
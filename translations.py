@@ -0,0 +1,254 @@
+"""
+Almacén clave-valor de traducciones (data/translations.sqlite) para dexdata.
+
+- Lecturas O(1) desde memoria: cada tipo ('move', 'ability', ...) se carga entero
+  de SQLite la primera vez que se consulta.
+- Escrituras en lote: los resultados nuevos se acumulan y se vuelcan con un solo
+  executemany (al llegar a BATCH_SIZE, pasados FLUSH_INTERVAL s o al salir).
+- Caché negativa: un slug sin traducción se recuerda NEGATIVE_TTL segundos para no
+  volver a preguntar a PokeAPI en cada render.
+- Seguro entre hilos de Streamlit (un lock protege memoria, cola y conexión).
+"""
+from __future__ import annotations
+
+import atexit
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dexdata import DATA_DIR
+
+DB_PATH = DATA_DIR / "translations.sqlite"
+NEGATIVE_TTL = int(os.environ.get("TRANSLATIONS_NEGATIVE_TTL", str(6 * 3600)))
+BATCH_SIZE = 32
+FLUSH_INTERVAL = 2.0
+
+# Cachés JSON antiguas que se importan una vez
+LEGACY_JSON = {
+    "move": "moves_es_cache.json",
+    "ability": "abilities_es_cache.json",
+}
+
+# Volcados CSV de PokeAPI: tipo -> (tabla de identificadores, tabla de nombres, columna id)
+POKEAPI_CSV = {
+    "move": ("moves.csv", "move_names.csv", "move_id"),
+    "ability": ("abilities.csv", "ability_names.csv", "ability_id"),
+    "species": ("pokemon_species.csv", "pokemon_species_names.csv", "pokemon_species_id"),
+}
+POKEAPI_LANG_ES = 7  # local_language_id de "es" en languages.csv
+
+_LOCK = threading.RLock()
+_CX: sqlite3.Connection | None = None
+_MEM: Dict[str, Dict[str, Tuple[Optional[str], int]]] = {}  # kind -> slug -> (valor, fetched_at)
+_PENDING: List[Tuple[str, str, Optional[str], int]] = []
+_LAST_FLUSH = time.monotonic()
+
+
+def _conn() -> sqlite3.Connection:
+    global _CX
+    if _CX is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        cx = sqlite3.connect(DB_PATH, check_same_thread=False)
+        cx.execute("PRAGMA journal_mode=WAL")
+        cx.execute("""CREATE TABLE IF NOT EXISTS translations (
+            kind TEXT NOT NULL,
+            slug TEXT NOT NULL,
+            value TEXT,
+            fetched_at INTEGER NOT NULL,
+            PRIMARY KEY(kind, slug)
+        ) WITHOUT ROWID""")
+        cx.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        cx.commit()
+        _CX = cx
+        atexit.register(flush)
+    return _CX
+
+
+def _import_legacy(cx: sqlite3.Connection, kind: str) -> None:
+    fname = LEGACY_JSON.get(kind)
+    if not fname:
+        return
+    if cx.execute("SELECT 1 FROM meta WHERE key=?", (f"legacy:{kind}",)).fetchone():
+        return
+    rows = []
+    try:
+        path = DATA_DIR / fname
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        now = int(time.time())
+        # Sólo valores válidos: los fallos nunca se guardaban en el JSON
+        rows = [(kind, k, v, now) for k, v in data.items() if isinstance(v, str) and v]
+    except Exception:
+        rows = []
+    with cx:
+        cx.executemany(
+            "INSERT OR IGNORE INTO translations(kind, slug, value, fetched_at) VALUES(?,?,?,?)", rows
+        )
+        cx.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?,?)", (f"legacy:{kind}", str(len(rows))))
+
+
+def _kind_cache(kind: str) -> Dict[str, Tuple[Optional[str], int]]:
+    cache = _MEM.get(kind)
+    if cache is None:
+        cx = _conn()
+        _import_legacy(cx, kind)
+        cache = {
+            slug: (value, int(ts))
+            for slug, value, ts in cx.execute(
+                "SELECT slug, value, fetched_at FROM translations WHERE kind=?", (kind,)
+            )
+        }
+        _MEM[kind] = cache
+    return cache
+
+
+def get(kind: str, slug: str) -> Tuple[bool, Optional[str]]:
+    """(encontrado, valor). Una entrada negativa vigente devuelve (True, None)."""
+    with _LOCK:
+        ent = _kind_cache(kind).get(slug)
+    if ent is None:
+        return False, None
+    value, ts = ent
+    if value is None and time.time() - ts > NEGATIVE_TTL:
+        return False, None
+    return True, value
+
+
+def put(kind: str, slug: str, value: Optional[str]) -> None:
+    """Guarda una traducción (o un fallo si `value` es None) y la encola para SQLite."""
+    value = value if isinstance(value, str) and value else None
+    now = int(time.time())
+    with _LOCK:
+        cache = _kind_cache(kind)
+        if slug in cache and cache[slug][0] == value and value is not None:
+            return  # nada nuevo que escribir
+        cache[slug] = (value, now)
+        _PENDING.append((kind, slug, value, now))
+        if len(_PENDING) >= BATCH_SIZE or time.monotonic() - _LAST_FLUSH >= FLUSH_INTERVAL:
+            _flush_locked()
+
+
+def _flush_locked() -> None:
+    global _LAST_FLUSH
+    _LAST_FLUSH = time.monotonic()
+    if not _PENDING:
+        return
+    rows = list(_PENDING)
+    _PENDING.clear()
+    try:
+        with _conn() as cx:
+            cx.executemany(
+                """INSERT INTO translations(kind, slug, value, fetched_at) VALUES(?,?,?,?)
+                   ON CONFLICT(kind, slug) DO UPDATE SET value=excluded.value, fetched_at=excluded.fetched_at""",
+                rows,
+            )
+    except Exception:
+        pass
+
+
+def flush() -> None:
+    """Vuelca a SQLite las escrituras pendientes."""
+    with _LOCK:
+        _flush_locked()
+
+
+def lookup(kind: str, slug: str, fetch_fn: Callable[[str], Optional[str]]) -> Optional[str]:
+    """Traducción de `slug`; si no está (o la negativa caducó) llama a `fetch_fn` y guarda
+    el resultado, tanto si hay valor como si no."""
+    found, value = get(kind, slug)
+    if found:
+        return value
+    try:
+        value = fetch_fn(slug)
+    except Exception:
+        value = None
+    put(kind, slug, value)
+    return value if isinstance(value, str) and value else None
+
+
+def put_many(kind: str, items: Iterable[Tuple[str, str]], *, chunk: int = 1000) -> int:
+    """Inserta/actualiza en bloque pares (slug, valor) sin pasar por la cola. Devuelve filas."""
+    total = 0
+    buf: List[Tuple[str, str, Optional[str], int]] = []
+    now = int(time.time())
+
+    def write() -> None:
+        with _LOCK:
+            with _conn() as cx:
+                cx.executemany(
+                    """INSERT INTO translations(kind, slug, value, fetched_at) VALUES(?,?,?,?)
+                       ON CONFLICT(kind, slug) DO UPDATE SET value=excluded.value, fetched_at=excluded.fetched_at""",
+                    buf,
+                )
+            cache = _MEM.get(kind)
+            if cache is not None:
+                for _k, slug, value, ts in buf:
+                    cache[slug] = (value, ts)
+        buf.clear()
+
+    for slug, value in items:
+        if not slug or not isinstance(value, str) or not value:
+            continue
+        buf.append((kind, slug, value, now))
+        total += 1
+        if len(buf) >= chunk:
+            write()
+    if buf:
+        write()
+    return total
+
+
+def _iter_pokeapi_names(csv_dir: Path, kind: str, lang_id: int) -> Iterator[Tuple[str, str]]:
+    ident_file, names_file, id_col = POKEAPI_CSV[kind]
+    with open(csv_dir / ident_file, encoding="utf-8", newline="") as fh:
+        idents = {row["id"]: row["identifier"] for row in csv.DictReader(fh)}
+    with open(csv_dir / names_file, encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            if str(row.get("local_language_id")) != str(lang_id):
+                continue
+            slug = idents.get(row.get(id_col, ""))
+            if slug:
+                yield slug, (row.get("name") or "").strip()
+
+
+def import_pokeapi_csv(csv_dir: Path, *, lang_id: int = POKEAPI_LANG_ES) -> Dict[str, int]:
+    """Importa los nombres en español de un volcado CSV de PokeAPI (carpeta data/v2/csv).
+    Los tipos cuyos CSV falten se omiten."""
+    csv_dir = Path(csv_dir)
+    out: Dict[str, int] = {}
+    for kind, (ident_file, names_file, _col) in POKEAPI_CSV.items():
+        if not (csv_dir / ident_file).exists() or not (csv_dir / names_file).exists():
+            continue
+        out[kind] = put_many(kind, _iter_pokeapi_names(csv_dir, kind, lang_id))
+    return out
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Entradas en memoria por tipo: positivas, negativas y pendientes de escribir."""
+    with _LOCK:
+        out = {}
+        for kind, cache in _MEM.items():
+            neg = sum(1 for v, _ in cache.values() if v is None)
+            out[kind] = {"entries": len(cache) - neg, "negative": neg}
+        out["_pending"] = {"rows": len(_PENDING)}
+        return out
+
+
+def reset(db_path: Path | None = None) -> None:
+    """Cierra la conexión y vacía la memoria (p. ej. para apuntar a otra base)."""
+    global _CX, DB_PATH
+    with _LOCK:
+        _flush_locked()
+        if _CX is not None:
+            try:
+                _CX.close()
+            except Exception:
+                pass
+        _CX = None
+        _MEM.clear()
+        if db_path is not None:
+            DB_PATH = Path(db_path)
@@ -0,0 +1,162 @@
+"""
+Tabla de tipos 18×18 (NumPy) y perfil defensivo/ofensivo de equipos.
+
+- CHART[atacante, defensor] con el multiplicador (0, 0.5, 1, 2); tabla actual (Gen 6+),
+  coherente con los tipos que devuelve la Pokédex de Showdown (incluye Hada).
+- CHART_GEN4: tabla de DPPt/HGSS (Gen 2-5) para damagecalc: Acero resiste Fantasma y
+  Siniestro y no existe Hada (su fila y su columna son neutras, x1).
+- `team_profile(team)` devuelve, por tipo atacante, cuántos miembros son débiles,
+  resistentes o inmunes, y la cobertura ofensiva de los movimientos del equipo.
+  El resultado se cachea por huella del equipo (especie/forma + movimientos).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TYPES: Tuple[str, ...] = (
+    "Normal", "Fire", "Water", "Electric", "Grass", "Ice", "Fighting", "Poison", "Ground",
+    "Flying", "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy",
+)
+TYPE_INDEX: Dict[str, int] = {t: i for i, t in enumerate(TYPES)}
+
+# atacante -> (súper eficaz, poco eficaz, sin efecto)
+_EFFECTIVENESS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {
+    "Normal": ((), ("Rock", "Steel"), ("Ghost",)),
+    "Fire": (("Grass", "Ice", "Bug", "Steel"), ("Fire", "Water", "Rock", "Dragon"), ()),
+    "Water": (("Fire", "Ground", "Rock"), ("Water", "Grass", "Dragon"), ()),
+    "Electric": (("Water", "Flying"), ("Electric", "Grass", "Dragon"), ("Ground",)),
+    "Grass": (("Water", "Ground", "Rock"), ("Fire", "Grass", "Poison", "Flying", "Bug", "Dragon", "Steel"), ()),
+    "Ice": (("Grass", "Ground", "Flying", "Dragon"), ("Fire", "Water", "Ice", "Steel"), ()),
+    "Fighting": (("Normal", "Ice", "Rock", "Dark", "Steel"), ("Poison", "Flying", "Psychic", "Bug", "Fairy"), ("Ghost",)),
+    "Poison": (("Grass", "Fairy"), ("Poison", "Ground", "Rock", "Ghost"), ("Steel",)),
+    "Ground": (("Fire", "Electric", "Poison", "Rock", "Steel"), ("Grass", "Bug"), ("Flying",)),
+    "Flying": (("Grass", "Fighting", "Bug"), ("Electric", "Rock", "Steel"), ()),
+    "Psychic": (("Fighting", "Poison"), ("Psychic", "Steel"), ("Dark",)),
+    "Bug": (("Grass", "Psychic", "Dark"), ("Fire", "Fighting", "Poison", "Flying", "Ghost", "Steel", "Fairy"), ()),
+    "Rock": (("Fire", "Ice", "Flying", "Bug"), ("Fighting", "Ground", "Steel"), ()),
+    "Ghost": (("Psychic", "Ghost"), ("Dark",), ("Normal",)),
+    "Dragon": (("Dragon",), ("Steel",), ("Fairy",)),
+    "Dark": (("Psychic", "Ghost"), ("Fighting", "Dark", "Fairy"), ()),
+    "Steel": (("Ice", "Rock", "Fairy"), ("Fire", "Water", "Electric", "Steel"), ()),
+    "Fairy": (("Fighting", "Dragon", "Dark"), ("Fire", "Poison", "Steel"), ()),
+}
+
+
+# Diferencias de la tabla Gen 2-5 respecto a la actual (aparte de no tener Hada)
+_GEN4_OVERRIDES: Dict[Tuple[str, str], float] = {
+    ("Ghost", "Steel"): 0.5,
+    ("Dark", "Steel"): 0.5,
+}
+
+
+def _build_chart(gen: int = 6) -> np.ndarray:
+    chart = np.ones((len(TYPES), len(TYPES)), dtype=np.float32)
+    for atk, (se, nve, immune) in _EFFECTIVENESS.items():
+        a = TYPE_INDEX[atk]
+        for d in se:
+            chart[a, TYPE_INDEX[d]] = 2.0
+        for d in nve:
+            chart[a, TYPE_INDEX[d]] = 0.5
+        for d in immune:
+            chart[a, TYPE_INDEX[d]] = 0.0
+    if gen < 6:
+        fairy = TYPE_INDEX["Fairy"]
+        chart[fairy, :] = 1.0
+        chart[:, fairy] = 1.0
+        for (atk, dfn), mult in _GEN4_OVERRIDES.items():
+            chart[TYPE_INDEX[atk], TYPE_INDEX[dfn]] = mult
+    chart.setflags(write=False)
+    return chart
+
+
+CHART = _build_chart()
+CHART_GEN4 = _build_chart(gen=4)
+
+
+def _type_ids(types: Iterable[Any]) -> List[int]:
+    return [TYPE_INDEX[t] for t in (str(x).title() for x in types or ()) if t in TYPE_INDEX]
+
+
+def defense_vector(types: Sequence[str]) -> np.ndarray:
+    """Multiplicador recibido por cada tipo atacante (18,) para un Pokémon de `types`."""
+    ids = _type_ids(types)
+    if not ids:
+        return np.ones(len(TYPES), dtype=np.float32)
+    return CHART[:, ids].prod(axis=1)
+
+
+def defense_matrix(team_types: Sequence[Sequence[str]]) -> np.ndarray:
+    """(N, 18): fila i = multiplicadores que recibe el miembro i. Tipos dobles = producto."""
+    n = len(team_types)
+    # Índice extra 18 = "sin tipo" con multiplicador 1 para completar monotipos
+    padded = np.vstack([CHART.T, np.ones((1, len(TYPES)), dtype=np.float32)])
+    idx = np.full((n, 2), len(TYPES), dtype=np.intp)
+    for i, types in enumerate(team_types):
+        ids = _type_ids(types)[:2]
+        idx[i, :len(ids)] = ids
+    return padded[idx[:, 0]] * padded[idx[:, 1]]
+
+
+def _mon_key(p: dict) -> Optional[Tuple]:
+    species = p.get("species_name") or p.get("species")
+    if not species:
+        return None
+    fi = p.get("form_index")
+    moves = tuple(str(m) for m in (p.get("moves") or []) if m)
+    return (str(species), fi if isinstance(fi, int) else None, p.get("form_name"), p.get("gender"), moves)
+
+
+def team_fingerprint(team: Sequence[dict]) -> Tuple:
+    """Huella hashable del equipo: (especie, forma, género, movimientos) por miembro."""
+    return tuple(k for k in (_mon_key(p) for p in team if isinstance(p, dict)) if k)
+
+
+def _resolve(key: Tuple) -> Tuple[Tuple[str, ...], Tuple[str, ...], str]:
+    from dexdata import species_types, move_info
+    species, fi, fname, gender, moves = key
+    try:
+        types = tuple(species_types(species_name=species, form_index=fi, form_name=fname, gender=gender))
+    except Exception:
+        types = ()
+    move_types = []
+    for mv in moves:
+        info = move_info(mv) or {}
+        if info.get("type") and info.get("category") != "Status":
+            move_types.append(str(info["type"]).title())
+    return types, tuple(move_types), species
+
+
+@lru_cache(maxsize=512)
+def _profile(fp: Tuple) -> Dict[str, Any]:
+    resolved = [_resolve(k) for k in fp]
+    team_types = [r[0] for r in resolved]
+    dm = defense_matrix(team_types) if resolved else np.ones((0, len(TYPES)), dtype=np.float32)
+    weak = (dm > 1).sum(axis=0)
+    resist = ((dm < 1) & (dm > 0)).sum(axis=0)
+    immune = (dm == 0).sum(axis=0)
+    # Cobertura: mejor multiplicador de los ataques del equipo contra cada tipo defensor
+    atk_ids = sorted({TYPE_INDEX[t] for r in resolved for t in r[1] if t in TYPE_INDEX})
+    best = CHART[atk_ids].max(axis=0) if atk_ids else np.zeros(len(TYPES), dtype=np.float32)
+    return {
+        "members": tuple((r[2], r[0]) for r in resolved),
+        "defense": {t: tuple(float(x) for x in dm[:, i]) for i, t in enumerate(TYPES)},
+        "weak": {t: int(weak[i]) for i, t in enumerate(TYPES)},
+        "resist": {t: int(resist[i]) for i, t in enumerate(TYPES)},
+        "immune": {t: int(immune[i]) for i, t in enumerate(TYPES)},
+        "coverage": {t: float(best[i]) for i, t in enumerate(TYPES)},
+        "attack_types": tuple(TYPES[i] for i in atk_ids),
+        # Tipos atacantes a los que la mitad o más del equipo es débil sin nadie que resista
+        "threats": tuple(
+            t for i, t in enumerate(TYPES)
+            if dm.shape[0] and weak[i] * 2 >= dm.shape[0] and resist[i] + immune[i] == 0
+        ),
+        "uncovered": tuple(t for i, t in enumerate(TYPES) if atk_ids and best[i] < 1),
+    }
+
+
+def team_profile(team: Sequence[dict]) -> Dict[str, Any]:
+    """Perfil de tipos del equipo (cacheado por huella). No modificar el dict devuelto."""
+    return _profile(team_fingerprint(team))
@@ -1,6 +1,6 @@
 ﻿from __future__ import annotations
 import streamlit as st
-from typing import List
+from typing import Dict, List
 
 from dexdata import species_types, type_color
 from pkmmeta import pokemon_fingerprint
@@ -160,3 +160,99 @@ def team_grid_ui(team: List[dict]) -> None:
 
 
 
+
+
+def _mult_label(x: float) -> str:
+    return {0.0: "0", 0.25: "¼", 0.5: "½", 1.0: "1", 2.0: "2", 4.0: "4"}.get(float(x), f"{x:g}")
+
+
+def type_profile_ui(team: List[dict], *, title: str = "Análisis de tipos") -> None:
+    """Expander con debilidades/resistencias del equipo y cobertura de sus ataques."""
+    team = [t for t in (team or []) if isinstance(t, dict)]
+    if not team:
+        return
+    try:
+        from typechart import TYPES, team_profile
+        prof = team_profile(team)
+    except Exception:
+        return
+    if not prof.get("members"):
+        return
+    _ensure_type_css()
+    with st.expander(title):
+        if prof["threats"]:
+            st.markdown(
+                "**Amenazas:** " + " ".join(
+                    f"<span class='type-chip' style='background:{type_color(t)}'>{translate_types_es([t])[0]}</span>"
+                    for t in prof["threats"]
+                ),
+                unsafe_allow_html=True,
+            )
+        has_moves = bool(prof["attack_types"])
+        head = "<tr><th>Tipo</th><th>Débiles</th><th>Resisten</th><th>Inmunes</th>"
+        head += "<th>Cobertura</th></tr>" if has_moves else "</tr>"
+        rows = []
+        for t in TYPES:
+            chip = f"<span class='type-chip' style='background:{type_color(t)}'>{translate_types_es([t])[0]}</span>"
+            weak, res, imm = prof["weak"][t], prof["resist"][t], prof["immune"][t]
+            style = " style='color:#f87171;font-weight:700'" if weak > res + imm else ""
+            row = f"<tr><td>{chip}</td><td{style}>{weak or '-'}</td><td>{res or '-'}</td><td>{imm or '-'}</td>"
+            if has_moves:
+                row += f"<td>x{_mult_label(prof['coverage'][t])}</td>"
+            rows.append(row + "</tr>")
+        st.markdown(
+            "<table style='width:100%;font-size:.85rem'>" + head + "".join(rows) + "</table>",
+            unsafe_allow_html=True,
+        )
+        if has_moves and prof["uncovered"]:
+            st.caption(
+                "Sin ataques neutros o mejores contra: " + ", ".join(translate_types_es(list(prof["uncovered"])))
+            )
+
+
+def trainers_type_overview_ui(teams: Dict[str, List[dict]], *, title: str = "Tipos de todos los entrenadores") -> None:
+    """Expander con el perfil de tipos del equipo de cada entrenador: amenazas, tipos
+    a los que más miembros son débiles y tipos sin cobertura ofensiva."""
+    try:
+        from typechart import TYPES, team_profile
+    except Exception:
+        return
+    profiles = []
+    for trainer, team in teams.items():
+        team = [t for t in (team or []) if isinstance(t, dict)]
+        try:
+            prof = team_profile(team) if team else None
+        except Exception:
+            prof = None
+        profiles.append((trainer, prof if prof and prof.get("members") else None))
+    if not any(p for _, p in profiles):
+        return
+    _ensure_type_css()
+
+    def chips(types) -> str:
+        return " ".join(
+            f"<span class='type-chip' style='background:{type_color(t)}'>{translate_types_es([t])[0]}</span>"
+            for t in types
+        ) or "-"
+
+    rows = []
+    for trainer, prof in profiles:
+        if prof is None:
+            rows.append(f"<tr><td><b>{trainer}</b></td><td colspan='3' style='opacity:.6'>Sin equipo leído</td></tr>")
+            continue
+        # Peores tipos: más débiles que resistencias/inmunidades, ordenados por el saldo
+        worst = sorted(
+            (t for t in TYPES if prof["weak"][t] > prof["resist"][t] + prof["immune"][t]),
+            key=lambda t: prof["resist"][t] + prof["immune"][t] - prof["weak"][t],
+        )[:4]
+        uncovered = prof["uncovered"] if prof["attack_types"] else ()
+        rows.append(
+            f"<tr><td><b>{trainer}</b> <span style='opacity:.6'>({len(prof['members'])})</span></td>"
+            f"<td>{chips(prof['threats'])}</td><td>{chips(worst)}</td><td>{chips(uncovered)}</td></tr>"
+        )
+    with st.expander(title):
+        st.markdown(
+            "<table style='width:100%;font-size:.85rem'><tr><th>Entrenador</th><th>Amenazas</th>"
+            "<th>Más débiles a</th><th>Sin cobertura</th></tr>" + "".join(rows) + "</table>",
+            unsafe_allow_html=True,
+        )
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 # utils.py  constantes, estado de sesión y utilidades sin UI (esqueleto)
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import hashlib
+import os
+import threading
 import streamlit as st
 
 APP_TITLE = "Liga Pokmon"
@@ -39,10 +41,91 @@ def ensure_user_dir(u: str) -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
+# Índice de saves por usuario: {usuario: (mtime_ns de la carpeta, [(mtime_ns, ruta)] más recientes primero)}.
+# Sólo se vuelve a listar la carpeta cuando cambia su mtime (alta/baja de ficheros). Sobrescribir
+# un .sav en su sitio no cambia la carpeta: la subida lo apunta con register_user_save. Por
+# consulta sólo se comprueba que la cabeza sigue existiendo (un stat, sin importar cuántos haya).
+_SAVE_INDEX: Dict[str, Tuple[int, List[Tuple[int, Path]]]] = {}
+_SAVE_INDEX_LOCK = threading.Lock()
+
+def _scan_user_saves(folder: Path) -> List[Tuple[int, Path]]:
+    entries = []
+    with os.scandir(folder) as it:
+        for e in it:
+            if e.name.endswith(".sav") and e.is_file():
+                entries.append((e.stat().st_mtime_ns, e.name))
+    entries.sort(reverse=True)
+    return [(mt, folder / name) for mt, name in entries]
+
+def _head_ok(entries: List[Tuple[int, Path]]) -> bool:
+    """La cabeza del índice sigue existiendo (o el índice está vacío)."""
+    return not entries or entries[0][1].exists()
+
+def _user_save_index(u: str) -> List[Tuple[int, Path]]:
+    folder = BASE_SAVES_DIR / u
+    try:
+        dir_mtime = folder.stat().st_mtime_ns
+    except FileNotFoundError:
+        folder = ensure_user_dir(u)
+        dir_mtime = folder.stat().st_mtime_ns
+    with _SAVE_INDEX_LOCK:
+        ent = _SAVE_INDEX.get(u)
+        if ent is not None and ent[0] == dir_mtime and _head_ok(ent[1]):
+            return ent[1]
+        entries = _scan_user_saves(folder)
+        _SAVE_INDEX[u] = (dir_mtime, entries)
+        return entries
+
 def list_user_saves(u: str) -> List[Path]:
     """Devuelve una lista ordenada de .sav del usuario (más recientes primero)."""
-    folder = ensure_user_dir(u)
-    return sorted(folder.glob("*.sav"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [p for _, p in _user_save_index(u)]
+
+def latest_user_save(u: str) -> Optional[Path]:
+    """Save más reciente del usuario (o None) sin recorrer la carpeta si no ha cambiado."""
+    entries = _user_save_index(u)
+    return entries[0][1] if entries else None
+
+def register_user_save(u: str, path: Path) -> None:
+    """Apunta en el índice un save recién escrito (nuevo o sobrescrito en su sitio) para
+    no tener que reescanear la carpeta."""
+    path = Path(path)
+    try:
+        dir_mtime = path.parent.stat().st_mtime_ns
+        mtime = path.stat().st_mtime_ns
+    except Exception:
+        invalidate_user_saves(u)
+        return
+    with _SAVE_INDEX_LOCK:
+        ent = _SAVE_INDEX.get(u)
+        if ent is None:
+            return  # se indexará completo en la próxima consulta
+        entries = [(mtime, path)] + [e for e in ent[1] if e[1] != path]
+        _SAVE_INDEX[u] = (dir_mtime, entries)
+
+def invalidate_user_saves(u: str | None = None) -> None:
+    """Olvida el índice de un usuario (o de todos)."""
+    with _SAVE_INDEX_LOCK:
+        if u is None:
+            _SAVE_INDEX.clear()
+        else:
+            _SAVE_INDEX.pop(u, None)
+
+def prune_user_saves(u: str, keep_last: int, *, dry_run: bool = True) -> List[tuple[Path, int]]:
+    """Borra los .sav del usuario más allá de los `keep_last` más recientes.
+    Devuelve [(ruta, bytes)] de lo borrado (o lo que se borraría en dry-run)."""
+    keep_last = max(1, int(keep_last))
+    out: List[tuple[Path, int]] = []
+    for p in list_user_saves(u)[keep_last:]:
+        try:
+            size = p.stat().st_size
+            if not dry_run:
+                p.unlink()
+        except Exception:
+            continue
+        out.append((p, size))
+    if out and not dry_run:
+        invalidate_user_saves(u)
+    return out
 
 def format_bytes(n: int) -> str:
     """Formatea bytes a B/KB/MB."""